@@ -0,0 +1,203 @@
+"""
+Parser de les actes de partit ACTAWP (pàgina /match/<id>/stats)
+- Un sol recorregut del document: guarda les etiquetes de text (capçaleres i textos curts)
+  i les taules en ordre, i assigna cada taula de jugadors a l'últim nom d'equip que la precedeix
+- Funciona per a qualsevol equip (cap nom d'equip fixat al codi)
+- Alternativa sobre el text pla (sense regex DOTALL sobre tota la pàgina) si no hi ha taules reconeixibles
+
+Ús:
+    from acta_parser import extract_rosters, find_team_roster
+
+    rosters = extract_rosters(html)          # [{'team': "U.E. D'HORTA", 'players': [{'num': 1, 'name': ...}]}]
+    roster = find_team_roster(rosters, "U.E. D'HORTA")
+"""
+
+import re
+
+from bs4 import NavigableString
+
+from html_engine import make_soup
+
+HEADINGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+SKIPPED = ('script', 'style', 'noscript')
+CLUB_PREFIXES = re.compile(r"\b(?:C\.N\.|C\.E\.|U\.E\.|(?:CN|CE|UE)\b)|['’]")
+VIEW_TEXT = re.compile(r'Veure|Ver|View', re.IGNORECASE)
+SECTION_START = re.compile(r'Gols\s*igualtat', re.IGNORECASE)
+PLAYER_TEXT = re.compile(r'(\d{1,2})([A-ZÁÉÍÓÚÀÈÌÒÙÑÇ][A-ZÁÉÍÓÚÀÈÌÒÙÑÇ\s]+?)(\d{6,})')
+INVALID_NAMES = ('ENTRENADOR', 'GOLS', 'EFECTIVITAT', 'SUPERIORITAT')
+
+MAX_DORSAL = 20
+
+WORD = re.compile(r'\w+')
+
+
+def team_key(name):
+    """Nom d'equip normalitzat per comparar: majúscules, sense C.N./C.E./U.E. ni apòstrofs"""
+    return ' '.join(CLUB_PREFIXES.sub(' ', (name or '').upper()).split())
+
+
+def team_tokens(name):
+    """Paraules significatives del nom (més de 3 lletres)"""
+    return [part for part in team_key(name).split() if len(part) > 3]
+
+
+def team_words(name):
+    """Paraules del nom normalitzat (també separa els noms amb guions: ATLETIC-BARCELONETA)"""
+    return set(WORD.findall(team_key(name)))
+
+
+def looks_like_team(label):
+    """Un text curt amb lletres i sense ':' ni xifres (descarta 'Gols igualtat: 3', marcadors, etc.)"""
+    return 3 < len(label) < 60 and ':' not in label and not any(c.isdigit() for c in label)
+
+
+def walk(soup):
+    """Recorre el document un sol cop. Retorna (etiquetes, taules) on cada taula porta
+    la posició de la llista d'etiquetes on apareix. Les capçaleres h1-h6 són una sola etiqueta"""
+    labels = []  # (text, és_capçalera)
+    tables = []  # (taula, índex a labels)
+    stack = [(soup, False)]
+
+    while stack:
+        node, in_table = stack.pop()
+        if isinstance(node, NavigableString):
+            if not in_table and type(node) is NavigableString:
+                text = node.strip()
+                if text:
+                    labels.append((text, False))
+            continue
+
+        name = node.name
+        if name in SKIPPED:
+            continue
+        if name in HEADINGS and not in_table:
+            text = node.get_text(' ', strip=True)
+            if text:
+                labels.append((text, True))
+            continue
+        if name == 'table':
+            tables.append((node, len(labels)))
+            in_table = True
+        stack.extend((child, in_table) for child in reversed(node.contents))
+
+    return labels, tables
+
+
+def roster_columns(table):
+    """Índexs de les columnes DORSAL i NOM/JUGADOR, o None si no és una taula de jugadors"""
+    headers = [th.get_text(strip=True).upper() for th in table.find_all('th')]
+    if not any('DORSAL' in h or 'NOM' in h or 'JUGADOR' in h for h in headers):
+        return None
+
+    dorsal_idx = -1
+    name_idx = -1
+    for i, h in enumerate(headers):
+        if 'DORSAL' in h:
+            dorsal_idx = i
+        if 'JUGADOR' in h or 'NOM' in h:
+            name_idx = i
+
+    # Si no els trobem pels headers, posicions típiques (3a i 4a columna)
+    return (dorsal_idx if dorsal_idx != -1 else 2, name_idx if name_idx != -1 else 3)
+
+
+def roster_players(table, dorsal_idx, name_idx, max_dorsal=MAX_DORSAL):
+    """Jugadors (dorsal + nom) d'una taula de l'acta"""
+    players = []
+    for row in table.find_all('tr'):
+        cells = row.find_all('td')
+        if len(cells) <= max(dorsal_idx, name_idx):
+            continue
+
+        num_clean = VIEW_TEXT.sub('', cells[dorsal_idx].get_text(strip=True)).strip()
+        name_clean = VIEW_TEXT.sub('', cells[name_idx].get_text(strip=True)).strip().upper()
+
+        if num_clean.isdigit():
+            num = int(num_clean)
+            if 0 < num <= max_dorsal and name_clean and len(name_clean) > 3:
+                players.append({'num': num, 'name': name_clean})
+    return players
+
+
+def section_label(labels, start, end):
+    """Nom de l'equip d'una secció: l'última capçalera, o l'últim text que sembli un nom d'equip"""
+    fallback = None
+    for text, is_heading in reversed(labels[start:end]):
+        if is_heading:
+            return text
+        if fallback is None and looks_like_team(text):
+            fallback = text
+    return fallback
+
+
+def extract_rosters(html, max_dorsal=MAX_DORSAL):
+    """Plantilles de l'acta en ordre d'aparició: [{'team': nom o None, 'players': [...]}]"""
+    labels, tables = walk(make_soup(html))
+
+    rosters = []
+    previous = 0
+    for table, position in tables:
+        columns = roster_columns(table)
+        if not columns:
+            continue
+        rosters.append({
+            'team': section_label(labels, previous, position),
+            'players': roster_players(table, *columns, max_dorsal=max_dorsal)
+        })
+        previous = position
+
+    return rosters
+
+
+def find_team_roster(rosters, team_name):
+    """La plantilla de team_name, o None. Primer el nom normalitzat sencer; si no, la que comparteix
+    més paraules significatives, desempatant per les paraules curtes (sufixos 'A' / 'B') i per
+    les paraules que sobren. Així "C.N. BARCELONA B" no agafa la taula de BARCELONA A"""
+    key = team_key(team_name)
+    words = team_words(team_name)
+    best = None
+    best_score = None
+    for roster in rosters:
+        if not roster['players']:
+            continue
+        label = team_key(roster['team'])
+        if label == key:
+            return roster
+        label_words = team_words(roster['team'])
+        common = words & label_words
+        significant = sum(1 for word in common if len(word) > 3)
+        if not significant:
+            continue
+        score = (significant, len(common), -len(words ^ label_words))
+        if best_score is None or score > best_score:
+            best, best_score = roster, score
+    return best
+
+
+def roster_from_text(text, team_name, exclude=()):
+    """Alternativa sobre el text pla: busca cada 'Gols igualtat' precedit pel nom de l'equip
+    i llegeix els jugadors ("1ALVARO CAPILLA COBO000000") dels 3000 caràcters següents"""
+    tokens = team_tokens(team_name)
+    invalid = INVALID_NAMES + tuple(exclude)
+    upper = text.upper()
+
+    for match in SECTION_START.finditer(text):
+        context = team_key(upper[max(0, match.start() - 200):match.start()])
+        if not any(token in context for token in tokens):
+            continue
+
+        dorsal = upper.find('DORSAL', match.end())
+        if dorsal == -1:
+            continue
+        section = text[dorsal:dorsal + 3000]
+
+        players = []
+        for num, name, _ in PLAYER_TEXT.findall(section):
+            num = int(num)
+            name = name.strip().upper()
+            if 0 < num <= MAX_DORSAL and len(name) > 3 and not any(x in name for x in invalid):
+                players.append({'num': num, 'name': name})
+        if players:
+            return players
+
+    return []
@@ -0,0 +1,214 @@
+"""
+Cache persistent de respostes ACTAWP
+- Clau: URL + pestanya + team_id
+- TTL configurable per tipus de pestanya/pàgina i per fase del calendari (poll_scheduler):
+  llargs entre jornades, curts el dia de partit i durant/després del partit
+- Quan canvien els últims resultats d'un equip es descarten els seus jugadors i estadístiques
+- Revalidació condicional (ETag / Last-Modified) per a les pàgines GET
+- Evicció per mida total i per edat (només de les entrades: els fitxers d'estat d'altres scripts
+  al mateix directori, com poll_state.json o index_state.json, no es toquen)
+- El directori (.actawp_cache) es conserva entre execucions del workflow amb actions/cache
+
+Ús:
+    from actawp_cache import ResponseCache
+    from actawp_client import ActawpClient
+
+    client = ActawpClient(cache=ResponseCache())
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+
+from poll_scheduler import current_phase
+
+CACHE_DIR = os.environ.get('ACTAWP_CACHE_DIR', '.actawp_cache')
+KEY_LENGTH = 32
+# Nom dels fitxers d'entrada (clau hexadecimal de ResponseCache.key)
+ENTRY_NAME = re.compile(rf'^[0-9a-f]{{{KEY_LENGTH}}}\.json$')
+
+# Temps de vida per tipus entre jornades (segons). Més llargs que l'interval del cron
+# perquè les execucions seguides (i update_rivals_database) els aprofitin
+DEFAULT_TTLS = {
+    'upcoming-matches': 3 * 3600,  # horaris i ajornaments
+    'last-results': 6 * 3600,      # canvia només quan s'ha jugat un partit
+    'ranking': 6 * 3600,
+    'stats': 24 * 3600,
+    'players': 24 * 3600,          # estadístiques de jugadors entre jornades
+    'calendar': 24 * 3600,
+    'match': 24 * 3600,            # actes tancades
+}
+
+# Temps de vida segons la fase de poll_scheduler (substitueixen els de DEFAULT_TTLS)
+PHASE_TTLS = {
+    'live': {
+        'upcoming-matches': 5 * 60, 'last-results': 5 * 60, 'ranking': 5 * 60,
+        'stats': 15 * 60, 'players': 15 * 60, 'calendar': 3600,
+    },
+    'after-match': {
+        'upcoming-matches': 30 * 60, 'last-results': 30 * 60, 'ranking': 30 * 60,
+        'stats': 30 * 60, 'players': 30 * 60, 'calendar': 3600,
+    },
+    'match-day': {
+        'upcoming-matches': 3600, 'last-results': 3600, 'ranking': 3600,
+        'stats': 2 * 3600, 'players': 2 * 3600, 'calendar': 6 * 3600,
+    },
+    'near-match': {
+        'upcoming-matches': 2 * 3600, 'last-results': 3 * 3600, 'ranking': 3 * 3600,
+        'stats': 6 * 3600, 'players': 6 * 3600,
+    },
+}
+
+# Pestanyes que queden desfasades quan canvien els últims resultats de l'equip
+DEPENDENT_TABS = ('players', 'stats')
+DEFAULT_TTL = 10 * 60
+
+MAX_BYTES = 50 * 1024 * 1024
+MAX_AGE = 7 * 24 * 3600
+
+
+class ResponseCache:
+
+    def __init__(self, directory=CACHE_DIR, ttls=None, max_bytes=MAX_BYTES, max_age=MAX_AGE, phase=None):
+        """phase: fase del calendari ('live', 'match-day'...). Per defecte ACTAWP_POLL_PHASE
+        (el workflow hi posa la de poll_scheduler) o la que es calcula dels JSON d'ACTAWP"""
+        self.directory = directory
+        self.phase = phase or os.environ.get('ACTAWP_POLL_PHASE') or current_phase()
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(PHASE_TTLS.get(self.phase, {}))
+        if ttls:
+            self.ttls.update(ttls)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def ttl_for(self, tab):
+        return self.ttls.get(tab, DEFAULT_TTL)
+
+    def key(self, url, tab=None, team_id=None):
+        raw = f"{url}|{tab or ''}|{team_id or ''}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:KEY_LENGTH]
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, url, tab=None, team_id=None):
+        """Retorna l'entrada guardada (fresca o no) o None"""
+        try:
+            with open(self.path(self.key(url, tab, team_id)), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry, tab=None):
+        return entry is not None and time.time() - entry.get('stored_at', 0) < self.ttl_for(tab)
+
+    def get(self, url, tab=None, team_id=None):
+        """Retorna l'entrada només si encara és fresca"""
+        entry = self.load(url, tab, team_id)
+        if self.is_fresh(entry, tab):
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def validators(self, entry):
+        """Capçaleres per a una petició condicional a partir d'una entrada caducada"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, url, body, tab=None, team_id=None, status=200, headers=None):
+        """Guarda una resposta. body pot ser text o un objecte JSON"""
+        headers = headers or {}
+        if tab == 'last-results' and team_id:
+            previous = self.load(url, tab, team_id)
+            if previous and previous.get('body') != body:
+                self.invalidate_dependents(url, team_id)
+        entry = {
+            'url': url,
+            'tab': tab,
+            'team_id': team_id,
+            'stored_at': time.time(),
+            'status': status,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'body': body
+        }
+        self.write(self.key(url, tab, team_id), entry)
+        return entry
+
+    def invalidate_dependents(self, url, team_id):
+        """Hi ha resultats nous: els jugadors i estadístiques de l'equip s'han de tornar a baixar.
+        Totes les pestanyes d'un equip comparteixen la URL change-tab"""
+        for tab in DEPENDENT_TABS:
+            self.remove(self.path(self.key(url, tab, team_id)))
+
+    def touch(self, url, entry, tab=None, team_id=None):
+        """Renova una entrada després d'un 304 Not Modified"""
+        self.revalidated += 1
+        entry['stored_at'] = time.time()
+        self.write(self.key(url, tab, team_id), entry)
+        return entry
+
+    def write(self, key, entry):
+        path = self.path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"  ⚠️ No s'ha pogut guardar a la cache: {e}")
+
+    def prune(self):
+        """Elimina entrades massa antigues i, si cal, les més velles fins a quedar sota max_bytes.
+        Només compta i esborra els fitxers d'entrada (ENTRY_NAME)"""
+        now = time.time()
+        files = []
+        for name in os.listdir(self.directory):
+            if not ENTRY_NAME.match(name):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+
+        removed = 0
+        total = 0
+        kept = []
+        for mtime, size, path in files:
+            if now - mtime > self.max_age:
+                removed += self.remove(path)
+            else:
+                kept.append((mtime, size, path))
+                total += size
+
+        kept.sort()
+        while kept and total > self.max_bytes:
+            mtime, size, path = kept.pop(0)
+            removed += self.remove(path)
+            total -= size
+
+        return removed
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+            return 1
+        except OSError:
+            return 0
+
+    def print_stats(self):
+        print(f"  💾 Cache (fase {self.phase}): {self.hits} encerts, {self.misses} fallades, {self.revalidated} revalidades (304)")
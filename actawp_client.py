@@ -0,0 +1,361 @@
+"""
+Client HTTP compartit per a ACTAWP
+- Pool de connexions ajustat i timeouts per petició (cap resposta lenta penja el cron)
+- Reintents amb backoff exponencial davant errors 5xx i errors de connexió
+- Limitador token-bucket compartit per tots els equips del procés
+- Límit global de peticions simultànies (ACTAWP_MAX_CONCURRENCY) per a molts equips en paral·lel
+- Comptadors de latència i bytes per endpoint
+- Cache de tokens CSRF per (team_id, language) amb refresc automàtic
+- Lectura del token CSRF en streaming: s'atura tan bon punt el troba, sense construir el DOM
+- Cache persistent opcional de respostes (actawp_cache.ResponseCache)
+- Gravació / reproducció de peticions per treballar sense xarxa (actawp_fixtures)
+
+Ús:
+    from actawp_client import ActawpClient
+
+    client = ActawpClient(cache=ResponseCache())
+    data = client.get_tab_content('15621224', 'players', 'ca')
+    client.print_stats()
+"""
+
+import codecs
+import json
+import os
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from actawp_fixtures import FixtureArchive
+from html_engine import CSRF_INPUT, make_soup
+
+BASE_URL = 'https://actawp.natacio.cat'
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+CSRF_PATTERN = re.compile(r'csrf_token["\']?\s*[:=]\s*["\']([^"\']+)["\']')
+CSRF_INPUT_PATTERN = re.compile(r'<input\b[^>]*\bname=["\']csrf_token["\'][^>]*>', re.IGNORECASE)
+VALUE_PATTERN = re.compile(r'\bvalue=["\']([^"\']*)["\']', re.IGNORECASE)
+
+# Lectura en streaming de la pàgina del token: mida dels blocs i solapament entre finestres
+CSRF_CHUNK_SIZE = 8192
+CSRF_OVERLAP = 1024
+
+
+class TokenBucket:
+    """Limitador de peticions token-bucket (thread-safe)"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)  # tokens per segon
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Bloqueja fins que hi ha un token disponible"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# Limitador compartit per tots els clients del procés (peticions/segon)
+RATE_LIMITER = TokenBucket(float(os.environ.get('ACTAWP_RATE_LIMIT', '4')))
+
+# Peticions en curs alhora per a tot el procés (equips x workers de rivals)
+CONCURRENCY = threading.BoundedSemaphore(int(os.environ.get('ACTAWP_MAX_CONCURRENCY', '8')))
+
+
+class CachedResponse:
+    """Resposta servida des de la cache amb la mateixa interfície bàsica que requests.Response"""
+
+    def __init__(self, url, entry):
+        self.url = url
+        self.status_code = entry.get('status', 200)
+        self.text = entry.get('body') or ''
+        self.content = self.text.encode('utf-8')
+        self.headers = {}
+        self.from_cache = True
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class ActawpClient:
+
+    # Temps de vida d'un token CSRF a la cache (segons)
+    CSRF_TOKEN_TTL = 20 * 60
+
+    def __init__(self, timeout=(5, 30), retries=3, backoff=0.5, pool_size=10, rate_limiter=None, cache=None, fixtures=None):
+        self.timeout = timeout  # (connexió, lectura)
+        self.rate_limiter = rate_limiter or RATE_LIMITER
+        self.cache = cache  # ResponseCache o None
+
+        # Gravació/reproducció (ACTAWP_RECORD / ACTAWP_REPLAY). Desactiva la cache perquè
+        # cada petició quedi gravada i la reproducció sigui determinista
+        self.fixtures = fixtures or FixtureArchive.from_env()
+        if self.fixtures:
+            self.cache = None
+
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT})
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'POST', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.csrf_tokens = {}  # (team_id, language) -> (token, timestamp)
+        self.stats = {}  # endpoint -> {'requests', 'cached', 'errors', 'bytes', 'seconds'}
+        self.stats_lock = threading.Lock()
+
+    def endpoint_name(self, url):
+        """Classifica una URL d'ACTAWP en un nom d'endpoint per a les estadístiques"""
+        if '/ajax/team/' in url:
+            return 'change-tab'
+        for name in ('ranking', 'calendar', 'match', 'team'):
+            if f'/{name}/' in url:
+                return name
+        return url.split('?')[0].rsplit('/', 1)[-1] or 'other'
+
+    def record(self, endpoint, seconds, size, error=False, cached=False):
+        """Acumula latència i bytes d'una petició"""
+        with self.stats_lock:
+            entry = self.stats.setdefault(endpoint, {'requests': 0, 'cached': 0, 'errors': 0, 'bytes': 0, 'seconds': 0.0})
+            if cached:
+                entry['cached'] += 1
+                return
+            entry['requests'] += 1
+            entry['bytes'] += size
+            entry['seconds'] += seconds
+            if error:
+                entry['errors'] += 1
+
+    def add_bytes(self, endpoint, size):
+        """Suma els bytes d'una resposta llegida en streaming"""
+        with self.stats_lock:
+            self.stats[endpoint]['bytes'] += size
+
+    def request(self, method, url, endpoint=None, **kwargs):
+        """Fa una petició amb límit de ritme, timeout i reintents. Llança l'excepció si no hi ha resposta"""
+        endpoint = endpoint or self.endpoint_name(url)
+        kwargs.setdefault('timeout', self.timeout)
+        replaying = self.fixtures is not None and self.fixtures.mode == 'replay'
+
+        if not replaying:
+            self.rate_limiter.acquire()
+        started = time.perf_counter()
+        try:
+            if replaying:
+                response = self.fixtures.replay(method, url, kwargs.get('data'))
+            else:
+                with CONCURRENCY:
+                    response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            self.record(endpoint, time.perf_counter() - started, 0, error=True)
+            raise
+
+        if self.fixtures is not None and not replaying:
+            self.fixtures.record(method, url, kwargs.get('data'), response)
+
+        # Amb stream=True el cos encara no s'ha llegit: qui el consumeix en suma els bytes (add_bytes)
+        size = 0 if kwargs.get('stream') else len(response.content)
+        self.record(endpoint, time.perf_counter() - started, size, error=response.status_code >= 400)
+        return response
+
+    def get(self, url, cache_tab=None, **kwargs):
+        """GET. Amb cache_tab (p.ex. 'ranking') passa per la cache persistent i revalida amb ETag/Last-Modified"""
+        if not (self.cache and cache_tab):
+            return self.request('GET', url, **kwargs)
+
+        entry = self.cache.load(url, cache_tab)
+        if self.cache.is_fresh(entry, cache_tab):
+            self.cache.hits += 1
+            self.record(self.endpoint_name(url), 0, 0, cached=True)
+            return CachedResponse(url, entry)
+
+        self.cache.misses += 1
+        headers = dict(kwargs.pop('headers', None) or {})
+        headers.update(self.cache.validators(entry))
+        response = self.request('GET', url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry:
+            return CachedResponse(url, self.cache.touch(url, entry, cache_tab))
+        if response.status_code == 200:
+            self.cache.put(url, response.text, cache_tab, headers=response.headers)
+        return response
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def get_csrf_token(self, team_id, language='es', force_refresh=False):
+        """Obté el token CSRF, reutilitzant el de la cache si no ha caducat"""
+        key = (str(team_id), language)
+
+        if not force_refresh:
+            cached = self.csrf_tokens.get(key)
+            if cached and time.time() - cached[1] < self.CSRF_TOKEN_TTL:
+                return cached[0]
+
+        url = f"{BASE_URL}/{language}/team/{team_id}"
+        try:
+            token = self.scan_csrf_token(url)
+        except requests.RequestException as e:
+            print(f"  ⚠️ Error obtenint token CSRF ({team_id}): {e}")
+            return None
+
+        if token:
+            self.csrf_tokens[key] = (token, time.time())
+        else:
+            self.csrf_tokens.pop(key, None)
+
+        return token
+
+    def scan_csrf_token(self, url):
+        """Llegeix la pàgina per blocs i retorna el token en quant apareix (la resta no es descarrega).
+        Si no el troba amb les expressions regulars, parseja només els <input name=csrf_token>"""
+        # En mode gravació cal la resposta sencera per desar-la a l'arxiu
+        stream = self.fixtures is None
+        response = self.request('GET', url, stream=stream)
+        decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+        parts = []
+        window = ''
+        read = 0
+        try:
+            for chunk in response.iter_content(CSRF_CHUNK_SIZE):
+                read += len(chunk)
+                text = decoder.decode(chunk)
+                parts.append(text)
+                window = window[-CSRF_OVERLAP:] + text
+                token = self.find_csrf_token(window)
+                if token:
+                    return token
+        finally:
+            response.close()
+            if stream:
+                self.add_bytes(self.endpoint_name(url), read)
+
+        soup = make_soup(''.join(parts), CSRF_INPUT)
+        csrf_input = soup.find('input')
+        return csrf_input.get('value') if csrf_input else None
+
+    def find_csrf_token(self, text):
+        match = CSRF_PATTERN.search(text)
+        if match:
+            return match.group(1)
+        match = CSRF_INPUT_PATTERN.search(text)
+        if match:
+            value = VALUE_PATTERN.search(match.group(0))
+            if value:
+                return value.group(1)
+        return None
+
+    def invalidate_csrf_token(self, team_id, language='es'):
+        """Elimina el token de la cache (p.ex. si el servidor l'ha rebutjat)"""
+        self.csrf_tokens.pop((str(team_id), language), None)
+
+    def post_tab(self, team_id, tab_name, csrf_token, language='es'):
+        """Fa la petició AJAX de canvi de pestanya. Retorna el JSON o None si falla"""
+        url = f"{BASE_URL}/{language}/ajax/team/{team_id}/change-tab"
+
+        data = {
+            'csrf_token': csrf_token,
+            'tab': tab_name
+        }
+
+        headers = {
+            'accept': '*/*',
+            'content-type': 'application/x-www-form-urlencoded; charset=UTF-8',
+            'x-requested-with': 'XMLHttpRequest',
+            'referer': f'{BASE_URL}/{language}/team/{team_id}'
+        }
+
+        try:
+            response = self.post(url, data=data, headers=headers)
+        except requests.RequestException as e:
+            print(f"  ⚠️ Error a la pestanya {tab_name} ({team_id}): {e}")
+            return None
+
+        if response.status_code != 200:
+            return None
+
+        try:
+            return response.json()
+        except ValueError:
+            return None
+
+    def get_tab_content(self, team_id, tab_name, language='es'):
+        """Obté el contingut d'una pestanya (de la cache persistent si encara és fresc)"""
+        tab_url = f"{BASE_URL}/{language}/ajax/team/{team_id}/change-tab"
+        if self.cache:
+            entry = self.cache.get(tab_url, tab_name, str(team_id))
+            if entry:
+                self.record('change-tab', 0, 0, cached=True)
+                return entry['body']
+
+        key = (str(team_id), language)
+        cached = self.csrf_tokens.get(key)
+
+        csrf_token = self.get_csrf_token(team_id, language)
+
+        if not csrf_token:
+            return None
+
+        data = self.post_tab(team_id, tab_name, csrf_token, language)
+
+        # Si el token de la cache ja no és vàlid, en demanem un de nou i reintentem
+        from_cache = cached is not None and self.csrf_tokens.get(key) is cached
+        if from_cache and (not data or data.get('code') != 0):
+            self.invalidate_csrf_token(team_id, language)
+            csrf_token = self.get_csrf_token(team_id, language, force_refresh=True)
+            if not csrf_token:
+                return None
+            data = self.post_tab(team_id, tab_name, csrf_token, language)
+
+        if self.cache and data and data.get('code') == 0:
+            self.cache.put(tab_url, data, tab_name, str(team_id))
+
+        return data
+
+    def print_stats(self):
+        """Mostra peticions, errors, latència mitjana i bytes per endpoint"""
+        with self.stats_lock:
+            stats = {k: dict(v) for k, v in self.stats.items()}
+
+        if not stats:
+            return
+
+        print("\n📡 PETICIONS ACTAWP:")
+        total_requests = 0
+        total_bytes = 0
+        for endpoint, s in sorted(stats.items()):
+            avg_ms = s['seconds'] / s['requests'] * 1000 if s['requests'] else 0
+            errors = f", {s['errors']} errors" if s['errors'] else ""
+            cached = f", {s['cached']} de cache" if s['cached'] else ""
+            print(f"  {endpoint:<12} {s['requests']:>4} peticions, {avg_ms:>7.0f} ms/petició, {s['bytes'] / 1024:>8.1f} KB{errors}{cached}")
+            total_requests += s['requests']
+            total_bytes += s['bytes']
+        print(f"  {'TOTAL':<12} {total_requests:>4} peticions, {total_bytes / 1024:>27.1f} KB")
+        if self.cache:
+            self.cache.print_stats()
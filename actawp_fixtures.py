@@ -0,0 +1,121 @@
+"""
+Mode gravació / reproducció de peticions HTTP per als parsers ACTAWP
+- Gravació: cada petició del client (ActawpClient) es desa a un arxiu .json.gz
+- Reproducció: les respostes es serveixen des de l'arxiu, sense xarxa
+- Coincidència per mètode, URL i dades del formulari (el csrf_token s'ignora)
+
+Ús (qualsevol script que faci servir ActawpClient):
+    ACTAWP_RECORD=fixtures/cadet.json.gz python ultra_robust_parser.py --no-cache
+    ACTAWP_REPLAY=fixtures/cadet.json.gz python ultra_robust_parser.py
+    ACTAWP_REPLAY=fixtures/cadet.json.gz python update_rivals_database.py cadet
+"""
+
+import atexit
+import gzip
+import json
+import os
+import threading
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Camps del formulari que canvien a cada execució i no han d'afectar la coincidència
+VOLATILE_FIELDS = {'csrf_token'}
+
+# Capçaleres de la resposta que es guarden (la resta no són útils per als parsers)
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+# Arxiu compartit per tots els clients del procés (vegeu FixtureArchive.from_env)
+_shared_archive = None
+_shared_lock = threading.Lock()
+
+
+class FixtureArchive:
+
+    def __init__(self, path, mode):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Mode de fixtures desconegut: {mode}")
+        self.path = path
+        self.mode = mode
+        self.entries = []
+        self.lock = threading.Lock()
+        self.served = {}  # clau -> nombre de vegades servida
+
+        if mode == 'replay':
+            self.load()
+            print(f"🎞️ Reproduint {len(self.entries)} respostes de {path}")
+        else:
+            print(f"🎙️ Gravant peticions a {path}")
+            atexit.register(self.save)
+
+    @classmethod
+    def from_env(cls):
+        """Arxiu del procés segons ACTAWP_RECORD / ACTAWP_REPLAY, o None si no n'hi ha cap"""
+        global _shared_archive
+        with _shared_lock:
+            if _shared_archive is None:
+                if os.environ.get('ACTAWP_REPLAY'):
+                    _shared_archive = cls(os.environ['ACTAWP_REPLAY'], 'replay')
+                elif os.environ.get('ACTAWP_RECORD'):
+                    _shared_archive = cls(os.environ['ACTAWP_RECORD'], 'record')
+            return _shared_archive
+
+    def match_key(self, method, url, data=None):
+        form = sorted((str(k), str(v)) for k, v in (data or {}).items() if k not in VOLATILE_FIELDS)
+        return json.dumps([method.upper(), url, form], ensure_ascii=False)
+
+    def load(self):
+        opener = gzip.open if self.path.endswith('.gz') else open
+        with opener(self.path, 'rt', encoding='utf-8') as f:
+            archive = json.load(f)
+        self.entries = archive.get('entries', [])
+        self.index = {}
+        for entry in self.entries:
+            key = self.match_key(entry['method'], entry['url'], entry.get('data'))
+            self.index.setdefault(key, []).append(entry)
+
+    def save(self):
+        with self.lock:
+            entries = list(self.entries)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        opener = gzip.open if self.path.endswith('.gz') else open
+        tmp_path = f"{self.path}.tmp"
+        with opener(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump({'version': 1, 'entries': entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def record(self, method, url, data, response):
+        """Afegeix una resposta real a l'arxiu"""
+        entry = {
+            'method': method.upper(),
+            'url': url,
+            'data': {k: v for k, v in (data or {}).items() if k not in VOLATILE_FIELDS},
+            'status': response.status_code,
+            'headers': {h: response.headers[h] for h in KEPT_HEADERS if h in response.headers},
+            'body': response.text
+        }
+        with self.lock:
+            self.entries.append(entry)
+
+    def replay(self, method, url, data=None):
+        """Retorna la resposta gravada. Les peticions repetides es serveixen en ordre (l'última es repeteix)"""
+        key = self.match_key(method, url, data)
+        candidates = self.index.get(key)
+        if not candidates:
+            raise requests.ConnectionError(f"Sense fixture per a {method.upper()} {url}")
+
+        with self.lock:
+            n = self.served.get(key, 0)
+            self.served[key] = n + 1
+        entry = candidates[min(n, len(candidates) - 1)]
+
+        response = requests.Response()
+        response.status_code = entry['status']
+        response._content = entry['body'].encode('utf-8')
+        response._content_consumed = True  # iter_content serveix el cos ja carregat
+        response.headers = CaseInsensitiveDict(entry.get('headers', {}))
+        response.encoding = 'utf-8'
+        response.url = url
+        return response
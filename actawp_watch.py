@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Dimoni ACTAWP per a execucions en un servidor propi (alternativa al cron del workflow)
+- Un sol procés: la sessió HTTP (connexions keep-alive) i la cache de tokens CSRF es mantenen vives
+- Cada secció del JSON es consulta amb el seu propi interval (resultats sovint, jugadors poc)
+- Compara en memòria amb l'última versió: només escriu actawp_<equip>_data.json (atòmicament)
+  i envia notificacions quan alguna secció ha canviat
+- Si una secció falla es conserva el valor anterior i es reintenta abans
+- Aturada neta amb SIGTERM / Ctrl+C (acaba la secció en curs) i fitxer de heartbeat
+
+Ús:
+    python actawp_watch.py                      # tots els equips
+    python actawp_watch.py cadet --no-notify
+    python actawp_watch.py --once               # una passada de totes les seccions i surt
+"""
+
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime
+
+from actawp_client import ActawpClient
+from notify_changes import notify_team_changes
+from team_registry import load_teams
+from ultra_robust_parser import ActawpParserV58, now_catalunya, save_json
+
+HEARTBEAT_FILE = os.environ.get('ACTAWP_WATCH_HEARTBEAT', os.path.join('.actawp_cache', 'watch_heartbeat.json'))
+
+# Interval de consulta de cada secció (segons), en l'ordre en què es descarreguen.
+# El calendari va primer perquè els resultats en necessiten les dates
+SECTION_INTERVALS = {
+    'calendar': 6 * 3600,
+    'upcoming_matches': 10 * 60,
+    'last_results': 10 * 60,
+    'ranking': 30 * 60,          # inclou la forma dels rivals (2 peticions per rival)
+    'team_stats': 3600,
+    'players': 3 * 3600,
+}
+RETRY_INTERVAL = 5 * 60          # secció fallida
+TICK = 15                        # resolució del bucle principal
+
+
+def fetch_section(parser, section, team_info, previous=None):
+    """Descarrega una secció d'un equip amb el parser. Retorna {clau: valor} o None.
+    previous: l'últim JSON de l'equip (la classificació hi reutilitza la forma dels rivals)"""
+    team_id = team_info['id']
+    language = team_info.get('language', 'es')
+    if section == 'calendar':
+        return parser.fetch_calendar(team_info['calendar_url']) if team_info.get('calendar_url') else None
+    if section == 'players':
+        return parser.fetch_players(team_id, language)
+    if section == 'team_stats':
+        return parser.fetch_team_stats(team_id, language)
+    if section == 'upcoming_matches':
+        return parser.fetch_upcoming_matches(team_id, language)
+    if section == 'last_results':
+        return parser.fetch_last_results(team_id, language)
+    if section == 'ranking':
+        if not team_info.get('ranking_url'):
+            return None
+        return parser.fetch_ranking(team_info['ranking_url'], language, (previous or {}).get('rivals_form'))
+    raise ValueError(f"Secció desconeguda: {section}")
+
+
+class TeamWatch:
+    """Estat d'un equip: últim JSON publicat i quan toca cada secció"""
+
+    def __init__(self, team_key, team_info, client):
+        self.team_key = team_key
+        self.team_info = team_info
+        self.filename = team_info['data_file']
+        # Un parser per equip (dates del calendari i correccions pròpies), tots amb el mateix client
+        self.parser = ActawpParserV58(client=client)
+        self.parser.current_team_key = team_key
+        self.data = self.load()
+        self.next_due = {section: 0 for section in SECTION_INTERVALS}
+        self.errors = 0
+
+    def load(self):
+        """Parteix del JSON ja publicat perquè reiniciar el dimoni no generi canvis ni notificacions"""
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def due_sections(self, now):
+        return [section for section, due in self.next_due.items() if due <= now]
+
+    def poll(self, section):
+        """Consulta una secció. Retorna {clau: valor} amb el que ha canviat (buit si res)"""
+        print(f"\n🔄 {self.team_key} · {section}")
+        try:
+            values = fetch_section(self.parser, section, self.team_info, self.data)
+        except Exception as e:
+            print(f"  ❌ Error: {e}")
+            traceback.print_exc()
+            values = None
+
+        if values is None:
+            self.errors += 1
+            self.next_due[section] = time.time() + min(RETRY_INTERVAL, SECTION_INTERVALS[section])
+            return {}
+
+        self.next_due[section] = time.time() + SECTION_INTERVALS[section]
+        changed = {key: value for key, value in values.items() if self.data.get(key) != value}
+        if changed:
+            print(f"  ✏️ Canvis: {', '.join(changed)}")
+        return changed
+
+    def publish(self, updates, notify=True):
+        """Escriu el JSON amb les seccions noves i notifica els canvis respecte de l'anterior"""
+        previous = self.data
+        data = dict(previous)
+        data['metadata'] = {
+            "source": "ACTAWP",
+            "team_key": self.team_key,
+            "team_id": self.team_info['id'],
+            "team_name": self.team_info['name'],
+            "coach": self.team_info['coach'],
+            "downloaded_at": datetime.now().isoformat(),
+            "parser_version": "6.3_calendar_dates"
+        }
+        data.update(updates)
+        data['last_update'] = now_catalunya().isoformat()
+
+        save_json(data, self.filename)
+        self.data = data
+        print(f"💾 Guardat: {self.filename}")
+
+        if notify and previous:
+            try:
+                notify_team_changes(self.team_key.upper(), previous, data)
+            except Exception as e:
+                print(f"⚠️ Error enviant notificacions (continuem): {e}")
+
+
+def write_heartbeat(path, watches, started_at, status='running'):
+    """Fitxer d'estat per a monitoratge: si 'updated_at' és antic, el dimoni està penjat"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    now = now_catalunya()
+    tz = now.tzinfo
+    heartbeat = {
+        'pid': os.getpid(),
+        'status': status,
+        'started_at': started_at,
+        'updated_at': now.isoformat(),
+        'teams': {
+            watch.team_key: {
+                'last_update': watch.data.get('last_update'),
+                'errors': watch.errors,
+                'next_due': {
+                    section: datetime.fromtimestamp(due, tz).isoformat(timespec='seconds') if due else 'ara'
+                    for section, due in watch.next_due.items()
+                }
+            }
+            for watch in watches
+        }
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(heartbeat, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Dimoni d'actualització de dades ACTAWP")
+    ap.add_argument('teams', nargs='*', help="Equips de teams.json (per defecte tots)")
+    ap.add_argument('--once', action='store_true', help="Una passada de totes les seccions i surt")
+    ap.add_argument('--no-notify', action='store_true', help="No enviar notificacions OneSignal")
+    ap.add_argument('--heartbeat', default=HEARTBEAT_FILE, help="Fitxer de heartbeat")
+    args = ap.parse_args()
+
+    try:
+        teams = load_teams(only=args.teams)
+    except ValueError as e:
+        ap.error(str(e))
+
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        print(f"\n🛑 Senyal {signal.Signals(signum).name}: s'atura en acabar la secció en curs")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    # Sense cache de disc: les seccions ja tenen el seu interval i cada consulta ha de ser fresca
+    client = ActawpClient()
+    watches = [TeamWatch(key, team_info, client) for key, team_info in teams.items()]
+    started_at = now_catalunya().isoformat()
+
+    print(f"👀 Vigilant {', '.join(w.team_key for w in watches)} (PID {os.getpid()})")
+    for section, interval in SECTION_INTERVALS.items():
+        print(f"   {section:<18} cada {interval // 60} min")
+
+    while not stop.is_set():
+        for watch in watches:
+            updates = {}
+            for section in watch.due_sections(time.time()):
+                if stop.is_set():
+                    break
+                updates.update(watch.poll(section))
+            if updates:
+                watch.publish(updates, notify=not args.no_notify)
+
+        write_heartbeat(args.heartbeat, watches, started_at)
+        if args.once:
+            break
+        stop.wait(TICK)
+
+    write_heartbeat(args.heartbeat, watches, started_at, status='stopped')
+    client.print_stats()
+    print("👋 Dimoni aturat")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Benchmark dels parsers ACTAWP
+- Temps (ops/s), pic de memòria i blocs de memòria retinguts (tracemalloc) per cas
+- Pàgines sintètiques amb l'estructura d'ACTAWP, incloent-hi versions ampliades
+  (calendari de 500 partits, plantilles de 40 jugadors)
+- Corpus a bench_corpus/ (jugadors, pròxims, resultats, classificació, calendari i acta), inclòs
+  per defecte: pàgines reconstruïdes a partir de les dades de la temporada del repositori, no
+  capturades; --capture <equip> les substitueix per les reals d'ACTAWP. També un altre directori
+  (--corpus) o un arxiu de fixtures gravat (ACTAWP_RECORD)
+- Compara amb bench_baseline.json i surt amb codi 1 si hi ha regressions. La memòria (pic i blocs
+  retinguts) es comprova sempre; la velocitat només amb --check-speed i relativa a un bucle de
+  calibratge (ops/s del cas / ops/s del calibratge), perquè no depengui de la màquina
+- --parity: comprova que tots els motors HTML (lxml / html.parser) donen el mateix resultat
+
+Ús:
+    python bench_parsers.py
+    python bench_parsers.py --corpus pagines_desades/ --fixtures fixtures/cadet.json.gz
+    python bench_parsers.py --save-baseline
+    python bench_parsers.py --tolerance 0.4 --min-time 1.0 --check-speed
+    python bench_parsers.py --capture cadet
+    python bench_parsers.py --engine html.parser
+    python bench_parsers.py --parity --corpus pagines_desades/
+"""
+
+import argparse
+import contextlib
+import gc
+import gzip
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import html_engine
+from actawp_client import BASE_URL, ActawpClient, CachedResponse
+from html_engine import make_soup
+from table_schema import MATCH_ID
+from team_registry import load_teams
+from ultra_robust_parser import ActawpParserV58
+from update_rivals_database import RivalsUpdater
+
+BASELINE_FILE = 'bench_baseline.json'
+CORPUS_DIR = 'bench_corpus'
+
+TEAMS = [
+    'C.N. SABADELL', 'C.E. MEDITERRANI', 'C.N. SANT ANDREU A', "U.E. D'HORTA",
+    'C.N. ATL BARCELONETA', 'C.N. BARCELONA A', 'C.N. POBLE NOU A', 'CN TERRASSA',
+    'C.N. MONTJUIC', 'C.N. MANRESA', 'C.N. MOLINS DE REI', 'C.N. CATALUNYA'
+]
+
+PLAYER_HEADERS = [
+    ('Nom', 'Nom'), ('Partits jugats', 'PJ'), ('Total goals', 'GT'), ('Gols', 'G'),
+    ('Gols penal', 'GP'), ('Targetes grogues', 'TA'), ('Expulsions per 20 segons', 'EX'),
+    ('Faltes per penal', 'P'), ('Penals fallats', 'PF'), ('MVP', 'MVP')
+]
+
+
+class PageClient:
+    """Client que serveix sempre la mateixa pàgina (per als parsers que fan GET)"""
+
+    def __init__(self, html):
+        self.session = None
+        self.response = CachedResponse('', {'status': 200, 'body': html})
+
+    def get(self, url, **kwargs):
+        return self.response
+
+
+# Pàgines sintètiques
+
+def match_row(i, with_score=True):
+    team1 = TEAMS[i % len(TEAMS)]
+    team2 = TEAMS[(i + 5) % len(TEAMS)]
+    middle = (f'<span data-sort="17{i:08d}">Dis, {1 + i % 28:02d}/{1 + i % 12:02d}/2026 12:{i % 60:02d}'
+              f'<span class="ellipsis" title="Piscina Municipal {i}">Piscina Municipal {i}</span></span>')
+    if with_score:
+        middle += f'<span class="result">{i % 17} - {(i * 7) % 13}</span>'
+    return (
+        f'<tr><td class="colstyle-equipo-1"><a href="/ca/tournament/1317474/match/{143260000 + i}/results">'
+        f'<img src="/media/logo_{i}.png"><span class="ellipsis">Veure{team1}</span></a></td>'
+        f'<td class="colstyle-resultado">{middle}</td>'
+        f'<td class="colstyle-equipo-2"><a href="/ca/tournament/1317474/match/{143260000 + i}/results">'
+        f'<span class="ellipsis">{team2}</span><img src="/media/logo_{i + 1}.png"></a></td></tr>'
+    )
+
+
+def matches_page(n, with_score=True):
+    rows = ''.join(match_row(i, with_score) for i in range(n))
+    return (f'<div class="table-responsive"><table class="table"><thead><tr><th>Local</th><th></th>'
+            f'<th>Visitant</th></tr></thead><tbody>{rows}</tbody></table></div>')
+
+
+def players_page(n):
+    ths = ''.join(f'<th title="{title}"><span title="{title}">{short}</span></th>' for title, short in PLAYER_HEADERS)
+    rows = []
+    for i in range(n):
+        cells = ''.join(f'<td>{(i * k) % 11 if k % 4 else "-"}</td>' for k in range(1, len(PLAYER_HEADERS)))
+        rows.append(f'<tr><td><a href="/ca/player/{i}"><span>Veure</span></a> JUGADOR{i} COGNOM{i} SEGON</td>{cells}</tr>')
+    return (f'<div class="table-responsive"><table class="table"><thead><tr>{ths}</tr></thead>'
+            f'<tbody>{"".join(rows)}</tbody></table><table><tr><td>Total</td></tr></table></div>')
+
+
+def ranking_page(n):
+    rows = []
+    for i in range(n):
+        team = TEAMS[i % len(TEAMS)]
+        stats = ''.join(f'<td>{v}</td>' for v in [3 * (n - i), n, n - i, 0, i, 200 - i, 100 + i, 100 - 2 * i])
+        rows.append(f'<tr><td>{i + 1}</td><td><a href="/ca/team/{15621000 + i}" title="{team}">'
+                    f'<img src="/media/logo_{i}.png"><span>Veure</span> {team}</a></td>{stats}</tr>')
+    return (f'<html><head><title>Classificació</title></head><body><nav>{"<a>menu</a>" * 30}</nav>'
+            f'<table><thead><tr><th>#</th><th>Equip</th></tr></thead><tbody>{"".join(rows)}</tbody></table></body></html>')
+
+
+def calendar_page(n):
+    blocks = []
+    for start in range(0, n, 6):
+        rows = ''.join(match_row(i) for i in range(start, min(n, start + 6)))
+        blocks.append(f'<h3>Jornada {start // 6 + 1}</h3><table class="table"><tbody>{rows}</tbody></table>')
+    return f'<html><body><nav>{"<a>menu</a>" * 30}</nav>{"".join(blocks)}</body></html>'
+
+
+def acta_page(n, home='CN TERRASSA', away="U.E. D'HORTA", filler=300):
+    def roster(team):
+        rows = ''.join(
+            f'<tr><td>{"G" if i == 0 else ""}</td><td></td><td>{i + 1}</td>'
+            f'<td><a>Veure</a>{team.split()[-1]} JUGADOR {i + 1}</td><td>0</td><td>1</td><td>0</td></tr>'
+            for i in range(n)
+        )
+        return (f'<div class="team"><h4>{team}</h4><span>Gols igualtat: 3</span><table><thead><tr><th>T</th><th>C</th>'
+                f'<th>Dorsal</th><th>Nom</th><th>G</th><th>GS</th><th>E</th></tr></thead><tbody>{rows}</tbody></table></div>')
+
+    filler_html = '<div class="row"><span>Informació</span><div><span>del partit</span></div></div>' * filler
+    return (f'<html><body><h1>{home} - {away}</h1>{filler_html}<div class="score">12 - 8</div>'
+            f'{roster(home)}{filler_html}{roster(away)}</body></html>')
+
+
+def synthetic_corpus():
+    """Casos sintètics: (nom, tipus, html)"""
+    return [
+        ('players_15', 'players', players_page(15)),
+        ('players_40', 'players', players_page(40)),
+        ('upcoming_10', 'upcoming', matches_page(10, with_score=False)),
+        ('last_results_10', 'last_results', matches_page(10)),
+        ('last_results_100', 'last_results', matches_page(100)),
+        ('ranking_12', 'ranking', ranking_page(12)),
+        ('calendar_60', 'calendar', calendar_page(60)),
+        ('calendar_500', 'calendar', calendar_page(500)),
+        ('header_text_players_40', 'header_text', players_page(40)),
+        ('acta_roster_14', 'acta', acta_page(14)),
+        ('acta_roster_40', 'acta', acta_page(40, filler=1500)),
+    ]
+
+
+# Pàgines reals
+
+KINDS = ('players', 'upcoming', 'last_results', 'ranking', 'calendar', 'acta')
+
+TAB_KINDS = {'players': 'players', 'upcoming-matches': 'upcoming', 'last-results': 'last_results'}
+
+
+def directory_corpus(directory):
+    """Fitxers <tipus>*.html d'un directori (p.ex. players_cadet.html, acta_143260144.html)"""
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.html'):
+            continue
+        kind = next((k for k in KINDS if name.startswith(k)), None)
+        if not kind:
+            print(f"⚠️ Tipus desconegut, s'ignora: {name}")
+            continue
+        with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+            corpus.append((f"corpus_{name[:-5]}", kind, f.read()))
+    return corpus
+
+
+def capture_corpus(directory, team_key):
+    """Baixa d'ACTAWP una pàgina de cada tipus de l'equip i les desa a directory. Retorna els fitxers"""
+    team = load_teams(only=[team_key])[team_key]
+    client = ActawpClient()
+    language = team['language']
+    pages = {}
+
+    for tab, kind in TAB_KINDS.items():
+        data = client.get_tab_content(team['id'], tab, language)
+        if data and data.get('code') == 0:
+            pages[f"{kind}_{team_key}"] = data.get('content', '')
+        else:
+            print(f"⚠️ No s'ha pogut baixar la pestanya {tab}")
+
+    for kind in ('ranking', 'calendar'):
+        url = team.get(f"{kind}_url")
+        if not url:
+            continue
+        response = client.get(url)
+        if response.status_code == 200:
+            pages[f"{kind}_{team_key}"] = response.text
+        else:
+            print(f"⚠️ {kind}: HTTP {response.status_code}")
+
+    # Acta de l'últim partit jugat
+    match = MATCH_ID.search(pages.get(f"last_results_{team_key}", ''))
+    if match:
+        response = client.get(f"{BASE_URL}/{language}/match/{match.group(1)}/stats")
+        if response.status_code == 200:
+            pages[f"acta_{match.group(1)}"] = response.text
+
+    os.makedirs(directory, exist_ok=True)
+    written = []
+    for name, html in sorted(pages.items()):
+        path = os.path.join(directory, f"{name}.html")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(html)
+        written.append(path)
+    return written
+
+
+def fixtures_corpus(path):
+    """Pàgines d'un arxiu gravat amb ACTAWP_RECORD"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        entries = json.load(f).get('entries', [])
+
+    corpus = []
+    for n, entry in enumerate(entries):
+        url = entry['url']
+        if entry['status'] != 200:
+            continue
+        if '/change-tab' in url:
+            kind = TAB_KINDS.get(entry.get('data', {}).get('tab'))
+            if not kind:
+                continue
+            try:
+                html = json.loads(entry['body']).get('content', '')
+            except ValueError:
+                continue
+        elif '/ranking/' in url:
+            kind, html = 'ranking', entry['body']
+        elif '/calendar/' in url:
+            kind, html = 'calendar', entry['body']
+        elif '/match/' in url:
+            kind, html = 'acta', entry['body']
+        else:
+            continue
+        corpus.append((f"fixture_{kind}_{n}", kind, html))
+    return corpus
+
+
+# Execució
+
+def make_case(kind, html):
+    """Retorna una funció sense arguments que executa el parser corresponent sobre html"""
+    parser = ActawpParserV58(rivals_workers=1, client=PageClient(html))
+
+    if kind == 'players':
+        return lambda: parser.parse_players(html)
+    if kind == 'upcoming':
+        return lambda: parser.parse_upcoming_matches(html)
+    if kind == 'last_results':
+        return lambda: parser.parse_last_results(html)
+    if kind == 'ranking':
+        return lambda: parser.parse_ranking('https://actawp.natacio.cat/ca/tournament/0/ranking/0')
+    if kind == 'calendar':
+        return lambda: parser.parse_calendar('https://actawp.natacio.cat/ca/tournament/0/calendar/0/all')
+    if kind == 'header_text':
+        ths = make_soup(html).find_all('th')
+        return lambda: [parser.extract_header_text(th) for th in ths]
+    if kind == 'acta':
+        updater = RivalsUpdater(use_cache=False)
+        updater.client = PageClient(html)
+        return lambda: updater.extract_roster_from_match('https://actawp.natacio.cat/ca/match/0/stats', "U.E. D'HORTA")
+    raise ValueError(f"Tipus desconegut: {kind}")
+
+
+def measure(func, min_time, repeats=5):
+    """Executa func en repeats tandes de min_time/repeats segons i es queda la millor. Retorna mètriques"""
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink):
+        func()  # escalfament
+
+        # Temps: la millor tanda és la menys afectada pel soroll (GC, altres processos)
+        best = None
+        for _ in range(repeats):
+            gc.collect()
+            runs = 0
+            started = time.perf_counter()
+            while True:
+                func()
+                runs += 1
+                elapsed = time.perf_counter() - started
+                if elapsed >= min_time / repeats and runs >= 2:
+                    break
+                sink.seek(0)
+                sink.truncate()
+            per_op = elapsed / runs
+            best = per_op if best is None else min(best, per_op)
+
+        # Memòria: pic durant una execució i blocs que continuen vius en acabar
+        gc.collect()
+        tracemalloc.start()
+        before_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+        after_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+        tracemalloc.stop()
+        del result
+
+    return {
+        'ops_per_sec': round(1 / best, 2),
+        'ms_per_op': round(best * 1000, 3),
+        'peak_kb': round(peak / 1024, 1),
+        'blocks': after_blocks - before_blocks
+    }
+
+
+def calibration_loop():
+    """Feina fixa en Python pur (diccionaris, cadenes i ordenació) per normalitzar la velocitat"""
+    rows = [{'name': f"JUGADOR {i}", 'goals': (i * 7) % 13, 'team': TEAMS[i % len(TEAMS)]} for i in range(2000)]
+    rows.sort(key=lambda r: (-r['goals'], r['name']))
+    return '|'.join(f"{r['team']}:{r['name']}" for r in rows[:500]).upper().split('|')
+
+
+def parity(corpus):
+    """Executa cada cas amb tots els motors disponibles i retorna els casos amb resultats diferents"""
+    engines = html_engine.available_engines()
+    mismatches = []
+    for name, kind, html in corpus:
+        outputs = {}
+        for engine in engines:
+            previous = html_engine.set_engine(engine)
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    outputs[engine] = json.dumps(make_case(kind, html)(), sort_keys=True, ensure_ascii=False, default=str)
+            finally:
+                html_engine.set_engine(previous)
+        same = len(set(outputs.values())) == 1
+        print(f"  {'✅' if same else '❌'} {name}")
+        if not same:
+            mismatches.append(name)
+    return mismatches
+
+
+def compare(results, baseline, tolerance, check_speed=False):
+    """Llista de regressions respecte a la línia base. La memòria sempre; la velocitat relativa
+    al calibratge només amb check_speed"""
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if r['peak_kb'] > base['peak_kb'] * (1 + tolerance):
+            regressions.append(f"{name}: pic {r['peak_kb']} KB (base {base['peak_kb']} KB)")
+        if r['blocks'] > max(base['blocks'] * (1 + tolerance), base['blocks'] + 100):
+            regressions.append(f"{name}: {r['blocks']} blocs retinguts (base {base['blocks']})")
+        if check_speed and base.get('relative_speed') and r['relative_speed'] < base['relative_speed'] * (1 - tolerance):
+            regressions.append(f"{name}: velocitat relativa {r['relative_speed']} (base {base['relative_speed']})")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Benchmark dels parsers ACTAWP')
+    ap.add_argument('--corpus', default=CORPUS_DIR, help=f"Directori amb pàgines HTML desades (<tipus>*.html, per defecte {CORPUS_DIR})")
+    ap.add_argument('--capture', metavar='EQUIP', help="Baixa les pàgines de l'equip de teams.json al directori del corpus")
+    ap.add_argument('--check-speed', action='store_true', help="Comprova també la velocitat (relativa al calibratge)")
+    ap.add_argument('--fixtures', help="Arxiu gravat amb ACTAWP_RECORD")
+    ap.add_argument('--only', help="Només els casos que contenen aquest text")
+    ap.add_argument('--min-time', type=float, default=1.0, help="Segons mínims per cas")
+    ap.add_argument('--baseline', default=BASELINE_FILE)
+    ap.add_argument('--tolerance', type=float, default=0.3, help="Regressió tolerada (0.3 = 30%%)")
+    ap.add_argument('--save-baseline', action='store_true', help="Guarda els resultats com a nova línia base")
+    ap.add_argument('--json', help="Escriu els resultats en aquest fitxer")
+    ap.add_argument('--engine', choices=html_engine.ENGINES, help="Motor HTML (per defecte lxml si està instal·lat)")
+    ap.add_argument('--parity', action='store_true', help="Compara els resultats de tots els motors HTML")
+    args = ap.parse_args()
+
+    if args.engine:
+        html_engine.set_engine(args.engine)
+
+    if args.capture:
+        written = capture_corpus(args.corpus, args.capture)
+        print(f"💾 {len(written)} pàgines desades a {args.corpus}: {', '.join(os.path.basename(p) for p in written)}")
+        return 0 if written else 1
+
+    corpus = synthetic_corpus()
+    if args.corpus and os.path.isdir(args.corpus):
+        corpus += directory_corpus(args.corpus)
+    if args.fixtures:
+        corpus += fixtures_corpus(args.fixtures)
+    if args.only:
+        corpus = [c for c in corpus if args.only in c[0]]
+
+    if args.parity:
+        print(f"\n🔍 PARITAT DE MOTORS HTML: {', '.join(html_engine.available_engines())} ({len(corpus)} casos)\n")
+        mismatches = parity(corpus)
+        if mismatches:
+            print(f"\n❌ {len(mismatches)} casos amb resultats diferents: {', '.join(mismatches)}")
+            return 1
+        print("\n✅ Tots els motors donen resultats idèntics")
+        return 0
+
+    print(f"\n⏱️ BENCHMARK PARSERS ACTAWP ({len(corpus)} casos, motor {html_engine.ENGINE})\n")
+    print(f"  {'cas':<28} {'ops/s':>10} {'ms/op':>10} {'pic KB':>10} {'blocs':>8}")
+
+    results = {}
+    for name, kind, html in corpus:
+        with contextlib.redirect_stdout(io.StringIO()):
+            func = make_case(kind, html)
+        # Calibratge just abans i després del cas: el soroll de la màquina afecta igual els dos
+        before = measure(calibration_loop, args.min_time / 4)
+        r = measure(func, args.min_time)
+        after = measure(calibration_loop, args.min_time / 4)
+        calibration = max(before['ops_per_sec'], after['ops_per_sec'])
+        r['kind'] = kind
+        r['html_kb'] = round(len(html.encode('utf-8')) / 1024, 1)
+        r['relative_speed'] = round(r['ops_per_sec'] / calibration, 4)
+        results[name] = r
+        print(f"  {name:<28} {r['ops_per_sec']:>10.1f} {r['ms_per_op']:>10.3f} {r['peak_kb']:>10.1f} {r['blocks']:>8}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\n💾 Línia base guardada: {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"\nℹ️ Sense línia base ({args.baseline}). Crea-la amb --save-baseline")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance, args.check_speed)
+    if regressions:
+        print(f"\n❌ REGRESSIONS (tolerància {args.tolerance:.0%}{', amb velocitat' if args.check_speed else ''}):")
+        for r in regressions:
+            print(f"  - {r}")
+        return 1
+
+    print(f"\n✅ Sense regressions respecte a {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Base de dades SQLite per a anàlisi (analytics.db)
+- Ingesta dels cnt_stats_*.json, actawp_*_data.json i rivals_database_*.json
+- Taules normalitzades: partits, parcials, esdeveniments, estadístiques per jugador i partit,
+  alineacions, canvis, presència a l'aigua (trams per jugador), classificació/resultats ACTAWP
+  i plantilles dels rivals
+- Idempotent: cada fitxer es desa amb el hash del contingut i només es tornen a carregar
+  els que han canviat (i s'esborren els que ja no hi són)
+
+Ús:
+    python build_analytics_db.py
+    python build_analytics_db.py --query "SELECT type, COUNT(*) FROM events GROUP BY type"
+
+Exemple: gols encaixats amb el jugador 7 a l'aigua
+    SELECT COUNT(*) FROM events e
+    JOIN presence p ON p.match_key = e.match_key AND p.quarter = e.quarter
+     AND e.timestamp >= p.start_ts AND e.timestamp < p.end_ts
+    WHERE e.type = 'goal' AND e.team = 'rival' AND p.player_num = 7
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+DB_FILE = 'analytics.db'
+
+SOURCES = (
+    ('match', 'cnt_stats_*.json'),
+    ('actawp', 'actawp_*_data.json'),
+    ('rivals', 'rivals_database_*.json'),
+)
+
+# Subtipus de cada tipus d'acció (un sol camp 'detail')
+DETAIL_FIELDS = ('goalType', 'exclusionType', 'actionType', 'saveType', 'result')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS source_files (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS matches (
+    match_key TEXT PRIMARY KEY,
+    source_file TEXT NOT NULL,
+    season TEXT,
+    team TEXT,
+    date TEXT,
+    rival TEXT,
+    location TEXT,
+    score_cnt INTEGER,
+    score_rival INTEGER,
+    timeouts_cnt INTEGER,
+    timeouts_rival INTEGER,
+    observations TEXT
+);
+
+CREATE TABLE IF NOT EXISTS period_scores (
+    match_key TEXT NOT NULL,
+    quarter TEXT NOT NULL,
+    cnt INTEGER,
+    rival INTEGER,
+    PRIMARY KEY (match_key, quarter)
+);
+
+CREATE TABLE IF NOT EXISTS events (
+    match_key TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    timestamp INTEGER,
+    quarter TEXT,
+    type TEXT,
+    detail TEXT,
+    team TEXT,
+    player_num INTEGER,
+    player_name TEXT,
+    goal_zone TEXT,
+    field_zone TEXT,
+    goalkeeper_num INTEGER,
+    foul_on INTEGER,
+    PRIMARY KEY (match_key, seq)
+);
+
+CREATE TABLE IF NOT EXISTS water_changes (
+    match_key TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    timestamp INTEGER,
+    quarter TEXT,
+    team TEXT,
+    player_num INTEGER,
+    player_name TEXT,
+    action TEXT,
+    PRIMARY KEY (match_key, seq)
+);
+
+CREATE TABLE IF NOT EXISTS lineups (
+    match_key TEXT NOT NULL,
+    quarter TEXT NOT NULL,
+    player_num INTEGER NOT NULL,
+    PRIMARY KEY (match_key, quarter, player_num)
+);
+
+-- Trams a l'aigua: alineació inicial de cada quart + canvis (start_ts inclòs, end_ts exclòs)
+CREATE TABLE IF NOT EXISTS presence (
+    match_key TEXT NOT NULL,
+    quarter TEXT NOT NULL,
+    player_num INTEGER NOT NULL,
+    start_ts INTEGER NOT NULL,
+    end_ts INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS player_match_stats (
+    match_key TEXT NOT NULL,
+    team TEXT NOT NULL,
+    player_num INTEGER NOT NULL,
+    player_name TEXT,
+    goals INTEGER,
+    exclusions INTEGER,
+    penalty_missed INTEGER,
+    assists INTEGER,
+    saves INTEGER,
+    steals INTEGER,
+    turnovers INTEGER,
+    missed_shots INTEGER,
+    blocks INTEGER,
+    goals_conceded INTEGER,
+    stats_json TEXT,
+    PRIMARY KEY (match_key, team, player_num)
+);
+
+CREATE TABLE IF NOT EXISTS actawp_results (
+    source_file TEXT NOT NULL,
+    team_key TEXT,
+    jornada INTEGER,
+    team1 TEXT,
+    team2 TEXT,
+    score TEXT,
+    date TEXT,
+    url TEXT
+);
+
+CREATE TABLE IF NOT EXISTS actawp_upcoming (
+    source_file TEXT NOT NULL,
+    team_key TEXT,
+    jornada INTEGER,
+    team1 TEXT,
+    team2 TEXT,
+    date TEXT,
+    time TEXT,
+    url TEXT
+);
+
+CREATE TABLE IF NOT EXISTS actawp_ranking (
+    source_file TEXT NOT NULL,
+    team_key TEXT,
+    position INTEGER,
+    team TEXT,
+    team_id TEXT,
+    points INTEGER,
+    played INTEGER,
+    won INTEGER,
+    drawn INTEGER,
+    lost INTEGER,
+    goals_for INTEGER,
+    goals_against INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS actawp_players (
+    source_file TEXT NOT NULL,
+    team_key TEXT,
+    player_name TEXT,
+    stats_json TEXT
+);
+
+CREATE TABLE IF NOT EXISTS rival_rosters (
+    source_file TEXT NOT NULL,
+    team TEXT NOT NULL,
+    player_num INTEGER,
+    player_name TEXT,
+    last_played TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_events_player_match ON events (player_num, match_key);
+CREATE INDEX IF NOT EXISTS idx_events_match_quarter_ts ON events (match_key, quarter, timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_type ON events (type);
+CREATE INDEX IF NOT EXISTS idx_stats_player_match ON player_match_stats (player_num, match_key);
+CREATE INDEX IF NOT EXISTS idx_water_match_quarter_ts ON water_changes (match_key, quarter, timestamp);
+CREATE INDEX IF NOT EXISTS idx_presence_player_match ON presence (player_num, match_key, quarter);
+CREATE INDEX IF NOT EXISTS idx_presence_match_quarter ON presence (match_key, quarter, start_ts);
+"""
+
+# Taules amb les files de cada tipus de fitxer (per esborrar-les abans de recarregar-lo)
+MATCH_TABLES = ('period_scores', 'events', 'water_changes', 'lineups', 'presence', 'player_match_stats')
+ACTAWP_TABLES = ('actawp_results', 'actawp_upcoming', 'actawp_ranking', 'actawp_players')
+RIVAL_TABLES = ('rival_rosters',)
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def match_key_of(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def presence_stints(lineups, water_changes, actions):
+    """Trams (quart, dorsal, inici, fi) a l'aigua dels jugadors de CN Terrassa.
+    Els límits de cada quart són el primer i l'últim esdeveniment registrat"""
+    bounds = {}
+    for action in actions:
+        ts = as_int(action.get('timestamp'))
+        quarter = action.get('quarter')
+        if ts is None or not quarter:
+            continue
+        low, high = bounds.get(quarter, (ts, ts))
+        bounds[quarter] = (min(low, ts), max(high, ts))
+
+    stints = []
+    for quarter, (start, end) in bounds.items():
+        end += 1
+        on_water = {as_int(num): start for num in lineups.get(quarter, []) if as_int(num) is not None}
+        for change in water_changes:
+            if change.get('quarter') != quarter or change.get('team', 'cnt') != 'cnt':
+                continue
+            num = as_int(change.get('playerNum'))
+            ts = as_int(change.get('timestamp'))
+            if num is None or ts is None:
+                continue
+            if change.get('action') == 'out' and num in on_water:
+                stints.append((quarter, num, on_water.pop(num), ts))
+            elif change.get('action') == 'in' and num not in on_water:
+                on_water[num] = ts
+        stints.extend((quarter, num, since, end) for num, since in on_water.items())
+    return stints
+
+
+def ingest_match(db, path, data):
+    key = match_key_of(path)
+    db.execute(
+        "INSERT INTO matches VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (key, path, data.get('temporada'), data.get('equip'), (data.get('data') or '')[:10],
+         data.get('rivalTeam'), data.get('matchLocation'), as_int(data.get('scoreCNT')),
+         as_int(data.get('scoreRival')), as_int(data.get('tempsMortCNT')),
+         as_int(data.get('tempsMortRival')), data.get('observacions') or None)
+    )
+    db.executemany(
+        "INSERT INTO period_scores VALUES (?, ?, ?, ?)",
+        [(key, quarter, as_int(s.get('cnt')), as_int(s.get('rival'))) for quarter, s in (data.get('periodScores') or {}).items()]
+    )
+
+    actions = data.get('chronologicalActions') or []
+    events = []
+    changes = []
+    for seq, a in enumerate(actions):
+        if a.get('type') == 'water-change':
+            changes.append((key, seq, as_int(a.get('timestamp')), a.get('quarter'), a.get('team'),
+                            as_int(a.get('playerNum')), a.get('playerName'), a.get('action')))
+            continue
+        detail = next((a[f] for f in DETAIL_FIELDS if a.get(f)), None)
+        events.append((key, seq, as_int(a.get('timestamp')), a.get('quarter'), a.get('type'), detail,
+                       a.get('team'), as_int(a.get('playerNum')), a.get('playerName'), a.get('goalZone'),
+                       a.get('fieldZone'), as_int(a.get('goalkeeperNum')), as_int(a.get('faltaSobreJugador'))))
+    db.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", events)
+    db.executemany("INSERT INTO water_changes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", changes)
+
+    lineups = data.get('lineups') or {}
+    db.executemany(
+        "INSERT OR IGNORE INTO lineups VALUES (?, ?, ?)",
+        [(key, quarter, as_int(num)) for quarter, nums in lineups.items() for num in nums if as_int(num) is not None]
+    )
+    water = [a for a in actions if a.get('type') == 'water-change']
+    db.executemany(
+        "INSERT INTO presence VALUES (?, ?, ?, ?, ?)",
+        [(key,) + stint for stint in presence_stints(lineups, water, actions)]
+    )
+
+    stats = []
+    for p in data.get('jugadors') or []:
+        s = p.get('estadistiques') or {}
+        stats.append((key, 'cnt', as_int(p.get('numero')), p.get('nom'), s.get('gols'), s.get('exclusions'),
+                      s.get('penaltyMissed'), s.get('assistencies'), s.get('parades'), s.get('robatoris'),
+                      s.get('perdues'), s.get('xutsFallats'), s.get('blocatges'), s.get('golsRebuts'),
+                      json.dumps(s, ensure_ascii=False)))
+    for p in data.get('rivalStats') or []:
+        stats.append((key, 'rival', as_int(p.get('num')), p.get('name'), p.get('gols'), p.get('exclusions'),
+                      p.get('penaltyMissed'), p.get('assistencies'), p.get('parades'), p.get('robatoris'),
+                      p.get('perdues'), p.get('xutsFallats'), p.get('blocks'), None,
+                      json.dumps(p, ensure_ascii=False)))
+    db.executemany("INSERT OR REPLACE INTO player_match_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", stats)
+
+
+def ingest_actawp(db, path, data):
+    team_key = (data.get('metadata') or {}).get('team_key')
+    db.executemany(
+        "INSERT INTO actawp_results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [(path, team_key, as_int(r.get('jornada')), r.get('team1'), r.get('team2'), r.get('score'),
+          r.get('date'), r.get('url')) for r in data.get('last_results') or []]
+    )
+    db.executemany(
+        "INSERT INTO actawp_upcoming VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [(path, team_key, as_int(m.get('jornada')), m.get('team1'), m.get('team2'), m.get('date'),
+          m.get('time'), m.get('url')) for m in data.get('upcoming_matches') or []]
+    )
+    db.executemany(
+        "INSERT INTO actawp_ranking VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [(path, team_key, as_int(t.get('posicio')), t.get('equip'), t.get('team_id'), t.get('punts'),
+          t.get('partits'), t.get('guanyats'), t.get('empatats'), t.get('perduts'), t.get('gols_favor'),
+          t.get('gols_contra')) for t in data.get('ranking') or []]
+    )
+    db.executemany(
+        "INSERT INTO actawp_players VALUES (?, ?, ?, ?)",
+        [(path, team_key, p.get('Nombre'), json.dumps(p, ensure_ascii=False)) for p in data.get('players') or []]
+    )
+
+
+def ingest_rivals(db, path, data):
+    rows = []
+    for team, info in (data.get('teams') or {}).items():
+        for p in info.get('players') or []:
+            rows.append((path, team, as_int(p.get('num')), p.get('name'), info.get('lastPlayed')))
+    db.executemany("INSERT INTO rival_rosters VALUES (?, ?, ?, ?, ?)", rows)
+
+
+INGESTERS = {
+    'match': (ingest_match, MATCH_TABLES),
+    'actawp': (ingest_actawp, ACTAWP_TABLES),
+    'rivals': (ingest_rivals, RIVAL_TABLES),
+}
+
+
+def remove_source(db, path, kind):
+    """Esborra totes les files que provenen d'un fitxer"""
+    if kind == 'match':
+        key = match_key_of(path)
+        for table in MATCH_TABLES:
+            db.execute(f"DELETE FROM {table} WHERE match_key = ?", (key,))
+        db.execute("DELETE FROM matches WHERE match_key = ?", (key,))
+    else:
+        for table in INGESTERS[kind][1]:
+            db.execute(f"DELETE FROM {table} WHERE source_file = ?", (path,))
+    db.execute("DELETE FROM source_files WHERE path = ?", (path,))
+
+
+def build(db_path=DB_FILE, force=False):
+    """Crea o actualitza la base de dades. Retorna (carregats, sense canvis, esborrats)"""
+    db = sqlite3.connect(db_path)
+    db.executescript(SCHEMA)
+    known = dict(db.execute("SELECT path, hash FROM source_files"))
+    kinds = dict(db.execute("SELECT path, kind FROM source_files"))
+
+    loaded = unchanged = removed = 0
+    seen = set()
+    for kind, pattern in SOURCES:
+        for path in sorted(glob.glob(pattern)):
+            seen.add(path)
+            digest = file_hash(path)
+            if not force and known.get(path) == digest:
+                unchanged += 1
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ {path}: {e}")
+                continue
+            # Una transacció per fitxer: o queda carregat sencer o gens
+            with db:
+                remove_source(db, path, kind)
+                INGESTERS[kind][0](db, path, data)
+                db.execute("INSERT INTO source_files VALUES (?, ?, ?, ?)",
+                           (path, kind, digest, datetime.now().isoformat(timespec='seconds')))
+            loaded += 1
+
+    for path in set(known) - seen:
+        with db:
+            remove_source(db, path, kinds[path])
+        removed += 1
+
+    db.close()
+    return loaded, unchanged, removed
+
+
+def run_query(db_path, sql):
+    db = sqlite3.connect(db_path)
+    cursor = db.execute(sql)
+    columns = [c[0] for c in cursor.description or []]
+    if columns:
+        print(' | '.join(columns))
+    for row in cursor:
+        print(' | '.join('' if v is None else str(v) for v in row))
+    db.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Base de dades SQLite de partits i dades ACTAWP")
+    ap.add_argument('--db', default=DB_FILE, help=f"Fitxer SQLite (per defecte {DB_FILE})")
+    ap.add_argument('--force', action='store_true', help="Torna a carregar tots els fitxers")
+    ap.add_argument('--query', help="Consulta SQL a executar després d'actualitzar")
+    args = ap.parse_args()
+
+    loaded, unchanged, removed = build(args.db, args.force)
+    print(f"✅ {args.db}: {loaded} fitxers carregats, {unchanged} sense canvis, {removed} esborrats", file=sys.stderr)
+
+    if args.query:
+        run_query(args.db, args.query)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Agregats de la temporada precalculats (season_summary.json) per al dashboard
+- Totals per jugador (suma de jugadors[*].estadistiques, inclosos els comptadors niats
+  goalTypes, goalZones, fieldZones...) i partits jugats
+- Distribució dels gols de CN Terrassa i del rival per tipus, zona de porteria i zona del camp
+- Totals dels rivals (suma de rivalStats: tipus de gol, exclusions, penals fallats...)
+- Gols per quart (periodScores) i balanç total, a casa i a fora
+- Incremental: l'aportació de cada partit es desa a .actawp_cache/season_summary_state.json;
+  un partit nou se suma als totals i un de modificat o esborrat es resta abans,
+  sense tornar a llegir la resta de la temporada (--force ho recalcula tot)
+- Format compacte: els comptadors a zero no s'hi escriuen (el dashboard els llegeix amb || 0)
+
+Ús:
+    python build_season_summary.py
+    python build_season_summary.py --team cadet --force
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+STATS_FILES = 'cnt_stats_*.json'
+SUMMARY_FILE = 'season_summary.json'
+STATE_FILE = os.path.join('.actawp_cache', 'season_summary_state.json')
+SUMMARY_VERSION = 2
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(data, path):
+    """Escriptura atòmica i compacta"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+
+def accumulate(target, source, sign=1):
+    """Suma (sign=1) o resta (sign=-1) els comptadors de source a target, també els niats.
+    Els comptadors que queden a zero s'eliminen"""
+    for key, value in source.items():
+        if isinstance(value, dict):
+            branch = target.setdefault(key, {})
+            accumulate(branch, value, sign)
+            if not branch:
+                del target[key]
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            total = target.get(key, 0) + sign * value
+            if total:
+                target[key] = total
+            else:
+                target.pop(key, None)
+
+
+def match_contribution(data):
+    """Aportació d'un partit als agregats (només comptadors additius)"""
+    scored = data.get('scoreCNT') or 0
+    conceded = data.get('scoreRival') or 0
+    outcome = 'won' if scored > conceded else 'lost' if scored < conceded else 'drawn'
+    record = {'played': 1, outcome: 1, 'goals_for': scored, 'goals_against': conceded}
+    location = 'away' if data.get('matchLocation') == 'away' else 'home'
+
+    goals = {}
+    for action in data.get('chronologicalActions') or []:
+        if action.get('type') != 'goal':
+            continue
+        side = goals.setdefault('cnt' if action.get('team') == 'cnt' else 'rival', {})
+        for field, group in (('goalType', 'types'), ('goalZone', 'goal_zones'), ('fieldZone', 'field_zones')):
+            value = action.get(field) or ('normal' if field == 'goalType' else None)
+            if value:
+                counts = side.setdefault(group, {})
+                counts[value] = counts.get(value, 0) + 1
+
+    players = {}
+    for player in data.get('jugadors') or []:
+        name = (player.get('nom') or '').strip()
+        if name:
+            players[name] = {'matches': 1, 'stats': player.get('estadistiques') or {}}
+
+    rival = {}
+    for player in data.get('rivalStats') or []:
+        accumulate(rival, {key: value for key, value in player.items() if key not in ('num', 'name')})
+
+    return {
+        'record': {'all': record, location: record},
+        'quarters': data.get('periodScores') or {},
+        'goals': goals,
+        'players': players,
+        'rival': rival
+    }
+
+
+def player_numbers(state):
+    """Dorsal de cada jugador segons el partit més recent (el nom de fitxer porta la data)"""
+    numbers = {}
+    for name in sorted(state):
+        numbers.update(state[name].get('numbers', {}))
+    return numbers
+
+
+def build_summary(team, output=SUMMARY_FILE, state_path=STATE_FILE, force=False):
+    """Actualitza season_summary.json. Retorna (resum, partits sumats, partits restats)"""
+    summary = None if force else load_json(output, None)
+    state = {} if force else load_json(state_path, {})
+    if not summary or summary.get('version') != SUMMARY_VERSION or summary.get('files', {}) != \
+            {name: entry['hash'] for name, entry in state.items()}:
+        # Sense estat coherent amb el resum: es recalcula des de zero
+        summary, state = None, {}
+    totals = summary['totals'] if summary else {}
+
+    current = {os.path.basename(p): p for p in glob.glob(STATS_FILES)}
+    added = removed = 0
+
+    for name in sorted(set(state) - set(current)):
+        accumulate(totals, state.pop(name)['contribution'], -1)
+        removed += 1
+
+    for name, path in sorted(current.items()):
+        st = os.stat(path)
+        entry = state.get(name)
+        if entry and entry['size'] == st.st_size and entry['mtime'] == st.st_mtime:
+            continue
+        digest = file_hash(path)
+        if entry and entry['hash'] == digest:
+            entry.update(size=st.st_size, mtime=st.st_mtime)
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ {name}: {e}")
+            continue
+        if entry:
+            accumulate(totals, entry['contribution'], -1)
+            removed += 1
+        contribution = match_contribution(data)
+        accumulate(totals, contribution)
+        added += 1
+        state[name] = {
+            'size': st.st_size,
+            'mtime': st.st_mtime,
+            'hash': digest,
+            'numbers': {p['nom'].strip(): p.get('numero') for p in data.get('jugadors') or [] if (p.get('nom') or '').strip()},
+            'contribution': contribution
+        }
+
+    files = {name: entry['hash'] for name, entry in sorted(state.items())}
+    if summary and not added and not removed and files == summary.get('files'):
+        save_json(state, state_path)
+        return summary, 0, 0
+
+    summary = {
+        'version': SUMMARY_VERSION,
+        'team': team,
+        'last_updated': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'matches': len(files),
+        'files': files,
+        'numbers': player_numbers(state),
+        'totals': totals
+    }
+    save_json(summary, output)
+    save_json(state, state_path)
+    return summary, added, removed
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Agregats de la temporada per al dashboard")
+    ap.add_argument('--team', default='cadet', help="Clau de l'equip (per defecte cadet)")
+    ap.add_argument('--output', default=SUMMARY_FILE, help=f"Fitxer de sortida (per defecte {SUMMARY_FILE})")
+    ap.add_argument('--force', action='store_true', help="Recalcula tota la temporada")
+    args = ap.parse_args()
+
+    summary, added, removed = build_summary(args.team, args.output, force=args.force)
+    record = summary['totals'].get('record', {}).get('all', {})
+    size = os.path.getsize(args.output) / 1024 if os.path.exists(args.output) else 0
+    print(f"✅ {args.output}: {summary['matches']} partits (+{added} / -{removed}), "
+          f"{record.get('won', 0)}V {record.get('drawn', 0)}E {record.get('lost', 0)}D, "
+          f"{len(summary['totals'].get('players', {}))} jugadors, {size:.1f} KB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
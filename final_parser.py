@@ -3,64 +3,95 @@ Parser DEFINITIU ACTAWP - Extreu dates i tota la informació correctament
 Basat en l'estructura real de l'HTML
 """
 
-import requests
 import json
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
 
+from actawp_client import ActawpClient
+from html_engine import make_soup
+from table_schema import DATE_WEEKDAY_TIME, MATCH_ID, Field, TableSchema, absolute_url, find_first
+
+
+def ellipsis_text(cell):
+    """COLUMNES 1 i 3: nom de l'equip (colstyle-equipo-1 / colstyle-equipo-2)"""
+    span = cell.find('span', class_='ellipsis')
+    return span.get_text(strip=True) if span else None
+
+
+def match_link(cell):
+    """Enllaç i ID del partit"""
+    info = {}
+    link = find_first(cell, 'a', 'href')
+    if link:
+        href = link['href']
+        info['url'] = absolute_url(href)
+        match_id_search = MATCH_ID.search(href)
+        if match_id_search:
+            info['match_id'] = match_id_search.group(1)
+    return info
+
+
+def match_date_venue(cell):
+    """COLUMNA 2 (colstyle-resultado): span amb data-sort que conté la data ("Dom, 09/11/2025 13:55") i el lloc"""
+    info = {}
+    date_span = find_first(cell, 'span', 'data-sort')
+    if date_span:
+        date_match = DATE_WEEKDAY_TIME.search(date_span.get_text(strip=True))
+        if date_match:
+            full_date = date_match.group(1)
+            info['date_time'] = full_date
+            parts = full_date.split()
+            if len(parts) >= 3:
+                info['date'] = parts[1]  # DD/MM/YYYY
+                info['time'] = parts[2]  # HH:MM
+        
+        venue_span = date_span.find('span', class_='ellipsis')
+        if venue_span:
+            info['venue'] = venue_span.get('title') or venue_span.get_text(strip=True)
+    return info
+
+
+def home_and_away(match_info, cells, number):
+    """Si l'equip 1 és CN TERRASSA, és home"""
+    if 'team1' in match_info and 'TERRASSA' in match_info['team1'].upper():
+        match_info['home_team'] = match_info['team1']
+        match_info['away_team'] = match_info.get('team2', '')
+    else:
+        match_info['home_team'] = match_info.get('team2', '')
+        match_info['away_team'] = match_info.get('team1', '')
+
+
+MATCHES_SCHEMA = TableSchema(
+    fields=[
+        Field('team1', 0, ellipsis_text),
+        Field(None, 0, match_link),
+        Field(None, 1, match_date_venue),
+        Field('team2', 2, ellipsis_text),
+    ],
+    derive=[home_and_away],
+    require=('match_id',),
+    on_accept=lambda i, m: print(f"    ✓ Partit {i}: {m.get('date', '?')} {m.get('time', '?')} - {m.get('home_team', '?')} vs {m.get('away_team', '?')}"),
+    on_error=lambda i, e: print(f"    ⚠️ Error processant fila {i}: {e}")
+)
+
+
 class FinalActawpParser:
     
     def __init__(self):
-        self.session = requests.Session()
+        self.client = ActawpClient()
+        self.session = self.client.session
     
     def get_csrf_token(self, team_id, language='es'):
         """Obté el token CSRF"""
-        url = f"https://actawp.natacio.cat/{language}/team/{team_id}"
-        response = self.session.get(url)
-        
-        match = re.search(r'csrf_token["\']?\s*[:=]\s*["\']([^"\']+)["\']', response.text)
-        if match:
-            return match.group(1)
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        csrf_input = soup.find('input', {'name': 'csrf_token'})
-        if csrf_input:
-            return csrf_input.get('value')
-        
-        return None
+        return self.client.get_csrf_token(team_id, language)
     
     def get_tab_content(self, team_id, tab_name, language='es'):
         """Obté el contingut d'una pestanya"""
-        csrf_token = self.get_csrf_token(team_id, language)
-        
-        if not csrf_token:
-            return None
-        
-        url = f"https://actawp.natacio.cat/{language}/ajax/team/{team_id}/change-tab"
-        
-        data = {
-            'csrf_token': csrf_token,
-            'tab': tab_name
-        }
-        
-        headers = {
-            'accept': '*/*',
-            'content-type': 'application/x-www-form-urlencoded; charset=UTF-8',
-            'x-requested-with': 'XMLHttpRequest',
-            'referer': f'https://actawp.natacio.cat/{language}/team/{team_id}'
-        }
-        
-        response = self.session.post(url, data=data, headers=headers)
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return None
+        return self.client.get_tab_content(team_id, tab_name, language)
     
     def parse_table_matches(self, html_content):
         """Parser específic per la taula de partits d'ACTAWP"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = make_soup(html_content)
         matches = []
         
         print("  🔍 Parseant taula de partits...")
@@ -79,87 +110,13 @@ class FinalActawpParser:
         rows = tbody.find_all('tr')
         print(f"  📊 Trobades {len(rows)} files")
         
-        for i, row in enumerate(rows, 1):
-            try:
-                match_info = {}
-                
-                # Trobar totes les columnes
-                cols = row.find_all('td')
-                
-                if len(cols) < 3:
-                    continue
-                
-                # COLUMNA 1: Equip 1 (colstyle-equipo-1)
-                col1 = cols[0]
-                team1_span = col1.find('span', class_='ellipsis')
-                if team1_span:
-                    match_info['team1'] = team1_span.get_text(strip=True)
-                
-                # Enllaç del partit
-                link = col1.find('a', href=True)
-                if link:
-                    href = link['href']
-                    match_info['url'] = href if href.startswith('http') else 'https://actawp.natacio.cat' + href
-                    match_id_search = re.search(r'/match/(\d+)', href)
-                    if match_id_search:
-                        match_info['match_id'] = match_id_search.group(1)
-                
-                # COLUMNA 2: Resultat/Data (colstyle-resultado)
-                col2 = cols[1]
-                
-                # Buscar el span amb data-sort que conté el timestamp i la data
-                date_span = col2.find('span', attrs={'data-sort': True})
-                if date_span:
-                    # El text del span conté la data legible
-                    date_text = date_span.get_text(strip=True)
-                    
-                    # Extreure la data (abans del primer <span> intern)
-                    # Format: "Dom, 09/11/2025 13:55"
-                    date_match = re.search(r'([A-Za-z]{3},?\s+\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{2})', date_text)
-                    if date_match:
-                        full_date = date_match.group(1)
-                        match_info['date_time'] = full_date
-                        
-                        # Separar data i hora
-                        parts = full_date.split()
-                        if len(parts) >= 3:
-                            match_info['date'] = parts[1]  # DD/MM/YYYY
-                            match_info['time'] = parts[2]  # HH:MM
-                    
-                    # Buscar el lloc (span intern amb ellipsis)
-                    venue_span = date_span.find('span', class_='ellipsis')
-                    if venue_span:
-                        venue_text = venue_span.get('title') or venue_span.get_text(strip=True)
-                        match_info['venue'] = venue_text
-                
-                # COLUMNA 3: Equip 2 (colstyle-equipo-2)
-                col3 = cols[2]
-                team2_span = col3.find('span', class_='ellipsis')
-                if team2_span:
-                    match_info['team2'] = team2_span.get_text(strip=True)
-                
-                # Determinar qui és home i qui és away
-                # Si l'equip 1 és CN TERRASSA, és home
-                if 'team1' in match_info and 'TERRASSA' in match_info['team1'].upper():
-                    match_info['home_team'] = match_info['team1']
-                    match_info['away_team'] = match_info.get('team2', '')
-                else:
-                    match_info['home_team'] = match_info.get('team2', '')
-                    match_info['away_team'] = match_info.get('team1', '')
-                
-                if match_info.get('match_id'):
-                    matches.append(match_info)
-                    print(f"    ✓ Partit {i}: {match_info.get('date', '?')} {match_info.get('time', '?')} - {match_info.get('home_team', '?')} vs {match_info.get('away_team', '?')}")
-                
-            except Exception as e:
-                print(f"    ⚠️ Error processant fila {i}: {e}")
-                continue
+        matches = MATCHES_SCHEMA.extract(rows)
         
         return matches
     
     def parse_players_complete(self, html_content):
         """Parser complet per jugadors"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = make_soup(html_content)
         players = []
         
         table = soup.find('table')
@@ -257,7 +214,7 @@ class FinalActawpParser:
         print("\n2️⃣ ESTADÍSTIQUES:")
         stats_data = self.get_tab_content(team_id, 'stats', language)
         if stats_data and stats_data.get('code') == 0:
-            soup = BeautifulSoup(stats_data.get('content', ''), 'html.parser')
+            soup = make_soup(stats_data.get('content', ''))
             table = soup.find('table')
             team_stats = {}
             if table:
@@ -3,7 +3,8 @@
 # Script automatitzat: Generar convocatòria
 # ============================================
 #
-# Ús: ./generar_convocatoria.sh "URL_PARTIT"
+# Ús: ./generar_convocatoria.sh "URL_PARTIT" ["URL_PARTIT" ...]
+#     ./generar_convocatoria.sh --pendents      (tots els pròxims partits d'actawp_cadet_data.json)
 #
 # Exemple:
 # ./generar_convocatoria.sh "https://actawp.natacio.cat/ca/tournament/1317474/match/143260144/results"
@@ -26,7 +27,8 @@ echo ""
 if [ -z "$1" ]; then
     echo -e "${RED}❌ Error: Cal proporcionar la URL del partit${NC}"
     echo ""
-    echo "Ús: $0 \"URL_PARTIT\""
+    echo "Ús: $0 \"URL_PARTIT\" [\"URL_PARTIT\" ...]"
+    echo "    $0 --pendents"
     echo ""
     echo "Exemple:"
     echo "  $0 \"https://actawp.natacio.cat/ca/tournament/1317474/match/143260144/results\""
@@ -34,6 +36,32 @@ if [ -z "$1" ]; then
     exit 1
 fi
 
+# Mode per lots: diverses URLs o tots els pròxims partits (un sol navegador si cal)
+if [ "$1" == "--pendents" ] || [ $# -gt 1 ]; then
+    if [ "$1" == "--pendents" ]; then
+        ARGS=(--from-data actawp_cadet_data.json)
+    else
+        ARGS=("$@")
+    fi
+
+    echo -e "${YELLOW}⚙️  Executant parser per lots...${NC}"
+    python3 match_lineup_parser.py "${ARGS[@]}"
+    STATUS=$?
+
+    echo ""
+    if [ $STATUS -ne 0 ]; then
+        echo -e "${YELLOW}⚠️  Algun partit ha fallat (la resta s'han generat)${NC}"
+    fi
+
+    echo -e "${YELLOW}📤 Vols pujar a GitHub? (s/n)${NC}"
+    read -r response
+    if [[ "$response" =~ ^([sS][iI]?|[yY][eE][sS]?)$ ]]; then
+        git add match_*_lineup.json
+        git commit -m "📋 Convocatòries - $(date +%Y-%m-%d)" && git push
+    fi
+    exit $STATUS
+fi
+
 URL=$1
 
 # Extreure match_id de la URL
@@ -3,83 +3,34 @@ Genera fitxers JSON amb dades ACTAWP per pujar a GitHub
 Compatible amb l'estructura actual de l'aplicació
 """
 
-import requests
 import json
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
 
+from actawp_client import ActawpClient
+from html_engine import make_soup
+from team_registry import load_teams
+
 class ActawpToGithub:
     
-    TEAMS = {
-        'cadet': {
-            'url': 'https://actawp.natacio.cat/ca/team/15621224',
-            'id': '15621224',
-            'name': 'CN Terrassa Cadet',
-            'language': 'ca',
-            'coach': 'Didac Cobacho',
-            'repo': 'joseprico/cnt_cadet_25-26'
-        },
-        'juvenil': {
-            'url': 'https://actawp.natacio.cat/es/team/15621223',
-            'id': '15621223',
-            'name': 'CN Terrassa Juvenil',
-            'language': 'es',
-            'coach': 'Jordi Busquets',
-            'repo': 'joseprico/CNT_juvenil_25_26'
-        }
-    }
+    # Equips del registre teams.json
+    TEAMS = load_teams()
     
     def __init__(self):
-        self.session = requests.Session()
+        self.client = ActawpClient()
+        self.session = self.client.session
     
     def get_csrf_token(self, team_id, language='es'):
         """Obté el token CSRF"""
-        url = f"https://actawp.natacio.cat/{language}/team/{team_id}"
-        response = self.session.get(url)
-        
-        match = re.search(r'csrf_token["\']?\s*[:=]\s*["\']([^"\']+)["\']', response.text)
-        if match:
-            return match.group(1)
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        csrf_input = soup.find('input', {'name': 'csrf_token'})
-        if csrf_input:
-            return csrf_input.get('value')
-        
-        return None
+        return self.client.get_csrf_token(team_id, language)
     
     def get_tab_content(self, team_id, tab_name, language='es'):
         """Obté el contingut d'una pestanya"""
-        csrf_token = self.get_csrf_token(team_id, language)
-        
-        if not csrf_token:
-            return None
-        
-        url = f"https://actawp.natacio.cat/{language}/ajax/team/{team_id}/change-tab"
-        
-        data = {
-            'csrf_token': csrf_token,
-            'tab': tab_name
-        }
-        
-        headers = {
-            'accept': '*/*',
-            'content-type': 'application/x-www-form-urlencoded; charset=UTF-8',
-            'x-requested-with': 'XMLHttpRequest',
-            'referer': f'https://actawp.natacio.cat/{language}/team/{team_id}'
-        }
-        
-        response = self.session.post(url, data=data, headers=headers)
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return None
+        return self.client.get_tab_content(team_id, tab_name, language)
     
     def parse_players(self, html_content):
         """Extreu jugadors amb estadístiques"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = make_soup(html_content)
         players = []
         
         table = soup.find('table')
@@ -127,7 +78,7 @@ class ActawpToGithub:
     
     def parse_team_stats(self, html_content):
         """Extreu estadístiques de l'equip"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = make_soup(html_content)
         stats = {}
         
         table = soup.find('table')
@@ -159,7 +110,7 @@ class ActawpToGithub:
     
     def parse_upcoming_matches(self, html_content):
         """Extreu pròxims partits"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = make_soup(html_content)
         matches = []
         
         # Buscar elements amb enllaç a /match/
@@ -292,7 +243,7 @@ class ActawpToGithub:
         }
         
         # Guardar JSON
-        filename = f"actawp_{team_key}_data.json"
+        filename = team_info['data_file']
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(github_json, f, ensure_ascii=False, indent=2)
         
@@ -312,8 +263,8 @@ if __name__ == "__main__":
 ╚══════════════════════════════════════════════════════════════╝
 """)
     
-    # Generar per tots dos equips
-    for team_key in ['cadet', 'juvenil']:
+    # Generar per tots els equips del registre
+    for team_key in generator.TEAMS:
         try:
             data = generator.generate_github_json(team_key)
             
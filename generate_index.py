@@ -1,39 +1,167 @@
-Perfecte! Anem a implementar l'Opció 1 pas a pas.
-📋 PAS 1: Crear l'script Python
-Crea un nou fitxer al teu repositori anomenat generate_index.py:
-python#!/usr/bin/env python3
-"""
-Script per generar un índex de tots els partits
-Executa automàticament amb GitHub Actions
-"""
-import json
-import os
-from pathlib import Path
-from datetime import datetime
-
-def generate_matches_index():
-    # Buscar tots els fitxers de partits (cnt_stats_*.json)
-    match_files = sorted([
-        f.name for f in Path('.').glob('cnt_stats_*.json')
-    ], reverse=True)  # Més recents primer
-    
-    # Crear l'índex
-    index = {
-        "last_updated": datetime.utcnow().isoformat() + "Z",
-        "total_matches": len(match_files),
-        "files": match_files
-    }
-    
-    # Guardar l'índex
-    with open('matches_index.json', 'w', encoding='utf-8') as f:
-        json.dump(index, f, indent=2, ensure_ascii=False)
-    
-    print(f"✅ Índex generat: {len(match_files)} partits")
-    for f in match_files:
-        print(f"   - {f}")
-    
-    return len(match_files)
-
-if __name__ == "__main__":
-    count = generate_matches_index()
-    print(f"\n✅ matches_index.json creat amb {count} partits")
\ No newline at end of file
+#!/usr/bin/env python3
+"""
+Manifest dels partits (index.json) a partir dels cnt_stats_<data>_<rival>.json
+- Per a cada partit: hash del contingut, mida, data, rival, local/visitant, resultat final,
+  parcials per quart i màxims golejadors de CN Terrassa
+- El dashboard en té prou amb una sola petició per a la llista de la temporada
+  (només baixa el fitxer sencer d'un partit quan el necessita)
+- Incremental: un fitxer amb la mateixa mida i data de modificació no es torna a llegir,
+  i si ha canviat la data però no el hash es reaprofita el resum de l'índex anterior
+- Cada partit porta la seva URL versionada amb el hash (cnt_stats_...json?v=<hash>): el navegador
+  i la CDN la poden guardar a la cache sense caducitat, i només es baixen els partits nous o modificats
+- "summary": URL versionada de season_summary.json (build_season_summary.py s'executa abans),
+  d'on el dashboard llegeix els totals de la temporada sense baixar tots els partits
+- "files", "team", "last_updated" i "total_files" es mantenen per compatibilitat;
+  last_updated només canvia quan canvia algun partit
+
+Ús:
+    python generate_index.py
+    python generate_index.py --team juvenil --output index.json
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+STATS_FILES = 'cnt_stats_*.json'
+INDEX_FILE = 'index.json'
+SUMMARY_FILE = 'season_summary.json'
+# mtime de cada fitxer (local, no es publica: al checkout de CI totes les dates canvien)
+STATE_FILE = os.path.join('.actawp_cache', 'index_state.json')
+MANIFEST_VERSION = 3
+TOP_SCORERS = 3
+VERSION_LENGTH = 12
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def versioned_url(name, digest):
+    """URL relativa que canvia quan canvia el contingut del fitxer"""
+    return f"{name}?v={digest[:VERSION_LENGTH]}"
+
+
+def load_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(data, path):
+    """Escriptura atòmica i compacta (el manifest es baixa a cada càrrega del dashboard)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+
+def match_summary(path, digest, size):
+    """Entrada del manifest d'un partit"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    periods = {}
+    for quarter, score in (data.get('periodScores') or {}).items():
+        periods[quarter] = [score.get('cnt', 0), score.get('rival', 0)]
+
+    scorers = []
+    for player in data.get('jugadors') or []:
+        goals = (player.get('estadistiques') or {}).get('gols') or 0
+        if goals > 0:
+            scorers.append({'num': player.get('numero'), 'name': player.get('nom', ''), 'goals': goals})
+    scorers.sort(key=lambda p: -p['goals'])
+
+    # Data del partit; si no n'hi ha, la del nom del fitxer
+    date = (data.get('data') or '')[:10] or os.path.basename(path)[len('cnt_stats_'):][:10]
+
+    return {
+        'file': os.path.basename(path),
+        'url': versioned_url(os.path.basename(path), digest),
+        'hash': digest,
+        'size': size,
+        'date': date,
+        'rival': data.get('rivalTeam', ''),
+        'location': data.get('matchLocation', ''),
+        'score': [data.get('scoreCNT'), data.get('scoreRival')],
+        'periods': periods,
+        'top_scorers': scorers[:TOP_SCORERS]
+    }
+
+
+def build_manifest(team, output=INDEX_FILE, state_path=STATE_FILE):
+    """Genera el manifest. Retorna (manifest, llegits, reaprofitats, canviat)"""
+    previous = load_json(output, {})
+    known = {m['file']: m for m in previous.get('matches', []) if m.get('file')}
+    state = load_json(state_path, {})
+
+    matches = []
+    new_state = {}
+    read = reused = 0
+    for path in sorted(glob.glob(STATS_FILES)):
+        name = os.path.basename(path)
+        st = os.stat(path)
+        entry = known.get(name)
+        cached = state.get(name)
+
+        unchanged = cached and cached.get('size') == st.st_size and cached.get('mtime') == st.st_mtime
+        digest = cached['hash'] if unchanged else file_hash(path)
+        if entry and entry.get('hash') == digest and entry.get('url') == versioned_url(name, digest):
+            reused += 1
+        else:
+            try:
+                entry = match_summary(path, digest, st.st_size)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ {name}: {e}")
+                continue
+            read += 1
+        matches.append(entry)
+        new_state[name] = {'size': st.st_size, 'mtime': st.st_mtime, 'hash': digest}
+
+    summary = None
+    if os.path.exists(SUMMARY_FILE):
+        digest = file_hash(SUMMARY_FILE)
+        summary = {'file': SUMMARY_FILE, 'url': versioned_url(SUMMARY_FILE, digest), 'hash': digest}
+
+    changed = previous.get('version') != MANIFEST_VERSION or matches != previous.get('matches') or \
+        summary != previous.get('summary')
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'team': team,
+        'last_updated': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ') if changed else previous.get('last_updated'),
+        'total_files': len(matches),
+        'files': [m['file'] for m in matches],
+        'matches': matches
+    }
+    if summary:
+        manifest['summary'] = summary
+    if changed:
+        save_json(manifest, output)
+    save_json(new_state, state_path)
+    return manifest, read, reused, changed
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Manifest dels partits (index.json)")
+    ap.add_argument('--team', default='cadet', help="Clau de l'equip (per defecte cadet)")
+    ap.add_argument('--output', default=INDEX_FILE, help=f"Fitxer de sortida (per defecte {INDEX_FILE})")
+    args = ap.parse_args()
+
+    manifest, read, reused, changed = build_manifest(args.team, args.output)
+    size = os.path.getsize(args.output) / 1024 if os.path.exists(args.output) else 0
+    status = "actualitzat" if changed else "sense canvis"
+    print(f"✅ {args.output} {status}: {manifest['total_files']} partits ({read} llegits, {reused} reaprofitats), {size:.1f} KB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
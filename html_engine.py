@@ -0,0 +1,54 @@
+"""
+Motor de parseig HTML per als parsers ACTAWP
+- lxml (en C, molt més ràpid) si està instal·lat
+- html.parser (Python pur) com a alternativa, el motor original
+- ACTAWP_HTML_ENGINE=html.parser força el motor antic (p.ex. per comparar resultats)
+- Parseig parcial: cada pas declara el subarbre que necessita (TABLES, ROWS, ...)
+  i només es construeix aquesta part del DOM
+
+Ús:
+    from html_engine import make_soup
+
+    soup = make_soup(html)
+    soup = make_soup(html, TABLES)   # només les taules
+"""
+
+import os
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+ENGINES = ('lxml', 'html.parser')
+
+ENGINE = os.environ.get('ACTAWP_HTML_ENGINE') or ('lxml' if HAS_LXML else 'html.parser')
+
+# Subarbres que necessiten els parsers (la resta del document no es construeix)
+TABLES = SoupStrainer('table')
+ROWS = SoupStrainer('tr')
+LINKS = SoupStrainer('a', href=True)
+CSRF_INPUT = SoupStrainer('input', attrs={'name': 'csrf_token'})
+
+
+def set_engine(name):
+    """Canvia el motor per a tot el procés. Retorna l'anterior"""
+    global ENGINE
+    if name not in ENGINES:
+        raise ValueError(f"Motor HTML desconegut: {name}")
+    if name == 'lxml' and not HAS_LXML:
+        raise ValueError("lxml no està instal·lat: pip install lxml")
+    previous, ENGINE = ENGINE, name
+    return previous
+
+
+def available_engines():
+    return [e for e in ENGINES if e != 'lxml' or HAS_LXML]
+
+
+def make_soup(html, parse_only=None):
+    """Construeix el BeautifulSoup amb el motor actiu"""
+    return BeautifulSoup(html, ENGINE, parse_only=parse_only)
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Crawler de tota una lliga ACTAWP (per a l'scouting)
+- Parteix de la classificació i el calendari d'un equip de teams.json (o d'URLs donades)
+- Descobreix tots els equips (team_id) i partits (match_id) del torneig
+- Descarrega jugadors i resultats de cada equip i les plantilles de cada acta jugada,
+  amb concurrència limitada (el client compartit aplica el límit de ritme)
+- Diari JSONL: cada tasca acabada s'hi afegeix en una línia amb l'hora; si l'execució s'interromp o
+  alguna tasca falla, la següent continua on era (--restart per començar de zero).
+  Quan l'execució acaba sense errors el diari s'esborra
+- El descobriment del diari només es reaprofita durant DISCOVERY_MAX_AGE: en reprendre més tard
+  es tornen a llegir la classificació i el calendari (equips i partits jugats nous)
+- Sortida compacta en un sol fitxer (league_<equip>.json) que l'anàlisi carrega d'una lectura
+
+Ús:
+    python league_crawler.py cadet
+    python league_crawler.py cadet --workers 6 --no-matches
+    python league_crawler.py --ranking-url URL --calendar-url URL --output lliga.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from acta_parser import extract_rosters
+from actawp_cache import ResponseCache
+from actawp_client import BASE_URL, ActawpClient
+from html_engine import ROWS, make_soup
+from table_schema import MATCH_ID, Field, TableSchema
+from team_registry import load_teams
+from ultra_robust_parser import MATCH_FIELDS, ActawpParserV58, now_catalunya, result_score_and_date
+
+JOURNAL_DIR = os.path.join('.actawp_cache', 'journal')
+DEFAULT_WORKERS = 4
+# Antiguitat màxima (segons) dels equips i partits descoberts abans de tornar-los a llegir
+DISCOVERY_MAX_AGE = 6 * 3600
+
+
+def match_id_field(record, cells, number):
+    found = MATCH_ID.search(record.get('url', ''))
+    if not found:
+        return False
+    record['match_id'] = found.group(1)
+
+
+# Files del calendari: com les de resultats, però els partits pendents no tenen marcador
+CALENDAR_SCHEMA = TableSchema(
+    fields=MATCH_FIELDS + [Field(None, slice(1, -1), result_score_and_date)],
+    derive=[match_id_field],
+    require=('team1', 'team2', 'match_id'),
+    order=('match_id', 'team1', 'team2', 'team1_logo', 'team2_logo', 'score', 'date', 'url')
+)
+
+
+class Journal:
+    """Diari de tasques acabades (JSONL, una línia per tasca amb l'hora). Thread-safe"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.done = {}
+        self.times = {}
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # última línia a mitges d'una execució interrompuda
+                    self.done[entry['task']] = entry['data']
+                    self.times[entry['task']] = entry.get('at', 0)
+        except OSError:
+            pass
+
+    def record(self, task, data):
+        at = time.time()
+        line = json.dumps({'task': task, 'at': at, 'data': data}, ensure_ascii=False, separators=(',', ':'))
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+                f.flush()
+            self.done[task] = data
+            self.times[task] = at
+
+    def fresh(self, task, max_age):
+        """True si la tasca és al diari i no té més de max_age segons (les línies antigues sense hora no ho són)"""
+        return task in self.done and time.time() - self.times.get(task, 0) <= max_age
+
+    def reset(self):
+        with self.lock:
+            self.done = {}
+            self.times = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+class LeagueCrawler:
+
+    def __init__(self, journal, client=None, language='ca', workers=DEFAULT_WORKERS, with_matches=True,
+                 discovery_max_age=DISCOVERY_MAX_AGE):
+        self.journal = journal
+        self.client = client or ActawpClient(cache=ResponseCache())
+        self.parser = ActawpParserV58(client=self.client)
+        self.language = language
+        self.workers = max(1, int(workers))
+        self.with_matches = with_matches
+        self.discovery_max_age = discovery_max_age
+
+    # Descobriment
+
+    def discover_teams(self, ranking_url):
+        """Equips de la classificació (ID, nom, logo i estadístiques)"""
+        if self.journal.fresh('discover:teams', self.discovery_max_age):
+            return self.journal.done['discover:teams']
+        teams = [team for team in self.parser.parse_ranking(ranking_url) if team.get('team_id')]
+        if teams:
+            self.journal.record('discover:teams', teams)
+        return teams
+
+    def discover_matches(self, calendar_url):
+        """Tots els partits del calendari (jugats i pendents)"""
+        if self.journal.fresh('discover:matches', self.discovery_max_age):
+            return self.journal.done['discover:matches']
+        response = self.client.get(calendar_url, cache_tab='calendar')
+        if response.status_code != 200:
+            print(f"  ❌ Calendari: HTTP {response.status_code}")
+            return []
+        matches = {}
+        for match in CALENDAR_SCHEMA.extract(make_soup(response.text, ROWS).find_all('tr')):
+            matches.setdefault(match['match_id'], match)
+        matches = list(matches.values())
+        if matches:
+            self.journal.record('discover:matches', matches)
+        return matches
+
+    # Tasques
+
+    def fetch_team(self, team_id):
+        """Jugadors i resultats d'un equip. None si alguna pestanya falla (es reintentarà)"""
+        players_data = self.client.get_tab_content(team_id, 'players', self.language)
+        results_data = self.client.get_tab_content(team_id, 'last-results', self.language)
+        if not (players_data and players_data.get('code') == 0 and results_data and results_data.get('code') == 0):
+            return None
+        return {
+            'players': self.parser.parse_players(players_data.get('content', '')),
+            'results': self.parser.parse_last_results(results_data.get('content', ''))
+        }
+
+    def fetch_match(self, match_id):
+        """Plantilles de l'acta d'un partit jugat. None si falla"""
+        response = self.client.get(f"{BASE_URL}/{self.language}/match/{match_id}/stats", cache_tab='match')
+        if response.status_code != 200:
+            return None
+        return {'rosters': extract_rosters(response.text)}
+
+    def run_tasks(self, tasks):
+        """Executa les tasques pendents (nom -> funció) amb concurrència limitada. Retorna els errors"""
+        pending = {task: fn for task, fn in tasks.items() if task not in self.journal.done}
+        skipped = len(tasks) - len(pending)
+        print(f"  🧾 {len(tasks)} tasques: {skipped} ja fetes (diari), {len(pending)} pendents")
+
+        errors = 0
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(fn): task for task, fn in pending.items()}
+            for done, future in enumerate(as_completed(futures), 1):
+                task = futures[future]
+                try:
+                    data = future.result()
+                except Exception as e:
+                    data = None
+                    print(f"    ❌ {task}: {e}")
+                if data is None:
+                    errors += 1
+                else:
+                    self.journal.record(task, data)
+                if done % 10 == 0 or done == len(pending):
+                    print(f"    ⏳ {done}/{len(pending)} ({time.perf_counter() - started:.1f}s)")
+        return errors
+
+    def crawl(self, ranking_url, calendar_url):
+        print("\n1️⃣ DESCOBRIMENT:")
+        teams = self.discover_teams(ranking_url) if ranking_url else []
+        matches = self.discover_matches(calendar_url) if calendar_url else []
+        played = [m for m in matches if m.get('score')]
+        print(f"  ✅ {len(teams)} equips, {len(matches)} partits ({len(played)} jugats)")
+
+        tasks = {f"team:{t['team_id']}": (lambda team_id=t['team_id']: self.fetch_team(team_id)) for t in teams}
+        if self.with_matches:
+            for m in played:
+                tasks[f"match:{m['match_id']}"] = lambda match_id=m['match_id']: self.fetch_match(match_id)
+
+        print("\n2️⃣ DESCÀRREGA:")
+        errors = self.run_tasks(tasks)
+        return self.build_dataset(teams, matches), errors
+
+    def build_dataset(self, teams, matches):
+        """Dataset de la lliga amb el que hi ha al diari (els equips/partits fallits queden sense dades)"""
+        done = self.journal.done
+        return {
+            'metadata': {
+                'source': 'ACTAWP',
+                'generated_at': now_catalunya().isoformat(),
+                'teams': len(teams),
+                'matches': len(matches)
+            },
+            'teams': {
+                t['team_id']: dict(t, **(done.get(f"team:{t['team_id']}") or {}))
+                for t in teams
+            },
+            'matches': {
+                m['match_id']: dict(m, **(done.get(f"match:{m['match_id']}") or {}))
+                for m in matches
+            }
+        }
+
+
+def save_compact(data, filename):
+    """Escriptura atòmica sense sagnat (una sola lectura ràpida per a l'anàlisi)"""
+    tmp_path = f"{filename}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, filename)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Crawler de tota una lliga ACTAWP")
+    ap.add_argument('team', nargs='?', help="Equip de teams.json (agafa la seva classificació i calendari)")
+    ap.add_argument('--ranking-url', help="URL de la classificació")
+    ap.add_argument('--calendar-url', help="URL del calendari")
+    ap.add_argument('--output', help="Fitxer de sortida (per defecte league_<equip>.json)")
+    ap.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Descàrregues simultànies")
+    ap.add_argument('--no-matches', action='store_true', help="No descarregar les actes dels partits")
+    ap.add_argument('--restart', action='store_true', help="Ignora el diari i comença de zero")
+    ap.add_argument('--discovery-max-age', type=float, default=DISCOVERY_MAX_AGE / 3600,
+                    help="Hores que es reaprofiten els equips i partits descoberts del diari (per defecte 6)")
+    ap.add_argument('--no-cache', action='store_true', help="Sense cache HTTP persistent")
+    args = ap.parse_args()
+
+    ranking_url, calendar_url, language, name = args.ranking_url, args.calendar_url, 'ca', 'lliga'
+    if args.team:
+        try:
+            team_info = load_teams(only=[args.team])[args.team]
+        except ValueError as e:
+            ap.error(str(e))
+        ranking_url = ranking_url or team_info.get('ranking_url')
+        calendar_url = calendar_url or team_info.get('calendar_url')
+        language = team_info.get('language', 'ca')
+        name = args.team
+    if not ranking_url and not calendar_url:
+        ap.error("Cal un equip de teams.json o --ranking-url / --calendar-url")
+
+    output = args.output or f"league_{name}.json"
+    journal = Journal(os.path.join(JOURNAL_DIR, f"{os.path.splitext(os.path.basename(output))[0]}.jsonl"))
+    if args.restart:
+        journal.reset()
+
+    print(f"🕸️ Crawler de lliga → {output} (diari: {journal.path}, {len(journal.done)} tasques fetes)")
+    client = ActawpClient(cache=None if args.no_cache else ResponseCache())
+    crawler = LeagueCrawler(journal, client, language, args.workers, with_matches=not args.no_matches,
+                            discovery_max_age=args.discovery_max_age * 3600)
+
+    started = time.perf_counter()
+    dataset, errors = crawler.crawl(ranking_url, calendar_url)
+    save_compact(dataset, output)
+
+    size = os.path.getsize(output) / 1024
+    print(f"\n💾 {output}: {len(dataset['teams'])} equips, {len(dataset['matches'])} partits, {size:.1f} KB "
+          f"en {time.perf_counter() - started:.1f}s")
+    client.print_stats()
+
+    if errors:
+        print(f"⚠️ {errors} tasques han fallat: torna a executar per reprendre-les")
+        return 1
+    # Execució completa: la propera torna a descobrir equips i partits
+    journal.reset()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
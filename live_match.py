@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Seguiment en directe d'un partit ACTAWP
+- Consulta només la pàgina del partit (/match/<id>/results) cada pocs segons
+- Mínims bytes per consulta: petició condicional (ETag / Last-Modified) i lectura en streaming
+  que s'atura a la primera taula després del marcador (la capçalera de la pàgina)
+- Detecta canvis de marcador, parcials i estat amb un hash del fragment del marcador
+- El marcador només es llegeix de l'element del marcador (mai del text de la pàgina, on surten
+  temporades com "2025-26") i l'estat és 'live' només amb una marca explícita de partit en joc
+- Actualitza només el partit dins actawp_<equip>_data.json (camp "live"), sense regenerar el document
+- S'atura sol quan l'acta es tanca: marca de tancament a la pàgina o el partit ja surt
+  a la pestanya d'últims resultats de l'equip (que llavors es desa i es notifica)
+
+Ús:
+    python live_match.py 143260144               # busca el partit als actawp_*_data.json
+    python live_match.py --team cadet            # el pròxim partit de l'equip
+    python live_match.py 143260144 --interval 30 --no-notify
+"""
+
+import argparse
+import codecs
+import glob
+import hashlib
+import json
+import os
+import re
+import signal
+import sys
+import threading
+import time
+
+import requests
+
+from actawp_client import BASE_URL, ActawpClient
+from html_engine import make_soup
+from notify_changes import notify_team_changes
+from table_schema import MATCH_ID
+from team_registry import load_teams
+from ultra_robust_parser import ActawpParserV58, now_catalunya, save_json
+
+DEFAULT_INTERVAL = 60
+CLOSE_CHECK_EVERY = 5            # cada quantes consultes es mira la pestanya d'últims resultats
+MAX_DURATION = 4 * 3600          # seguretat: un partit + acta no dura més
+MAX_FRAGMENT_BYTES = 256 * 1024
+CHUNK_SIZE = 4096
+
+SCORE_CLASS = re.compile(r'score|marcador|result', re.IGNORECASE)
+PERIOD_CLASS = re.compile(r'period|parcial|quarter|quart', re.IGNORECASE)
+CLOSED_TEXT = re.compile(r'Acta\s+(?:tancada|cerrada|closed)|Finalitzat|Finalizado|Finished', re.IGNORECASE)
+# Marques de partit en joc: "En joc", "En directe", "Live", "2n quart", "Periodo 3", "Q4"...
+IN_PLAY_TEXT = re.compile(
+    r'\bEn\s+(?:joc|juego|directe|directo)\b|\bLive\b|\bEn\s+curs\b|\bEn\s+curso\b'
+    r'|\b[1-4](?:r|n|t|º|ª)?\s*(?:quart|període|periode|periodo|period)\b'
+    r'|\b(?:quart|període|periode|periodo|period)\s*[1-4]\b|\bQ[1-4]\b',
+    re.IGNORECASE
+)
+# Marcador de waterpolo: 1-2 xifres per equip, sense cap xifra, '/' ni '-' enganxats
+# (descarta temporades "2025-26" i dates)
+LIVE_SCORE = re.compile(r'(?<![\d/\-–])(\d{1,2})\s*[-–]\s*(\d{1,2})(?![\d/\-–])')
+SCORE_ELEMENT = re.compile(r'<[a-z0-9]+\b[^>]*\bclass=["\'][^"\']*(?:score|marcador|result)', re.IGNORECASE)
+TABLE_START = re.compile(r'<table\b', re.IGNORECASE)
+
+
+def read_fragment(response):
+    """Llegeix la resposta per blocs fins a la primera <table> posterior al marcador.
+    Retorna (html llegit, bytes llegits)"""
+    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+    parts = []
+    read = 0
+    try:
+        for chunk in response.iter_content(CHUNK_SIZE):
+            read += len(chunk)
+            parts.append(decoder.decode(chunk))
+            text = ''.join(parts)
+            board = SCORE_ELEMENT.search(text)
+            score = board and LIVE_SCORE.search(text, board.end())
+            if score and TABLE_START.search(text, score.end()):
+                break
+            if read >= MAX_FRAGMENT_BYTES:
+                break
+    finally:
+        response.close()
+    return ''.join(parts), read
+
+
+def parse_scoreboard(fragment):
+    """Marcador, parcials i estat del fragment de capçalera de l'acta.
+    Sense element de marcador no hi ha marcador; sense marca de joc ni parcials l'estat és 'pending'"""
+    soup = make_soup(fragment)
+    text = soup.get_text(' ', strip=True)
+
+    # Només el primer element de marcador: el de la capçalera del partit (després poden venir
+    # taules amb resultats d'altres partits)
+    score = ''
+    board = soup.find(class_=SCORE_CLASS)
+    score_match = LIVE_SCORE.search(board.get_text(' ', strip=True)) if board else None
+    if score_match:
+        score = f"{score_match.group(1)}-{score_match.group(2)}"
+
+    periods = []
+    for el in soup.find_all(class_=PERIOD_CLASS):
+        if el.find(class_=PERIOD_CLASS):
+            continue  # contenidor de parcials: es llegeixen d'un en un
+        period_match = LIVE_SCORE.search(el.get_text(' ', strip=True))
+        if period_match:
+            periods.append(f"{period_match.group(1)}-{period_match.group(2)}")
+
+    if score and CLOSED_TEXT.search(text):
+        status = 'closed'
+    elif score and (periods or IN_PLAY_TEXT.search(text)):
+        status = 'live'
+    else:
+        status = 'pending'
+
+    return {'score': score, 'periods': periods, 'status': status}
+
+
+def scoreboard_hash(scoreboard):
+    return hashlib.sha1(json.dumps(scoreboard, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def match_id_of(match):
+    found = MATCH_ID.search(match.get('url', ''))
+    return found.group(1) if found else None
+
+
+def find_match(match_id=None, team_key=None):
+    """(fitxer JSON, partit d'upcoming_matches) del partit; sense match_id, el pròxim de l'equip"""
+    paths = [load_teams()[team_key]['data_file']] if team_key else sorted(glob.glob('actawp_*_data.json'))
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for match in data.get('upcoming_matches', []):
+            if match_id is None or match_id_of(match) == match_id:
+                return path, match
+    return None, None
+
+
+class LiveMatch:
+    """Estat del seguiment d'un partit: validadors HTTP, hash de l'últim marcador i equip"""
+
+    def __init__(self, match_id, data_file, match_url=None, client=None):
+        self.match_id = match_id
+        self.data_file = data_file
+        self.url = match_url or f"{BASE_URL}/ca/match/{match_id}/results"
+        self.client = client or ActawpClient(timeout=(5, 15), retries=1)
+        self.validators = {}
+        self.last_hash = None
+        self.bytes_read = 0
+        self.polls = 0
+
+        with open(data_file, 'r', encoding='utf-8') as f:
+            metadata = json.load(f).get('metadata', {})
+        self.team_key = metadata.get('team_key') or os.path.basename(data_file)[7:-10]
+        team_info = load_teams().get(self.team_key, {})
+        self.team_id = metadata.get('team_id') or team_info.get('id')
+        self.language = team_info.get('language', 'es')
+
+    def poll(self):
+        """Una consulta de la pàgina del partit. Retorna el marcador si ha canviat, si no None"""
+        self.polls += 1
+        response = self.client.request('GET', self.url, stream=True, headers=self.validators)
+        if response.status_code == 304:
+            response.close()
+            return None
+        if response.status_code != 200:
+            response.close()
+            print(f"  ⚠️ HTTP {response.status_code}")
+            return None
+
+        # Validadors per a la propera petició condicional
+        self.validators = {}
+        if response.headers.get('ETag'):
+            self.validators['If-None-Match'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            self.validators['If-Modified-Since'] = response.headers['Last-Modified']
+
+        fragment, read = read_fragment(response)
+        self.bytes_read += read
+        self.client.add_bytes(self.client.endpoint_name(self.url), read)
+
+        scoreboard = parse_scoreboard(fragment)
+        digest = scoreboard_hash(scoreboard)
+        if digest == self.last_hash:
+            return None
+        self.last_hash = digest
+        return scoreboard
+
+    def update_live(self, scoreboard):
+        """Desa el marcador al partit d'upcoming_matches (la resta del JSON no es toca)"""
+        with open(self.data_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for match in data.get('upcoming_matches', []):
+            if match_id_of(match) == self.match_id:
+                match['live'] = dict(scoreboard, updated_at=now_catalunya().isoformat())
+                break
+        else:
+            print(f"  ⚠️ El partit {self.match_id} ja no és a upcoming_matches")
+            return
+        data['last_update'] = now_catalunya().isoformat()
+        save_json(data, self.data_file)
+
+    def result_published(self, parser):
+        """Últims resultats de l'equip si ja hi surt el partit (acta tancada), si no None"""
+        values = parser.fetch_last_results(self.team_id, self.language)
+        if not values:
+            return None
+        if any(match_id_of(r) == self.match_id for r in values['last_results']):
+            return values['last_results']
+        return None
+
+    def finish(self, results, notify=True):
+        """Acta tancada: desa els últims resultats, treu el partit d'upcoming_matches i notifica"""
+        with open(self.data_file, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        data = dict(previous)
+
+        # La pestanya no porta les dates del calendari: es conserven les que ja teníem
+        dates = {r.get('url'): r.get('date') for r in previous.get('last_results', []) + previous.get('upcoming_matches', [])}
+        for r in results:
+            if not r.get('date') and dates.get(r.get('url')):
+                r['date'] = dates[r['url']]
+
+        data['last_results'] = results
+        data['upcoming_matches'] = [m for m in previous.get('upcoming_matches', []) if match_id_of(m) != self.match_id]
+        data['last_update'] = now_catalunya().isoformat()
+        save_json(data, self.data_file)
+        print(f"💾 Resultat final desat a {self.data_file}")
+
+        if notify:
+            try:
+                notify_team_changes(self.team_key.upper(), previous, data)
+            except Exception as e:
+                print(f"⚠️ Error enviant notificacions (continuem): {e}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Seguiment en directe d'un partit ACTAWP")
+    ap.add_argument('match', nargs='?', help="ID o URL del partit (per defecte el pròxim de --team)")
+    ap.add_argument('--team', choices=list(load_teams()), help="Equip (limita la cerca a actawp_<equip>_data.json)")
+    ap.add_argument('--interval', type=int, default=DEFAULT_INTERVAL, help="Segons entre consultes")
+    ap.add_argument('--no-notify', action='store_true', help="No enviar notificacions OneSignal")
+    args = ap.parse_args()
+
+    if not args.match and not args.team:
+        ap.error("Cal un ID de partit o --team")
+
+    match_id = None
+    if args.match:
+        found = MATCH_ID.search(args.match)
+        match_id = found.group(1) if found else args.match.strip()
+
+    data_file, match = find_match(match_id, args.team)
+    if not data_file:
+        print(f"❌ No s'ha trobat el partit {match_id or ''} a upcoming_matches")
+        return 1
+    match_id = match_id or match_id_of(match)
+
+    live = LiveMatch(match_id, data_file, match.get('url'))
+    parser = ActawpParserV58(client=live.client)
+    parser.current_team_key = live.team_key
+
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        print(f"\n🛑 Senyal {signal.Signals(signum).name}: aturant el seguiment")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    print(f"🔴 Directe: {match.get('team1', '?')} vs {match.get('team2', '?')} ({match_id})")
+    print(f"   {live.url} cada {args.interval}s → {data_file}")
+    started = time.monotonic()
+    status = 'pending'
+
+    while not stop.is_set():
+        try:
+            scoreboard = live.poll()
+        except requests.RequestException as e:
+            print(f"  ⚠️ Error de xarxa: {e}")
+            scoreboard = None
+
+        if scoreboard:
+            status = scoreboard['status']
+            periods = f" ({', '.join(scoreboard['periods'])})" if scoreboard['periods'] else ''
+            print(f"  ⚽ {now_catalunya().strftime('%H:%M:%S')} {scoreboard['score'] or '-'}{periods} [{status}]")
+            live.update_live(scoreboard)
+
+        # L'acta tancada es confirma amb la pestanya d'últims resultats (la que publica el JSON)
+        if status == 'closed' or live.polls % CLOSE_CHECK_EVERY == 0:
+            results = live.result_published(parser)
+            if results:
+                live.finish(results, notify=not args.no_notify)
+                break
+
+        if time.monotonic() - started > MAX_DURATION:
+            print("⏱️ Temps màxim de seguiment superat")
+            break
+        stop.wait(args.interval)
+
+    print(f"📉 {live.polls} consultes, {live.bytes_read / 1024:.1f} KB llegits")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,185 +1,426 @@
 """
 Parser DEFINITIU per obtenir la convocatòria d'un partit d'ACTAWP
-Usa Playwright - la solució més fiable per GitHub Actions
+- Camí ràpid per HTTP: descarrega l'acta i la parseja amb acta_parser (menys d'1 s)
+- Playwright només si l'acta es renderitza al client (sense taules a l'HTML)
 
 Instal·lació:
-    pip install playwright
-    playwright install chromium
+    pip install requests beautifulsoup4 lxml
+    pip install playwright && playwright install chromium   # només per a l'alternativa
+
+- Mode per lots: moltes actes amb un sol navegador i un grup de pàgines en paral·lel,
+  saltant els partits que ja tenen un match_{id}_lineup.json recent
 
 Ús:
     python match_lineup_parser.py URL_PARTIT
+    python match_lineup_parser.py URL_PARTIT --no-browser   # falla en lloc d'obrir el navegador
+    python match_lineup_parser.py URL_PARTIT --browser      # força Playwright
+    python match_lineup_parser.py URL1 URL2 URL3 --workers 4
+    python match_lineup_parser.py --from-data actawp_cadet_data.json --max-age 6
 """
 
+import argparse
+import asyncio
 import json
+import os
 import sys
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from acta_parser import extract_rosters, find_team_roster
+from actawp_client import ActawpClient
 
 try:
-    from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+    from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
     HAS_PLAYWRIGHT = True
 except ImportError:
     HAS_PLAYWRIGHT = False
 
-def get_match_lineup(match_url):
-    """Obté jugadors convocats per CN Terrassa"""
+OWN_TEAM = 'CN TERRASSA'
+MAX_DORSAL = 99
+
+# Una convocatòria es considera recent durant aquestes hores (no es torna a generar)
+DEFAULT_MAX_AGE_HOURS = 6
+DEFAULT_WORKERS = 4
+
+BROWSER_ARGS = [
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-http2',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage',
+    '--disable-gpu'
+]
+
+# Indicis d'una pàgina que es munta amb JavaScript (l'HTML no porta les dades)
+CLIENT_RENDERED_MARKERS = ('id="app"', "id='app'", 'id="root"', '__NEXT_DATA__', 'ng-app', 'data-reactroot', 'window.__NUXT__')
+
+
+def is_client_rendered(html):
+    """L'HTML no té taules i sembla una aplicació de JavaScript (o és pràcticament buit)"""
+    if '<table' in html.lower():
+        return False
+    return any(marker in html for marker in CLIENT_RENDERED_MARKERS) or len(html) < 2000
+
+
+def candidate_urls(match_url):
+    """L'URL donada i la de la pestanya d'estadístiques (/stats), on hi ha les taules de jugadors"""
+    urls = [match_url]
+    if '/results' in match_url:
+        urls.append(match_url.replace('/results', '/stats'))
+    elif not match_url.rstrip('/').endswith('/stats'):
+        urls.append(match_url.rstrip('/') + '/stats')
+    return urls
+
+
+def get_match_lineup(match_url, browser='auto'):
+    """Obté jugadors convocats per CN Terrassa. browser: 'auto' (només si cal), 'never' o 'always'"""
+    started = time.perf_counter()
+    
+    if browser != 'always':
+        result, reason = get_match_lineup_http(match_url)
+        if result is not None:
+            print(f"⚡ Convocatòria obtinguda per HTTP en {time.perf_counter() - started:.2f} s")
+            return result
+        
+        print(f"⚠️ Camí ràpid sense resultat: {reason}")
+        if browser == 'never':
+            return {"error": f"No s'ha pogut obtenir la convocatòria per HTTP: {reason}"}
+        print("🔁 Provant amb el navegador (Playwright)...")
     
+    return get_match_lineup_browser(match_url)
+
+
+def get_match_lineup_http(match_url, client=None):
+    """Camí ràpid: acta per HTTP + acta_parser. Retorna (resultat, None) o (None, motiu)"""
     match_id_search = re.search(r'/match/(\d+)', match_url)
     if not match_id_search:
-        return {"error": "No s'ha pogut trobar l'ID del partit a la URL"}
+        return {"error": "No s'ha pogut trobar l'ID del partit a la URL"}, None
     
-    match_id = match_id_search.group(1)
+    client = client or ActawpClient(timeout=(5, 15), retries=2)
+    reason = "no s'han trobat taules de jugadors"
+    client_rendered = False
     
-    result = {
-        "match_url": match_url,
-        "match_id": match_id,
-        "cn_terrassa_players": [],
-        "rival_team": ""
-    }
+    for url in candidate_urls(match_url):
+        print(f"🌐 Accedint a: {url}")
+        try:
+            response = client.get(url)
+        except requests.RequestException as e:
+            reason = f"error de xarxa ({e})"
+            continue
+        
+        if response.status_code != 200:
+            reason = f"HTTP {response.status_code}"
+            continue
+        
+        if is_client_rendered(response.text):
+            client_rendered = True
+            continue
+        
+        rosters = [r for r in extract_rosters(response.text, max_dorsal=MAX_DORSAL) if r['players']]
+        print(f"📊 Trobades {len(rosters)} taules de jugadors")
+        if not rosters:
+            continue
+        
+        # La taula de CN Terrassa; si cap capçalera la identifica, la primera (com el parser del navegador)
+        own = find_team_roster(rosters, OWN_TEAM) or rosters[0]
+        others = [r for r in rosters if r is not own and r['team']]
+        
+        result = {
+            "match_url": match_url,
+            "match_id": match_id_search.group(1),
+            "cn_terrassa_players": sorted(unique_players(own['players']), key=lambda x: x["num"]),
+            "rival_team": others[0]['team'] if others else ""
+        }
+        
+        for p in result["cn_terrassa_players"][:3]:
+            print(f"      {p['num']:2d}. {p['name']}")
+        return result, None
     
+    if client_rendered:
+        return None, "contingut renderitzat al client (sense taules a l'HTML)"
+    return None, reason
+
+
+def unique_players(players):
+    seen = set()
+    unique = []
+    for p in players:
+        key = (p["num"], p["name"])
+        if key not in seen:
+            seen.add(key)
+            unique.append(p)
+    return unique
+
+
+# Selector que indica que l'acta ja s'ha renderitzat
+TABLE_READY_SELECTOR = 'table tr td'
+
+# Extracció en una sola anada i tornada: taules -> files -> textos de les primeres 5 cel·les
+EXTRACT_TABLES_JS = """
+() => ({
+    tables: Array.from(document.querySelectorAll('table')).map(table =>
+        Array.from(table.querySelectorAll('tr')).map(row =>
+            Array.from(row.querySelectorAll('td, th')).slice(0, 5).map(cell => cell.innerText.trim())
+        )
+    ),
+    headings: Array.from(document.querySelectorAll('h1, h2, h3, h4, .team-name')).map(h => h.innerText.trim())
+})
+"""
+
+HEADER_CELLS = ['', 'NÚM', 'Nº', '#', 'NUM', 'DORSAL', 'G', 'GS', 'GI', 'GP']
+INVALID_NAMES = ['TERRASSA', 'MONTJUIC', 'CN', 'C.N.', 'TOTAL', 'EQUIP']
+DORSAL_PATTERN = re.compile(r'^\d{1,2}$')
+
+
+def players_from_rows(rows):
+    """Jugadors d'una taula (llista de files amb els textos de les cel·les): número + nom consecutius"""
+    players = []
+    for cell_values in rows:
+        if len(cell_values) < 2:
+            continue
+        
+        for i in range(len(cell_values) - 1):
+            num_text = cell_values[i]
+            name_text = cell_values[i + 1]
+            
+            # Saltar capçaleres
+            if num_text.upper() in HEADER_CELLS:
+                continue
+            
+            # Verificar patró: número (1-99) + nom (més de 3 caràcters)
+            if DORSAL_PATTERN.match(num_text) and name_text:
+                num = int(num_text)
+                name = name_text.upper()
+                
+                if 1 <= num <= 99 and len(name) > 3 and not name.isdigit() and name not in INVALID_NAMES:
+                    players.append({"num": num, "name": name})
+                    break  # No buscar més en aquesta fila
+    return players
+
+
+def players_from_tables(tables):
+    """Jugadors de la primera taula (de 3 files o més) que en tingui"""
+    for idx, rows in enumerate(tables):
+        print(f"🔍 Taula {idx+1}:")
+        
+        if len(rows) < 3:
+            print(f"   ⏭️  Massa petita ({len(rows)} files)\n")
+            continue
+        
+        for cell_values in rows[:3]:
+            line = ' '.join(v for v in cell_values if v)
+            if line:
+                print(f"   {line[:70]}")
+        
+        players = players_from_rows(rows)
+        if players:
+            print(f"   ✅ {len(players)} jugadors trobats!")
+            for p in players[:3]:
+                print(f"      {p['num']:2d}. {p['name']}")
+            if len(players) > 3:
+                print(f"      ... i {len(players)-3} més")
+            return players
+        
+        print(f"   ❌ No s'han trobat jugadors\n")
+    
+    return []
+
+
+def get_match_lineup_browser(match_url):
+    """Alternativa amb Playwright per a actes renderitzades al client"""
+    return get_match_lineups_browser([match_url], workers=1)[match_url]
+
+
+def get_match_lineups_browser(match_urls, workers=DEFAULT_WORKERS):
+    """Diverses actes amb un sol navegador. Retorna {url: resultat}"""
     if not HAS_PLAYWRIGHT:
-        return {"error": "Playwright no disponible. Instal·la: pip install playwright && playwright install chromium"}
+        error = {"error": "Playwright no disponible. Instal·la: pip install playwright && playwright install chromium"}
+        return {url: error for url in match_urls}
+    return asyncio.run(browse_lineups(match_urls, workers))
+
+
+async def browse_lineups(match_urls, workers):
+    """Un navegador i un context compartits; grup de fins a `workers` pàgines reutilitzades"""
+    results = {}
     
-    with sync_playwright() as p:
+    async with async_playwright() as p:
         print("🚀 Iniciant navegador...")
-        browser = p.chromium.launch(
-            headless=True,
-            args=[
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-                '--disable-http2',
-                '--disable-blink-features=AutomationControlled',
-                '--disable-dev-shm-usage',
-                '--disable-gpu'
-            ]
-        )
-        
-        context = browser.new_context(
+        browser = await p.chromium.launch(headless=True, args=BROWSER_ARGS)
+        context = await browser.new_context(
             user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             viewport={'width': 1920, 'height': 1080},
             ignore_https_errors=True
         )
         
-        page = context.new_page()
+        pages = asyncio.Queue()
+        for _ in range(max(1, min(workers, len(match_urls)))):
+            pages.put_nowait(await context.new_page())
         
-        try:
-            print(f"🌐 Accedint a: {match_url}")
-            
+        async def process(url):
+            page = await pages.get()
             try:
-                page.goto(match_url, wait_until="networkidle", timeout=40000)
-            except Exception:
-                try:
-                    page.goto(match_url, wait_until="load", timeout=40000)
-                except Exception:
-                    page.goto(match_url, timeout=40000)
-            
-            page.wait_for_timeout(3000)
-            
-            print("🔍 Buscant jugadors...")
-            
-            # Buscar totes les taules
-            tables = page.query_selector_all('table')
-            print(f"📊 Trobades {len(tables)} taules\n")
-            
-            for idx, table in enumerate(tables):
-                print(f"🔍 Taula {idx+1}:")
-                
-                rows = table.query_selector_all('tr')
-                
-                if len(rows) < 3:
-                    print(f"   ⏭️  Massa petita ({len(rows)} files)\n")
-                    continue
-                
-                # Mostrar preview
-                table_text = table.inner_text()
-                lines_preview = table_text.split('\n')[:3]
-                for line in lines_preview:
-                    if line.strip():
-                        print(f"   {line.strip()[:70]}")
-                
-                # Processar files buscant patró: número + nom
-                temp_players = []
-                
-                for row_idx, row in enumerate(rows):
-                    cells = row.query_selector_all('td, th')
-                    
-                    if len(cells) < 2:
-                        continue
-                    
-                    # Agafar text de cada cel·la
-                    cell_values = []
-                    for cell in cells[:5]:  # Només primeres 5 columnes
-                        text = cell.inner_text().strip()
-                        cell_values.append(text)
-                    
-                    # Buscar número + nom en les primeres columnes
-                    for i in range(len(cell_values) - 1):
-                        num_text = cell_values[i]
-                        name_text = cell_values[i + 1]
-                        
-                        # Saltar capçaleres
-                        if num_text.upper() in ['', 'NÚM', 'Nº', '#', 'NUM', 'DORSAL', 'G', 'GS', 'GI', 'GP']:
-                            continue
-                        
-                        # Verificar patró: número (1-99) + nom (més de 3 caràcters)
-                        if re.match(r'^\d{1,2}$', num_text) and name_text:
-                            num = int(num_text)
-                            name = name_text.upper()
-                            
-                            # Validar
-                            if (1 <= num <= 99 and
-                                len(name) > 3 and
-                                not name.isdigit() and
-                                name not in ['TERRASSA', 'MONTJUIC', 'CN', 'C.N.', 'TOTAL', 'EQUIP']):
-                                
-                                temp_players.append({
-                                    "num": num,
-                                    "name": name
-                                })
-                                break  # No buscar més en aquesta fila
-                
-                if temp_players:
-                    print(f"   ✅ {len(temp_players)} jugadors trobats!")
-                    for p in temp_players[:3]:
-                        print(f"      {p['num']:2d}. {p['name']}")
-                    if len(temp_players) > 3:
-                        print(f"      ... i {len(temp_players)-3} més")
-                    
-                    result["cn_terrassa_players"].extend(temp_players)
-                    break
-                else:
-                    print(f"   ❌ No s'han trobat jugadors\n")
-            
-            # Buscar equip rival
-            if result["cn_terrassa_players"]:
-                headers = page.query_selector_all('h1, h2, h3, h4, .team-name')
-                for header in headers:
-                    text = header.inner_text().strip()
-                    if text and 'TERRASSA' not in text.upper() and len(text) > 3:
-                        result["rival_team"] = text
-                        break
-            
-            # Eliminar duplicats i ordenar
-            seen = set()
-            unique = []
-            for p in result["cn_terrassa_players"]:
-                key = (p["num"], p["name"])
-                if key not in seen:
-                    seen.add(key)
-                    unique.append(p)
-            
-            result["cn_terrassa_players"] = sorted(unique, key=lambda x: x["num"])
-            
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            import traceback
-            traceback.print_exc()
-            return {"error": str(e)}
+                results[url] = await browse_lineup(page, url)
+            except Exception as e:
+                print(f"❌ Error ({url}): {e}")
+                results[url] = {"error": str(e)}
+            finally:
+                pages.put_nowait(page)
+        
+        try:
+            await asyncio.gather(*(process(url) for url in match_urls))
         finally:
-            context.close()
-            browser.close()
+            await context.close()
+            await browser.close()
+    
+    return results
+
+
+async def browse_lineup(page, match_url):
+    """Convocatòria d'una acta amb una pàgina del navegador ja oberta"""
+    match_id_search = re.search(r'/match/(\d+)', match_url)
+    if not match_id_search:
+        return {"error": "No s'ha pogut trobar l'ID del partit a la URL"}
+    
+    result = {
+        "match_url": match_url,
+        "match_id": match_id_search.group(1),
+        "cn_terrassa_players": [],
+        "rival_team": ""
+    }
     
+    print(f"🌐 Accedint a: {match_url}")
+    await page.goto(match_url, wait_until="domcontentloaded", timeout=40000)
+    
+    # Esperar que hi hagi alguna cel·la de taula en lloc d'una pausa fixa
+    try:
+        await page.wait_for_selector(TABLE_READY_SELECTOR, timeout=15000)
+    except PlaywrightTimeout:
+        print(f"⚠️ No ha aparegut cap taula en 15 s ({match_url})")
+    
+    # Una sola crida al navegador: totes les taules com a matriu de textos i les capçaleres
+    data = await page.evaluate(EXTRACT_TABLES_JS)
+    tables = data.get('tables', [])
+    print(f"📊 Partit {result['match_id']}: {len(tables)} taules\n")
+    
+    players = players_from_tables(tables)
+    
+    # Buscar equip rival
+    if players:
+        for text in data.get('headings', []):
+            if text and 'TERRASSA' not in text.upper() and len(text) > 3:
+                result["rival_team"] = text
+                break
+    
+    # Eliminar duplicats i ordenar
+    result["cn_terrassa_players"] = sorted(unique_players(players), key=lambda x: x["num"])
     return result
 
+
+def match_id_of(match_url):
+    match_id_search = re.search(r'/match/(\d+)', match_url)
+    return match_id_search.group(1) if match_id_search else None
+
+
+def lineup_file(match_id):
+    return f"match_{match_id}_lineup.json"
+
+
+def is_fresh(path, max_age_hours):
+    """Segons generated_at del fitxer (el checkout de git no conserva les dates de modificació).
+    Els fitxers antics sense generated_at no es consideren recents i es tornen a generar"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            generated_at = json.load(f).get('generated_at')
+        if not generated_at:
+            return False
+        generated = datetime.fromisoformat(generated_at).timestamp()
+    except (OSError, ValueError, TypeError, AttributeError):
+        return False
+    return time.time() - generated < max_age_hours * 3600
+
+
+def urls_from_data(data_file):
+    """URLs dels pròxims partits (upcoming_matches[*].url) del JSON generat per ultra_robust_parser.py"""
+    with open(data_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    urls = []
+    for match in data.get('upcoming_matches', []):
+        url = match.get('url')
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+
+def save_lineup(lineup_data):
+    """Escriu match_{id}_lineup.json (format de l'app). Retorna (dades formatades, fitxer)"""
+    formatted = format_for_app(lineup_data)
+    if "error" in formatted:
+        return formatted, None
+    
+    output_file = lineup_file(lineup_data.get('match_id', 'unknown'))
+    tmp_file = f"{output_file}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(formatted, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, output_file)
+    return formatted, output_file
+
+
+def run_batch(match_urls, browser='auto', workers=DEFAULT_WORKERS, max_age_hours=DEFAULT_MAX_AGE_HOURS, force=False):
+    """Genera les convocatòries de diversos partits. Retorna el nombre de partits fallits"""
+    started = time.perf_counter()
+    
+    pending = []
+    for url in match_urls:
+        match_id = match_id_of(url)
+        if not match_id:
+            print(f"⚠️ URL sense ID de partit, s'ignora: {url}")
+            continue
+        if not force and is_fresh(lineup_file(match_id), max_age_hours):
+            print(f"⏭️  Partit {match_id}: convocatòria recent (< {max_age_hours} h)")
+            continue
+        pending.append(url)
+    
+    print(f"📋 {len(pending)} partits per processar ({len(match_urls) - len(pending)} saltats)\n")
+    
+    results = {}
+    reasons = {}
+    
+    # 1. Camí ràpid per HTTP en paral·lel, amb un sol client (límit de ritme compartit)
+    if browser != 'always' and pending:
+        client = ActawpClient(timeout=(5, 15), retries=2)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for url, (result, reason) in zip(pending, executor.map(lambda u: get_match_lineup_http(u, client), pending)):
+                if result is not None:
+                    results[url] = result
+                else:
+                    reasons[url] = reason
+                    print(f"⚠️ Partit {match_id_of(url)}: {reason}")
+    
+    # 2. La resta amb un sol navegador
+    remaining = [url for url in pending if url not in results]
+    if remaining and browser != 'never':
+        print(f"\n🔁 {len(remaining)} partits amb el navegador ({workers} pàgines)...")
+        results.update(get_match_lineups_browser(remaining, workers))
+    
+    failed = 0
+    print(f"\n{'='*60}")
+    for url in pending:
+        lineup_data = results.get(url) or {"error": f"No s'ha pogut obtenir per HTTP: {reasons.get(url)}"}
+        formatted, output_file = save_lineup(lineup_data)
+        if output_file:
+            print(f"  ✅ {output_file}: {formatted['count']} jugadors {formatted['rival_team'] and '- ' + formatted['rival_team']}")
+        else:
+            failed += 1
+            print(f"  ❌ Partit {match_id_of(url)}: {formatted['error']}")
+    
+    print(f"\n⏱️ {len(pending)} partits en {time.perf_counter() - started:.1f} s ({failed} errors)")
+    return failed
+
+
 def format_for_app(lineup_data):
     """Formata per a l'app"""
     if "error" in lineup_data:
@@ -192,22 +433,41 @@ def format_for_app(lineup_data):
         "rival_team": lineup_data.get("rival_team", ""),
         "rival_players": [],
         "js_code": "let players = " + json.dumps(players, ensure_ascii=False, indent=2) + ";",
-        "count": len(players)
+        "count": len(players),
+        "generated_at": datetime.now().isoformat(timespec='seconds')
     }
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Ús: python match_lineup_parser.py <URL_PARTIT>")
-        sys.exit(1)
+    ap = argparse.ArgumentParser(description="Convocatòries de partits d'ACTAWP")
+    ap.add_argument('urls', nargs='*', help="URL(s) del partit")
+    ap.add_argument('--from-data', help="Partits pendents de upcoming_matches (p.ex. actawp_cadet_data.json)")
+    ap.add_argument('--browser', action='store_true', help="Força Playwright")
+    ap.add_argument('--no-browser', action='store_true', help="Falla en lloc d'obrir el navegador")
+    ap.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Peticions / pàgines en paral·lel")
+    ap.add_argument('--max-age', type=float, default=DEFAULT_MAX_AGE_HOURS, help="Hores en què una convocatòria és recent")
+    ap.add_argument('--force', action='store_true', help="Regenera encara que hi hagi un fitxer recent")
+    args = ap.parse_args()
     
-    match_url = sys.argv[1]
+    browser = 'never' if args.no_browser else 'always' if args.browser else 'auto'
     
     print(f"\n{'='*60}")
     print("🏊 CN TERRASSA - Parser de Convocatòries")
     print(f"{'='*60}\n")
     
-    lineup_data = get_match_lineup(match_url)
-    formatted = format_for_app(lineup_data)
+    # Mode per lots: diverses URLs o els pròxims partits del JSON
+    if args.from_data or len(args.urls) > 1:
+        match_urls = list(args.urls)
+        if args.from_data:
+            match_urls += [u for u in urls_from_data(args.from_data) if u not in match_urls]
+        failed = run_batch(match_urls, browser, args.workers, args.max_age, args.force)
+        sys.exit(1 if failed else 0)
+    
+    if not args.urls:
+        ap.print_usage()
+        sys.exit(1)
+    
+    lineup_data = get_match_lineup(args.urls[0], browser)
+    formatted, output_file = save_lineup(lineup_data)
     
     if "error" in formatted:
         print(f"\n❌ ERROR: {formatted['error']}\n")
@@ -223,12 +483,5 @@ if __name__ == "__main__":
     if formatted['rival_team']:
         print(f"\n🆚 Rival: {formatted['rival_team']}")
     
-    # Guardar JSON
-    match_id = lineup_data.get('match_id', 'unknown')
-    output_file = f"match_{match_id}_lineup.json"
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(formatted, f, ensure_ascii=False, indent=2)
-    
     print(f"\n💾 Fitxer: {output_file}\n")
     print("="*60 + "\n")
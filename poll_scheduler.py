@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Planificador del workflow update_actawp.yml segons el calendari de partits
+- Llegeix upcoming_matches (data + hora), last_results i calendar_dates dels JSON d'ACTAWP
+- Interval entre execucions segons la proximitat a un partit:
+  durant el partit cada 15 min, les hores següents cada hora, la resta del dia del partit
+  cada 2 h, el dia abans/després cada 6 h i la resta de dies cada 12 h
+- Només biblioteca estàndard: el workflow el pot cridar abans d'instal·lar dependències
+
+Ús:
+    python poll_scheduler.py should-run                 # "run=true/false" i "tick" (també a $GITHUB_OUTPUT)
+    python poll_scheduler.py next-due
+    python poll_scheduler.py mark-run --now TICK        # guarda el tick del cron de l'execució
+    python poll_scheduler.py simulate --days 14         # execucions previstes vs cron fix de 30 min
+
+L'última execució es guarda com el tick del cron que l'ha disparat (no l'hora en què acaba
+la descàrrega) i is_due admet mig pas de cron de marge: els retards de GitHub i la durada
+del scrape no fan saltar el tick següent
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+from datetime import date, datetime, timedelta, timezone
+
+try:
+    from zoneinfo import ZoneInfo
+    TZ_CATALUNYA = ZoneInfo('Europe/Madrid')
+except Exception:
+    TZ_CATALUNYA = None
+
+DATA_FILES = 'actawp_*_data.json'
+STATE_FILE = os.environ.get('POLL_STATE_FILE', os.path.join('.actawp_cache', 'poll_state.json'))
+
+# Finestres al voltant de l'hora d'inici d'un partit
+LIVE_BEFORE = timedelta(minutes=30)
+LIVE_AFTER = timedelta(hours=3)        # partit (~1h30) + publicació de l'acta
+AFTER_MATCH = timedelta(hours=8)       # classificació i resultats dels altres partits
+
+# Interval mínim entre execucions per fase
+INTERVALS = {
+    'live': timedelta(minutes=15),
+    'after-match': timedelta(hours=1),
+    'match-day': timedelta(hours=2),
+    'near-match': timedelta(hours=6),
+    'idle': timedelta(hours=12),
+}
+
+# Hores en què el cron del workflow s'executa (UTC)
+CRON_HOURS_UTC = range(7, 22)
+CRON_STEP = timedelta(minutes=15)
+LEGACY_CRON_STEP = timedelta(minutes=30)
+# Marge de is_due: una execució del tick anterior compta com a feta un interval abans
+TOLERANCE = CRON_STEP / 2
+# Retard típic del cron de GitHub (per a simulate)
+CRON_DELAY = timedelta(minutes=5)
+
+
+def local_offset(moment):
+    """Desplaçament de Catalunya (UTC+1 / UTC+2 en horari d'estiu) si no hi ha zoneinfo"""
+    if TZ_CATALUNYA:
+        return moment.astimezone(TZ_CATALUNYA).utcoffset()
+
+    def last_sunday(year, month):
+        d = date(year, month, 31)
+        return d - timedelta(days=(d.weekday() + 1) % 7)
+
+    utc = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    start = datetime.combine(last_sunday(utc.year, 3), datetime.min.time()) + timedelta(hours=1)
+    end = datetime.combine(last_sunday(utc.year, 10), datetime.min.time()) + timedelta(hours=1)
+    return timedelta(hours=2) if start <= utc < end else timedelta(hours=1)
+
+
+def to_local(moment):
+    return moment.astimezone(timezone(local_offset(moment)))
+
+
+def parse_local(date_text, time_text=None):
+    """'DD/MM/YYYY' (+ 'HH:MM') en hora de Catalunya -> datetime amb zona, o None"""
+    try:
+        day = datetime.strptime(date_text.strip(), '%d/%m/%Y')
+    except (AttributeError, ValueError):
+        return None
+    if time_text:
+        try:
+            t = datetime.strptime(time_text.strip(), '%H:%M')
+            day = day.replace(hour=t.hour, minute=t.minute)
+        except ValueError:
+            pass
+    # Primer aproximació amb UTC+1 i després el desplaçament real d'aquell moment
+    guess = day.replace(tzinfo=timezone(timedelta(hours=1)))
+    return day.replace(tzinfo=timezone(local_offset(guess)))
+
+
+def load_schedule(paths):
+    """Partits coneguts: (inici o None, dia). Sense hora només se sap el dia del partit"""
+    kickoffs = []
+    match_days = set()
+    last_updates = []
+
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+
+        for match in data.get('upcoming_matches', []):
+            start = parse_local(match.get('date'), match.get('time'))
+            if start:
+                match_days.add(start.date())
+                if match.get('time'):
+                    kickoffs.append(start)
+
+        for result in data.get('last_results', []):
+            day = parse_local(result.get('date'))
+            if day:
+                match_days.add(day.date())
+
+        for text in data.get('calendar_dates', []):
+            day = parse_local(text)
+            if day:
+                match_days.add(day.date())
+
+        if data.get('last_update'):
+            try:
+                last_updates.append(datetime.fromisoformat(data['last_update']))
+            except ValueError:
+                pass
+
+    return sorted(set(kickoffs)), match_days, max(last_updates) if last_updates else None
+
+
+def phase_at(moment, kickoffs, match_days):
+    """Fase del planificador en un moment donat"""
+    for start in kickoffs:
+        if start - LIVE_BEFORE <= moment <= start + LIVE_AFTER:
+            return 'live'
+    for start in kickoffs:
+        if start + LIVE_AFTER < moment <= start + AFTER_MATCH:
+            return 'after-match'
+
+    today = to_local(moment).date()
+    if today in match_days:
+        return 'match-day'
+    if today + timedelta(days=1) in match_days or today - timedelta(days=1) in match_days:
+        return 'near-match'
+    return 'idle'
+
+
+def is_due(moment, last_run, kickoffs, match_days):
+    if last_run is None:
+        return True
+    return moment - last_run >= INTERVALS[phase_at(moment, kickoffs, match_days)] - TOLERANCE
+
+
+def cron_tick(moment, step=CRON_STEP):
+    """Tick del cron que correspon a un moment (arrodonit avall al pas del cron)"""
+    minutes = int(step.total_seconds() // 60)
+    return moment.replace(minute=moment.minute - moment.minute % minutes, second=0, microsecond=0)
+
+
+def current_phase(now=None, paths=None):
+    """Fase actual segons els JSON d'ACTAWP (la fa servir actawp_cache per triar els TTL)"""
+    kickoffs, match_days, _ = load_schedule(paths if paths is not None else sorted(glob.glob(DATA_FILES)))
+    return phase_at(now or datetime.now(timezone.utc), kickoffs, match_days)
+
+
+def cron_ticks(start, end, step=CRON_STEP):
+    """Moments en què el cron del workflow s'executa entre start i end"""
+    tick = cron_tick(start, step)
+    while tick <= end:
+        if tick >= start and tick.astimezone(timezone.utc).hour in CRON_HOURS_UTC:
+            yield tick
+        tick += step
+
+
+def next_due(now, last_run, kickoffs, match_days, horizon=timedelta(days=14)):
+    for tick in cron_ticks(now, now + horizon):
+        if is_due(tick, last_run, kickoffs, match_days):
+            return tick
+    return None
+
+
+def load_state(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return datetime.fromisoformat(json.load(f)['last_run'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_state(path, moment):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'last_run': moment.isoformat()}, f)
+    os.replace(tmp_path, path)
+
+
+def write_github_output(**values):
+    output = os.environ.get('GITHUB_OUTPUT')
+    if output:
+        with open(output, 'a', encoding='utf-8') as f:
+            for key, value in values.items():
+                f.write(f"{key}={value}\n")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Planificador de les actualitzacions ACTAWP")
+    ap.add_argument('command', choices=['should-run', 'next-due', 'mark-run', 'simulate'])
+    ap.add_argument('--data', nargs='*', help=f"JSON d'ACTAWP (per defecte {DATA_FILES})")
+    ap.add_argument('--state', default=STATE_FILE, help="Fitxer amb l'hora de l'última execució")
+    ap.add_argument('--now', help="Moment de referència ISO (per proves)")
+    ap.add_argument('--days', type=int, default=7, help="Dies a simular")
+    ap.add_argument('--delay', type=int, default=int(CRON_DELAY.total_seconds() // 60),
+                    help="Retard del cron de GitHub en minuts (per a simulate)")
+    args = ap.parse_args()
+
+    now = datetime.fromisoformat(args.now) if args.now else datetime.now(timezone.utc)
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=timezone.utc)
+
+    kickoffs, match_days, last_update = load_schedule(args.data or sorted(glob.glob(DATA_FILES)))
+    # Última execució: el fitxer d'estat o, si no n'hi ha, el last_update dels JSON publicats
+    last_run = load_state(args.state) or last_update
+
+    if args.command == 'mark-run':
+        tick = cron_tick(now)
+        save_state(args.state, tick)
+        print(f"💾 Última execució: {tick.isoformat()}")
+        return 0
+
+    if args.command == 'simulate':
+        runs = 0
+        legacy = sum(1 for _ in cron_ticks(now, now + timedelta(days=args.days), LEGACY_CRON_STEP))
+        phases = {}
+        delay = timedelta(minutes=args.delay)
+        for tick in cron_ticks(now, now + timedelta(days=args.days)):
+            # Com al workflow: should-run s'executa amb retard i mark-run guarda el tick
+            started = tick + delay
+            if is_due(started, last_run, kickoffs, match_days):
+                runs += 1
+                last_run = cron_tick(started)
+                phase = phase_at(started, kickoffs, match_days)
+                phases[phase] = phases.get(phase, 0) + 1
+        saving = 1 - runs / legacy if legacy else 0
+        print(f"📅 {args.days} dies: {runs} execucions (cron fix: {legacy}, estalvi {saving:.0%})")
+        for phase, count in sorted(phases.items(), key=lambda item: -item[1]):
+            print(f"  {phase:<12} {count:>4}")
+        return 0
+
+    phase = phase_at(now, kickoffs, match_days)
+    due = is_due(now, last_run, kickoffs, match_days)
+
+    if args.command == 'next-due':
+        when = now if due else next_due(now, last_run, kickoffs, match_days)
+        print(when.isoformat() if when else 'none')
+        write_github_output(next_due=when.isoformat() if when else 'none')
+        return 0
+
+    last_text = to_local(last_run).strftime('%Y-%m-%d %H:%M') if last_run else 'mai'
+    print(f"🗓️ Fase: {phase} (interval {INTERVALS[phase]}), última execució: {last_text}")
+    print(f"{'✅' if due else '⏭️ '} run={'true' if due else 'false'}")
+    write_github_output(run='true' if due else 'false', phase=phase, tick=cron_tick(now).isoformat())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
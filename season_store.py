@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Magatzem columnar de la temporada a partir dels cnt_stats_<data>_<rival>.json
+- Totes les accions (chronologicalActions) de tots els partits en columnes tipades (array):
+  partit, timestamp, quart, tipus, equip, dorsal, porter, falta sobre, detall, zona de gol i zona del camp
+- Els textos es codifiquen amb diccionari (un enter per valor, els textos una sola vegada)
+- Un sol fitxer binari (season_store.bin): capçalera JSON + les columnes seguides
+- Reconstrucció incremental: només es parsegen els fitxers de partit nous o modificats
+- load() retorna les columnes com a arrays de NumPy (requereix NumPy: pip install numpy);
+  build() i read_store() les retornen com a array.array i store.where() filtra sense NumPy
+
+Ús:
+    python season_store.py build          # crea/actualitza season_store.bin
+    python season_store.py info           # resum per tipus i equip
+
+    from season_store import load
+    store = load()
+    goals = (store['type'] == store.code('type', 'goal')) & (store['team'] == store.code('team', 'cnt'))
+
+    from season_store import build        # sense NumPy
+    store = build()[0]
+    goals = store.where(type='goal', team='cnt')   # índexs de les files
+"""
+
+import argparse
+import glob
+import json
+import os
+import struct
+import sys
+from array import array
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+STATS_FILES = 'cnt_stats_*.json'
+STORE_FILE = 'season_store.bin'
+MAGIC = b'CNTSTORE'
+VERSION = 1
+
+# Columna -> (typecode de array, camp de l'acció o funció acció -> valor)
+NUMERIC_COLUMNS = {
+    'timestamp': ('q', 'timestamp'),
+    'player_num': ('h', 'playerNum'),
+    'goalkeeper_num': ('h', 'goalkeeperNum'),
+    'foul_on': ('h', 'faltaSobreJugador'),   # dorsal que ha rebut la falta (exclusions)
+}
+
+# Columnes de text codificades amb diccionari (int16)
+DICT_COLUMNS = {
+    'quarter': 'quarter',
+    'type': 'type',
+    'team': 'team',
+    'detail': None,            # goalType / exclusionType / actionType / saveType / action / result
+    'goal_zone': 'goalZone',
+    'field_zone': 'fieldZone',
+    'player_name': 'playerName',
+}
+
+# Subtipus de cada tipus d'acció, tots a la columna 'detail'
+DETAIL_FIELDS = ('goalType', 'exclusionType', 'actionType', 'saveType', 'action', 'result')
+
+MISSING = -1
+
+
+def as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return MISSING
+
+
+def empty_columns():
+    columns = {'match': array('h')}
+    for name, (typecode, _) in NUMERIC_COLUMNS.items():
+        columns[name] = array(typecode)
+    for name in DICT_COLUMNS:
+        columns[name] = array('h')
+    return columns
+
+
+class SeasonStore:
+    """Columnes de la temporada. store['type'] retorna la columna; code/decode tradueixen textos"""
+
+    def __init__(self, columns=None, dictionaries=None, matches=None):
+        self.columns = columns or empty_columns()
+        self.dictionaries = dictionaries or {name: [] for name in DICT_COLUMNS}
+        self.matches = matches or []  # [{'file', 'size', 'mtime', 'date', 'rival', 'start', 'count'}]
+        self.codes = {name: {value: i for i, value in enumerate(values)} for name, values in self.dictionaries.items()}
+
+    def __len__(self):
+        return len(self.columns['match'])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def code(self, column, value):
+        """Codi d'un text en una columna de diccionari (-1 si no hi surt mai)"""
+        return self.codes[column].get(value, MISSING)
+
+    def where(self, **conditions):
+        """Índexs de les files que compleixen totes les condicions columna=valor. Els textos de les
+        columnes de diccionari es tradueixen amb code(). Funciona amb array.array i amb NumPy"""
+        tests = []
+        for column, value in conditions.items():
+            if column in self.codes and isinstance(value, str):
+                value = self.code(column, value)
+            tests.append((self.columns[column], value))
+        if HAS_NUMPY and tests and all(isinstance(column, np.ndarray) for column, _ in tests):
+            mask = np.ones(len(self), dtype=bool)
+            for column, value in tests:
+                mask &= column == value
+            return np.flatnonzero(mask).tolist()
+        return [row for row in range(len(self)) if all(column[row] == value for column, value in tests)]
+
+    def decode(self, column, code):
+        return self.dictionaries[column][code] if code != MISSING else None
+
+    def encode(self, column, value):
+        if value is None or value == '':
+            return MISSING
+        codes = self.codes[column]
+        if value not in codes:
+            codes[value] = len(self.dictionaries[column])
+            self.dictionaries[column].append(value)
+        return codes[value]
+
+    def append_match(self, path, data):
+        """Afegeix les accions d'un partit al final de les columnes"""
+        match_index = len(self.matches)
+        start = len(self)
+        columns = self.columns
+        for action in data.get('chronologicalActions', []):
+            columns['match'].append(match_index)
+            for name, (_, field) in NUMERIC_COLUMNS.items():
+                columns[name].append(as_int(action.get(field)))
+            for name, field in DICT_COLUMNS.items():
+                if field is None:
+                    value = next((action[f] for f in DETAIL_FIELDS if action.get(f)), None)
+                else:
+                    value = action.get(field)
+                columns[name].append(self.encode(name, value))
+
+        st = os.stat(path)
+        self.matches.append({
+            'file': os.path.basename(path),
+            'size': st.st_size,
+            'mtime': st.st_mtime,
+            'date': (data.get('data') or '')[:10],
+            'rival': data.get('rivalTeam', ''),
+            'location': data.get('matchLocation', ''),
+            'score': [data.get('scoreCNT'), data.get('scoreRival')],
+            'start': start,
+            'count': len(self) - start
+        })
+
+    def copy_match(self, source, match):
+        """Copia les files d'un partit d'un altre magatzem (sense tornar a parsejar el JSON)"""
+        match_index = len(self.matches)
+        start, end = match['start'], match['start'] + match['count']
+        self.columns['match'].extend(array('h', [match_index]) * match['count'])
+        for name in NUMERIC_COLUMNS:
+            self.columns[name].extend(source.columns[name][start:end])
+        for name in DICT_COLUMNS:
+            values = source.dictionaries[name]
+            self.columns[name].extend(
+                array('h', (self.encode(name, values[c]) if c != MISSING else MISSING for c in source.columns[name][start:end]))
+            )
+        self.matches.append(dict(match, start=len(self) - match['count']))
+
+    def save(self, path=STORE_FILE):
+        """Capçalera JSON + columnes en binari. Escriptura atòmica"""
+        header = {
+            'version': VERSION,
+            'byteorder': sys.byteorder,
+            'rows': len(self),
+            'columns': [(name, column.typecode) for name, column in self.columns.items()],
+            'dictionaries': self.dictionaries,
+            'matches': self.matches
+        }
+        header_bytes = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<I', len(header_bytes)))
+            f.write(header_bytes)
+            for column in self.columns.values():
+                column.tofile(f)
+        os.replace(tmp_path, path)
+
+
+def read_store(path=STORE_FILE):
+    """Llegeix el fitxer binari. Retorna SeasonStore amb columnes array.array, o None si no existeix"""
+    try:
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} no és un magatzem de temporada")
+            (header_size,) = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(header_size).decode('utf-8'))
+            if header.get('version') != VERSION:
+                return None
+            columns = {}
+            for name, typecode in header['columns']:
+                column = array(typecode)
+                column.fromfile(f, header['rows'])
+                if header['byteorder'] != sys.byteorder:
+                    column.byteswap()
+                columns[name] = column
+    except FileNotFoundError:
+        return None
+    return SeasonStore(columns, header['dictionaries'], header['matches'])
+
+
+def build(paths=None, path=STORE_FILE, force=False):
+    """Crea o actualitza el magatzem. Els partits sense canvis (mida i data del fitxer) es copien
+    de l'anterior i només es parsegen els nous. Retorna (store, parsejats, reutilitzats)"""
+    paths = sorted(paths if paths is not None else glob.glob(STATS_FILES))
+    previous = None if force else read_store(path)
+    known = {m['file']: m for m in previous.matches} if previous else {}
+
+    store = SeasonStore()
+    parsed = reused = 0
+    for file_path in paths:
+        st = os.stat(file_path)
+        match = known.get(os.path.basename(file_path))
+        if match and match['size'] == st.st_size and match['mtime'] == st.st_mtime:
+            store.copy_match(previous, match)
+            reused += 1
+            continue
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ {file_path}: {e}")
+            continue
+        store.append_match(file_path, data)
+        parsed += 1
+
+    unchanged = previous is not None and parsed == 0 and reused == len(previous.matches)
+    if not unchanged:
+        store.save(path)
+    return store, parsed, reused
+
+
+def load(path=STORE_FILE, rebuild=True):
+    """Magatzem llest per a consultes vectoritzades. Amb rebuild, primer incorpora els partits nous.
+    Les columnes són np.ndarray (sense còpia). Llança ImportError si NumPy no està instal·lat:
+    amb array.array les comparacions de columna no són element a element (usa build() i where())"""
+    if not HAS_NUMPY:
+        raise ImportError("season_store.load() necessita NumPy (pip install numpy); "
+                          "sense NumPy usa build() o read_store() i store.where(type='goal', team='cnt')")
+    store = build(path=path)[0] if rebuild else read_store(path)
+    if store is not None:
+        store.columns = {name: np.frombuffer(column, dtype=column.typecode) if len(column) else
+                         np.array([], dtype=column.typecode) for name, column in store.columns.items()}
+    return store
+
+
+def print_info(store):
+    print(f"📦 {len(store)} accions de {len(store.matches)} partits")
+    for column in ('type', 'team', 'quarter'):
+        counts = [0] * len(store.dictionaries[column])
+        for code in store[column]:
+            if code != MISSING:
+                counts[code] += 1
+        ranked = sorted(zip(store.dictionaries[column], counts), key=lambda item: -item[1])
+        print(f"  {column:<8} " + ', '.join(f"{value}: {count}" for value, count in ranked))
+    size = os.path.getsize(STORE_FILE) if os.path.exists(STORE_FILE) else 0
+    print(f"  💾 {STORE_FILE}: {size / 1024:.1f} KB")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Magatzem columnar de les accions de la temporada")
+    ap.add_argument('command', choices=['build', 'info'])
+    ap.add_argument('--force', action='store_true', help="Torna a parsejar tots els partits")
+    args = ap.parse_args()
+
+    if args.command == 'build':
+        store, parsed, reused = build(force=args.force)
+        print(f"✅ {parsed} partits parsejats, {reused} reutilitzats")
+    else:
+        store = read_store() or build()[0]
+    print_info(store)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
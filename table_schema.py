@@ -0,0 +1,170 @@
+"""
+Motor declaratiu d'extracció de files de taules ACTAWP
+- Cada taula es descriu un sol cop: camps (cel·la + extractor + postprocessadors),
+  passos derivats, camps obligatoris, comptador de jornada i ordre de sortida
+- L'esquema es compila a una llista de passos i totes les taules comparteixen el mateix bucle
+- Expressions regulars i extractors comuns precompilats (noms d'equip, logos, URLs, marcadors, dates)
+- Cerques dins la fila amb un recorregut directe dels descendents (find/find_all de bs4
+  construeixen un filtre nou a cada crida i són la major part del cost per fila)
+
+Ús:
+    from table_schema import Field, TableSchema, logo, team_name
+
+    SCHEMA = TableSchema(
+        fields=[Field('team1', 0, team_name), Field('team1_logo', 0, logo)],
+        require=('team1',),
+        counter='jornada'
+    )
+    files = SCHEMA.extract(soup.find_all('tr'))
+"""
+
+import re
+
+BASE_URL = 'https://actawp.natacio.cat'
+
+VER_PREFIX = re.compile(r'^(?:Veure)?(?:Ver)?', re.IGNORECASE)
+DATE = re.compile(r'(\d{2}/\d{2}/\d{4})')
+DATE_TIME = re.compile(r'(\d{2}/\d{2}/\d{4})\s+(\d{2}:\d{2})')
+DATE_WEEKDAY_TIME = re.compile(r'([A-Za-z]{3},?\s+\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{2})')
+SCORE = re.compile(r'(\d+)\s*[-–]\s*(\d+)')
+TEAM_ID = re.compile(r'/team/(\d+)')
+MATCH_ID = re.compile(r'/match/(\d+)')
+
+
+def clean_team_name(name):
+    """Treu "Ver"/"Veure" del principi del nom de l'equip"""
+    if not name:
+        return name
+    return VER_PREFIX.sub('', name, count=1).strip()
+
+
+def find_first(element, names, attr=None):
+    """Equivalent ràpid de element.find(names) / element.find(names, attr=True)"""
+    if isinstance(names, str):
+        names = (names,)
+    for el in element.descendants:
+        if el.name in names and (attr is None or el.get(attr) is not None):
+            return el
+    return None
+
+
+def find_cells(row):
+    """Equivalent ràpid de row.find_all('td')"""
+    return [el for el in row.descendants if el.name == 'td']
+
+
+def absolute_url(href):
+    return href if href.startswith('http') else BASE_URL + href
+
+
+# Extractors comuns (cel·la -> valor)
+
+def text(cell):
+    return cell.get_text(strip=True)
+
+
+def team_name(cell):
+    return clean_team_name(cell.get_text(strip=True))
+
+
+def logo(cell):
+    img = find_first(cell, 'img')
+    if img and img.get('src'):
+        return img['src']
+    return ''
+
+
+def match_url(cell):
+    link = find_first(cell, 'a', 'href')
+    return absolute_url(link['href']) if link else ''
+
+
+def spaced_text(cells):
+    """Text de diverses cel·les separat per espais (p.ex. data, hora i piscina)"""
+    return ' '.join(cell.get_text(separator=' ', strip=True) for cell in cells).strip()
+
+
+class Field:
+    """Camp d'una fila: cel·la d'origen (índex o slice), extractor i postprocessadors.
+    Amb name=None l'extractor retorna un dict que s'afegeix a la fila. Els valors None no es desen"""
+
+    def __init__(self, name, cell, extract, *post):
+        self.name = name
+        self.cell = cell
+        self.extract = extract
+        self.post = post
+
+    def compile(self):
+        """Retorna una funció cel·les -> valor amb l'extractor i els postprocessadors encadenats"""
+        cell, extract, post = self.cell, self.extract, self.post
+        if not post:
+            return lambda cells: extract(cells[cell])
+
+        def get(cells):
+            value = extract(cells[cell])
+            for step in post:
+                value = step(value)
+            return value
+        return get
+
+
+class TableSchema:
+    """Esquema d'una taula. extract(rows) aplica el mateix bucle a qualsevol taula:
+    - fields: camps extrets de les cel·les <td> de cada fila
+    - derive: funcions (fila, cel·les, número de fila) que completen la fila; si retornen False es descarta
+    - require: camps que han de tenir valor
+    - counter: camp amb el número d'ordre de les files acceptades (jornada)
+    - order: claus de sortida en ordre (la resta són camps intermedis i es descarten)
+    - on_accept / on_error: callbacks (número de fila, fila / excepció) per als missatges"""
+
+    def __init__(self, fields, derive=(), require=(), counter=None, order=None, min_cells=3,
+                 on_accept=None, on_error=None):
+        self.fields = list(fields)
+        self.derive = tuple(derive)
+        self.require = tuple(require)
+        self.counter = counter
+        self.order = tuple(order) if order else None
+        self.min_cells = min_cells
+        self.on_accept = on_accept
+        self.on_error = on_error
+        self.steps = [(field.name, field.compile()) for field in self.fields]
+
+    def extract(self, rows):
+        records = []
+        counter = 1
+        steps, derive, require, order = self.steps, self.derive, self.require, self.order
+
+        for number, row in enumerate(rows, 1):
+            try:
+                cells = find_cells(row)
+                if len(cells) < self.min_cells:
+                    continue
+
+                record = {}
+                for name, get in steps:
+                    value = get(cells)
+                    if name is None:
+                        record.update(value)
+                    elif value is not None:
+                        record[name] = value
+
+                if any(step(record, cells, number) is False for step in derive):
+                    continue
+                if not all(record.get(name) for name in require):
+                    continue
+
+                if self.counter:
+                    record[self.counter] = counter
+                if order:
+                    record = {key: record[key] for key in order if key in record}
+                records.append(record)
+                counter += 1
+
+                if self.on_accept:
+                    self.on_accept(number, record)
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(number, e)
+                continue
+
+        return records
@@ -0,0 +1,77 @@
+"""
+Registre d'equips ACTAWP (teams.json)
+- Un sol fitxer amb tots els equips: afegir una categoria (infantil, absolut, femení...)
+  és afegir-hi una entrada, sense tocar el codi
+- El fan servir ultra_robust_parser.py, actawp_watch.py, live_match.py, generate_actawp_json.py,
+  update_rivals_database.py i notify_changes.py
+- ACTAWP_TEAMS_FILE=altres_equips.json per fer servir un altre registre
+
+Format de cada equip (clau = categoria, p.ex. "infantil"):
+    "id"             ID de l'equip a ACTAWP (obligatori)
+    "name"           nom (obligatori)
+    "coach", "language" ('ca' / 'es'), "ranking_url", "calendar_url"
+    "repo", "site_url"   repositori i web de GitHub Pages de l'equip
+    "enabled"        false per deixar-lo temporalment fora (per defecte true)
+
+Ús:
+    from team_registry import load_teams
+
+    for team_key, team_info in load_teams().items():
+        print(team_key, team_info['id'], team_info['data_file'])
+"""
+
+import json
+import os
+
+from actawp_client import BASE_URL
+
+TEAMS_FILE = os.environ.get('ACTAWP_TEAMS_FILE') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'teams.json')
+
+REQUIRED_FIELDS = ('id', 'name')
+
+
+def team_defaults(team_key, team_info):
+    """Completa una entrada del registre amb els valors derivats"""
+    team = {
+        'coach': '',
+        'language': 'ca',
+        'ranking_url': None,
+        'calendar_url': None,
+        'repo': None,
+        'site_url': None,
+        'enabled': True,
+    }
+    team.update(team_info)
+    team['id'] = str(team['id'])
+    team.setdefault('url', f"{BASE_URL}/{team['language']}/team/{team['id']}")
+    team.setdefault('data_file', f"actawp_{team_key}_data.json")
+    team.setdefault('rivals_database', f"rivals_database_{team_key}.json")
+    return team
+
+
+def load_teams(path=None, only=None, include_disabled=False):
+    """Equips del registre en l'ordre del fitxer: {clau: info}. only limita a unes claus.
+    Llança ValueError si el fitxer o alguna entrada no són vàlids"""
+    path = path or TEAMS_FILE
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            registry = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"No s'ha pogut llegir el registre d'equips {path}: {e}")
+
+    teams = {}
+    for team_key, team_info in registry.get('teams', {}).items():
+        missing = [field for field in REQUIRED_FIELDS if not team_info.get(field)]
+        if missing:
+            raise ValueError(f"Equip {team_key} sense {', '.join(missing)} a {path}")
+        team = team_defaults(team_key, team_info)
+        if team['enabled'] or include_disabled:
+            teams[team_key] = team
+
+    if only:
+        unknown = [key for key in only if key not in teams]
+        if unknown:
+            raise ValueError(f"Equip desconegut: {', '.join(unknown)} (disponibles: {', '.join(teams)})")
+        teams = {key: teams[key] for key in only}
+
+    return teams
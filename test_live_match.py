@@ -0,0 +1,74 @@
+"""
+Proves del marcador de live_match.py
+- test_pages/ són fixtures sintètiques escrites a mà amb l'estructura esperada de l'acta ACTAWP,
+  no pàgines capturades: no garanteixen que el parser funcioni amb el marcatge real
+  (per a pàgines reals, bench_parsers.py --capture <equip>)
+- live_prematch.html: acta abans de començar (temporada "2025-26" al títol, resultats d'altres partits)
+- live_inplay.html: partit en joc al 3r quart
+- campionat-catalunya-cadet.html: pàgina del repositori sense marcador
+
+Ús:
+    python -m pytest -q test_live_match.py
+"""
+
+import os
+
+from live_match import parse_scoreboard, read_fragment
+
+PAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_pages')
+
+
+def load(name, directory=PAGES):
+    with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class StreamedResponse:
+    """Resposta mínima per a read_fragment: el cos en blocs de bytes"""
+
+    encoding = 'utf-8'
+
+    def __init__(self, html):
+        self.body = html.encode('utf-8')
+        self.closed = False
+
+    def iter_content(self, size):
+        for start in range(0, len(self.body), size):
+            yield self.body[start:start + size]
+
+    def close(self):
+        self.closed = True
+
+
+def test_prematch_page_is_pending_without_score():
+    scoreboard = parse_scoreboard(load('live_prematch.html'))
+    assert scoreboard == {'score': '', 'periods': [], 'status': 'pending'}
+
+
+def test_season_in_page_text_is_not_a_score():
+    page = load('campionat-catalunya-cadet.html', os.path.dirname(PAGES))
+    assert parse_scoreboard(page) == {'score': '', 'periods': [], 'status': 'pending'}
+
+
+def test_inplay_page_reads_scoreboard_and_periods():
+    scoreboard = parse_scoreboard(load('live_inplay.html'))
+    assert scoreboard == {'score': '11-7', 'periods': ['5-2', '4-3', '2-2'], 'status': 'live'}
+
+
+def test_score_without_inplay_marker_is_pending():
+    page = load('live_inplay.html').replace('En joc · 3r quart', '').replace('period', 'x')
+    assert parse_scoreboard(page)['status'] == 'pending'
+
+
+def test_closed_acta():
+    page = load('live_inplay.html').replace('En joc · 3r quart', 'Acta tancada')
+    assert parse_scoreboard(page)['status'] == 'closed'
+
+
+def test_fragment_keeps_the_scoreboard():
+    html = load('live_inplay.html')
+    response = StreamedResponse(html)
+    fragment, read = read_fragment(response)
+    assert response.closed
+    assert read <= len(response.body)
+    assert parse_scoreboard(fragment) == parse_scoreboard(html)
@@ -1,5 +1,17 @@
 """
 Parser ACTAWP v6.3 - DATES DEL CALENDARI
+- 🆕 v6.4: Client HTTP compartit (actawp_client): timeouts, reintents, límit de ritme i cache de tokens CSRF
+- 🆕 v6.4: Forma dels rivals en paral·lel (workers configurables)
+- 🆕 v6.4: Cache persistent de respostes amb TTL per pestanya (--no-cache per desactivar-la)
+- 🆕 v6.4: Gravació/reproducció sense xarxa: ACTAWP_RECORD=arxiu.json.gz / ACTAWP_REPLAY=arxiu.json.gz
+- 🆕 v6.4: Motor HTML lxml si està instal·lat (html_engine), html.parser com a alternativa
+- 🆕 v6.4: Parseig parcial: cada pestanya només construeix les taules/files que necessita
+- 🆕 v6.4: Pròxims partits, resultats i classificació com a esquemes declaratius (table_schema)
+- 🆕 v6.4: calendar_dates al JSON (dies de partit) per al planificador del workflow (poll_scheduler)
+- 🆕 v6.4: generate_json dividit en seccions fetch_* (reutilitzades pel dimoni actawp_watch.py)
+- 🆕 v6.4: Equips en paral·lel amb sessions aïllades, escriptura atòmica i resum; exit 1 només si fallen tots
+- 🆕 v6.4: Equips definits a teams.json (team_registry): cache compartida i concurrència global limitada
+- 🆕 v6.4: Rivals incrementals: empremta de la classificació; els que no han jugat reutilitzen l'entrada anterior (--full per desactivar-ho)
 - 🆕 v6.3: Obté dates dels partits del calendari de la 3a fase
 - FIX v6.2: Afegeix URL dels partits per al botó "Detalls"
 - FIX: Neteja "Ver"/"Veure" dels noms d'equips
@@ -10,19 +22,165 @@ Parser ACTAWP v6.3 - DATES DEL CALENDARI
 - NOVITAT v6.1: 5 jugadors amb exclusions, penals i mitjana gols/partit
 """
 
-import requests
+import io
 import json
 import os
-from bs4 import BeautifulSoup
+import sys
 import re
-from datetime import datetime
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from actawp_cache import ResponseCache
+from actawp_client import ActawpClient
+from html_engine import ROWS, TABLES, make_soup
+from team_registry import load_teams
+from table_schema import (DATE, DATE_TIME, SCORE, TEAM_ID, Field, TableSchema, clean_team_name, find_first,
+                          logo, match_url, spaced_text, team_name)
+
+IGNORED_NAMES = ('ver', 'veure', 'see', 'view')
+STAT_FIELDS = ('punts', 'partits', 'guanyats', 'empatats', 'perduts', 'gols_favor', 'gols_contra', 'diferencia')
+
+
+def match_date_time(record, cells, number):
+    """Data i hora del text central (Dis, 10/01/2026 12:50)"""
+    date_match = DATE_TIME.search(record['date_time'])
+    if date_match:
+        record['date'] = date_match.group(1)
+        record['time'] = date_match.group(2)
+
+
+def result_score_and_date(cells):
+    """Marcador i data de les columnes centrals (l'última coincidència guanya)"""
+    score = ''
+    date = ''
+    for cell in cells:
+        cell_text = cell.get_text(strip=True)
+        score_match = SCORE.search(cell_text)
+        if score_match:
+            score = f"{score_match.group(1)}-{score_match.group(2)}"
+        date_match = DATE.search(cell_text)
+        if date_match:
+            date = date_match.group(1)
+    return {'score': score, 'date': date}
+
+
+def ranking_team(cells):
+    """Nom, ID i logo de l'equip d'una fila de classificació, i la columna on és el nom"""
+    equip_text = ''
+    logo_url = ''
+    team_id = ''
+    equip_idx = -1
+
+    for i, col in enumerate(cells):
+        # Link amb l'ID de l'equip. El nom pot ser en un span, strong o directament al link
+        link = find_first(col, 'a', 'href')
+        if link and '/team/' in link.get('href', ''):
+            id_match = TEAM_ID.search(link['href'])
+            if id_match:
+                team_id = id_match.group(1)
+
+            link_text = ''
+            name_elem = find_first(link, ('span', 'strong', 'b'))
+            if name_elem:
+                link_text = name_elem.get_text(strip=True)
+
+            # Si no, el primer text llarg que no sigui "Ver/Veure", i si no el title
+            if not link_text or link_text.lower() in IGNORED_NAMES[:3]:
+                for t in link.find_all(string=True, recursive=True):
+                    t = t.strip()
+                    if len(t) > 4 and t.lower() not in IGNORED_NAMES:
+                        link_text = t
+                        break
+            if not link_text or link_text.lower() in IGNORED_NAMES[:2]:
+                link_text = link.get('title', '')
+
+            if link_text and link_text.lower() not in IGNORED_NAMES:
+                equip_text = clean_team_name(link_text)
+                equip_idx = i
+
+        img = find_first(col, 'img')
+        if img and img.get('src'):
+            logo_url = img.get('src', '')
+
+        # Si no hem trobat nom al link, provar amb el text de la cel·la (no números ni textos curts)
+        if not equip_text:
+            cell_text = clean_team_name(col.get_text(strip=True))
+            if len(cell_text) > 5 and not cell_text.isdigit() and cell_text.lower() not in IGNORED_NAMES[:2]:
+                equip_text = cell_text
+                equip_idx = i
+
+    return {'equip': equip_text, 'team_id': team_id, 'logo': logo_url, 'equip_idx': equip_idx}
+
+
+def ranking_check_name(record, cells, number):
+    if not record['equip'] or record['equip'].lower() in IGNORED_NAMES:
+        print(f"    ⚠️ Fila {number}: No s'ha trobat nom d'equip")
+        return False
+    record['posicio'] = str(number)
+
+
+def ranking_stats(record, cells, number):
+    """Números de les columnes DESPRÉS del nom. Ordre típic: PTS | PJ | V | E | D | GF | GC | DIF"""
+    stat_values = []
+    for col in cells[record['equip_idx'] + 1:]:
+        value_text = col.get_text(strip=True)
+        if value_text.lstrip('-').isdigit():
+            try:
+                stat_values.append(int(value_text))
+            except ValueError:
+                pass
+
+    for field, value in zip(STAT_FIELDS, stat_values + [0] * len(STAT_FIELDS)):
+        record[field] = value
+
+    print(f"    📊 Stats: {stat_values[:3]}..." if stat_values else "    ⚠️ No stats")
+    return len(record['equip']) > 1
+
+
+MATCH_FIELDS = [
+    Field('team1', 0, team_name),
+    Field('team2', -1, team_name),
+    Field('team1_logo', 0, logo),
+    Field('team2_logo', -1, logo),
+    Field('url', 0, match_url),  # 🆕 v6.2
+]
+
+UPCOMING_SCHEMA = TableSchema(
+    fields=MATCH_FIELDS + [Field('date_time', slice(1, -1), spaced_text)],
+    derive=[match_date_time],
+    require=('team1', 'team2'),
+    counter='jornada',
+    order=('team1', 'team2', 'team1_logo', 'team2_logo', 'date_time', 'jornada', 'url', 'date', 'time')
+)
+
+RESULTS_SCHEMA = TableSchema(
+    fields=MATCH_FIELDS + [Field(None, slice(1, -1), result_score_and_date)],
+    require=('team1', 'team2', 'score'),
+    counter='jornada',
+    order=('team1', 'team2', 'team1_logo', 'team2_logo', 'score', 'date', 'jornada', 'url')
+)
+
+RANKING_SCHEMA = TableSchema(
+    fields=[Field(None, slice(None), ranking_team)],
+    derive=[ranking_check_name, ranking_stats],
+    order=('posicio', 'equip', 'team_id', 'logo') + STAT_FIELDS,
+    on_accept=lambda number, team: print(f"    ✅ {number}. {team['equip']} (ID: {team['team_id']})"),
+    on_error=lambda number, e: print(f"    ⚠️ Error fila {number}: {e}")
+)
 
 class ActawpParserV58:
     
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, rivals_workers=4, client=None):
+        self.client = client or ActawpClient()  # 🆕 v6.4 - Client HTTP compartit
+        self.session = self.client.session
         self.jornada_corrections = self.load_jornada_corrections()
         self.calendar_dates = {}  # 🆕 v6.3 - Dates del calendari
+        
+        # 🆕 v6.4 - Concurrència dels rivals: 1 worker = mode seqüencial
+        self.rivals_workers = max(1, int(rivals_workers))
     
     def load_jornada_corrections(self):
         """Carrega correccions manuals de jornades"""
@@ -39,14 +197,8 @@ class ActawpParserV58:
     
     def clean_team_name(self, name):
         """🆕 Neteja el nom de l'equip eliminant Ver/Veure del principi"""
-        if not name:
-            return name
-        
-        # Treure "Ver" o "Veure" del principi
-        name = re.sub(r'^Veure', '', name, flags=re.IGNORECASE)
-        name = re.sub(r'^Ver', '', name, flags=re.IGNORECASE)
-        
-        return name.strip()
+        # Treure "Ver" o "Veure" del principi (una sola regex precompilada)
+        return clean_team_name(name)
     
     def normalize_team_for_calendar(self, name):
         """🆕 v6.3 - Normalitza nom d'equip per comparar amb calendari"""
@@ -58,13 +210,13 @@ class ActawpParserV58:
         """🆕 v6.3 - Parseja el calendari per obtenir dates de tots els partits de la 3a fase"""
         try:
             print(f"  📅 Obtenint calendari de: {calendar_url}")
-            response = self.session.get(calendar_url)
+            response = self.client.get(calendar_url, cache_tab='calendar')
             
             if response.status_code != 200:
                 print(f"  ❌ Error HTTP: {response.status_code}")
                 return {}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text, TABLES)
             matches_dates = {}
             
             # Buscar totes les taules de partits
@@ -93,7 +245,7 @@ class ActawpParserV58:
                             
                             # Buscar data (format: Dis, 10/01/2026 12:50)
                             row_text = row.get_text()
-                            date_match = re.search(r'(\d{2}/\d{2}/\d{4})', row_text)
+                            date_match = DATE.search(row_text)
                             
                             if date_match:
                                 date = date_match.group(1)
@@ -134,48 +286,12 @@ class ActawpParserV58:
         return results
     
     def get_csrf_token(self, team_id, language='es'):
-        """Obté el token CSRF"""
-        url = f"https://actawp.natacio.cat/{language}/team/{team_id}"
-        response = self.session.get(url)
-        
-        match = re.search(r'csrf_token["\']?\s*[:=]\s*["\']([^"\']+)["\']', response.text)
-        if match:
-            return match.group(1)
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        csrf_input = soup.find('input', {'name': 'csrf_token'})
-        if csrf_input:
-            return csrf_input.get('value')
-        
-        return None
+        """Obté el token CSRF (🆕 v6.4 - cache del client compartit)"""
+        return self.client.get_csrf_token(team_id, language)
     
     def get_tab_content(self, team_id, tab_name, language='es'):
         """Obté el contingut d'una pestanya"""
-        csrf_token = self.get_csrf_token(team_id, language)
-        
-        if not csrf_token:
-            return None
-        
-        url = f"https://actawp.natacio.cat/{language}/ajax/team/{team_id}/change-tab"
-        
-        data = {
-            'csrf_token': csrf_token,
-            'tab': tab_name
-        }
-        
-        headers = {
-            'accept': '*/*',
-            'content-type': 'application/x-www-form-urlencoded; charset=UTF-8',
-            'x-requested-with': 'XMLHttpRequest',
-            'referer': f'https://actawp.natacio.cat/{language}/team/{team_id}'
-        }
-        
-        response = self.session.post(url, data=data, headers=headers)
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return None
+        return self.client.get_tab_content(team_id, tab_name, language)
     
     def extract_header_text(self, th):
         """Extreu el text del header"""
@@ -273,7 +389,7 @@ class ActawpParserV58:
     
     def parse_players(self, html_content):
         """Parser de jugadors amb normalització automàtica"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = make_soup(html_content, TABLES)
         players = []
         
         table = soup.find('table')
@@ -334,153 +450,25 @@ class ActawpParserV58:
     
     def parse_upcoming_matches(self, html_content):
         """Parser de pròxims partits amb jornada - AMB NETEJA DE NOMS I URLs"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        matches = []
-        
-        rows = soup.find_all('tr')
-        jornada_counter = 1
-        
-        for row in rows:
-            try:
-                cols = row.find_all('td')
-                if len(cols) < 3:
-                    continue
-                
-                # Buscar logos
-                team1_logo = ''
-                team2_logo = ''
-                
-                img1 = cols[0].find('img')
-                if img1 and img1.get('src'):
-                    team1_logo = img1['src']
-                
-                img2 = cols[-1].find('img')
-                if img2 and img2.get('src'):
-                    team2_logo = img2['src']
-                
-                # 🆕 v6.2 - Extreure URL del partit
-                match_url = ''
-                link = cols[0].find('a', href=True)
-                if link:
-                    href = link['href']
-                    match_url = href if href.startswith('http') else 'https://actawp.natacio.cat' + href
-                
-                # 🔧 Netejar noms d'equips
-                team1 = self.clean_team_name(cols[0].get_text(strip=True))
-                team2 = self.clean_team_name(cols[-1].get_text(strip=True))
-                
-                # Info central
-                middle_text = ''
-                for col in cols[1:-1]:
-                    middle_text += col.get_text(separator=' ', strip=True) + ' '
-                middle_text = middle_text.strip()
-                
-                # Extreure data/hora
-                date_match = re.search(r'(\d{2}/\d{2}/\d{4})\s+(\d{2}:\d{2})', middle_text)
-                
-                if team1 and team2:
-                    match_data = {
-                        'team1': team1,
-                        'team2': team2,
-                        'team1_logo': team1_logo,
-                        'team2_logo': team2_logo,
-                        'date_time': middle_text,
-                        'jornada': jornada_counter,
-                        'url': match_url  # 🆕 v6.2
-                    }
-                    
-                    if date_match:
-                        match_data['date'] = date_match.group(1)
-                        match_data['time'] = date_match.group(2)
-                    
-                    matches.append(match_data)
-                    jornada_counter += 1
-                    
-            except Exception as e:
-                continue
-        
-        return matches
+        soup = make_soup(html_content, ROWS)
+        return UPCOMING_SCHEMA.extract(soup.find_all('tr'))
     
     def parse_last_results(self, html_content):
         """Parser d'últims resultats amb jornada - AMB NETEJA DE NOMS I URLs"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        results = []
-        
-        rows = soup.find_all('tr')
-        jornada_counter = 1
-        
-        for row in rows:
-            try:
-                cols = row.find_all('td')
-                if len(cols) < 3:
-                    continue
-                
-                # Buscar logos
-                team1_logo = ''
-                team2_logo = ''
-                
-                img1 = cols[0].find('img')
-                if img1 and img1.get('src'):
-                    team1_logo = img1['src']
-                
-                img2 = cols[-1].find('img')
-                if img2 and img2.get('src'):
-                    team2_logo = img2['src']
-                
-                # 🆕 v6.2 - Extreure URL del partit
-                match_url = ''
-                link = cols[0].find('a', href=True)
-                if link:
-                    href = link['href']
-                    match_url = href if href.startswith('http') else 'https://actawp.natacio.cat' + href
-                
-                # 🔧 Netejar noms d'equips
-                team1 = self.clean_team_name(cols[0].get_text(strip=True))
-                team2 = self.clean_team_name(cols[-1].get_text(strip=True))
-                
-                # Buscar marcador
-                score = ''
-                date = ''
-                for col in cols[1:-1]:
-                    col_text = col.get_text(strip=True)
-                    
-                    score_match = re.search(r'(\d+)\s*[-–]\s*(\d+)', col_text)
-                    if score_match:
-                        score = f"{score_match.group(1)}-{score_match.group(2)}"
-                    
-                    date_match = re.search(r'(\d{2}/\d{2}/\d{4})', col_text)
-                    if date_match:
-                        date = date_match.group(1)
-                
-                if team1 and team2 and score:
-                    results.append({
-                        'team1': team1,
-                        'team2': team2,
-                        'team1_logo': team1_logo,
-                        'team2_logo': team2_logo,
-                        'score': score,
-                        'date': date,
-                        'jornada': jornada_counter,
-                        'url': match_url  # 🆕 v6.2
-                    })
-                    jornada_counter += 1
-                    
-            except Exception as e:
-                continue
-        
-        return results
+        soup = make_soup(html_content, ROWS)
+        return RESULTS_SCHEMA.extract(soup.find_all('tr'))
     
     def parse_ranking(self, ranking_url):
         """Parser de classificació - CORREGIT per extreure noms correctament"""
         try:
             print(f"  📊 Obtenint classificació de: {ranking_url}")
-            response = self.session.get(ranking_url)
+            response = self.client.get(ranking_url, cache_tab='ranking')
             
             if response.status_code != 200:
                 print(f"  ❌ Error HTTP: {response.status_code}")
                 return []
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text, TABLES)
             table = soup.find('table')
             
             if not table:
@@ -492,129 +480,7 @@ class ActawpParserV58:
                 print("  ❌ No s'ha trobat tbody")
                 return []
             
-            rows = tbody.find_all('tr')
-            ranking = []
-            
-            for idx, row in enumerate(rows, 1):
-                try:
-                    cols = row.find_all('td')
-                    if len(cols) < 3:
-                        continue
-                    
-                    equip_text = ''
-                    logo_url = ''
-                    team_id = ''
-                    equip_idx = -1
-                    
-                    # Buscar en totes les columnes
-                    for i, col in enumerate(cols):
-                        # Buscar link amb ID de l'equip
-                        link = col.find('a', href=True)
-                        if link and '/team/' in link.get('href', ''):
-                            href = link['href']
-                            # Extreure ID
-                            id_match = re.search(r'/team/(\d+)', href)
-                            if id_match:
-                                team_id = id_match.group(1)
-                            
-                            # 🔧 CORRECCIÓ: Buscar el nom dins del link
-                            # Pot ser en un span, strong, o directament
-                            link_text = ''
-                            
-                            # Intentar trobar el nom en elements específics
-                            name_elem = link.find(['span', 'strong', 'b'])
-                            if name_elem:
-                                link_text = name_elem.get_text(strip=True)
-                            
-                            # Si no, agafar tot el text del link
-                            if not link_text or link_text.lower() in ['ver', 'veure', 'see']:
-                                # Buscar tots els textos dins del link
-                                all_texts = link.find_all(string=True, recursive=True)
-                                for t in all_texts:
-                                    t = t.strip()
-                                    # Ignorar textos curts o que siguin "Ver/Veure"
-                                    if len(t) > 4 and t.lower() not in ['ver', 'veure', 'see', 'view']:
-                                        link_text = t
-                                        break
-                            
-                            # Si encara no tenim text, mirar el title del link
-                            if not link_text or link_text.lower() in ['ver', 'veure']:
-                                link_text = link.get('title', '')
-                            
-                            if link_text and link_text.lower() not in ['ver', 'veure', 'see', 'view']:
-                                equip_text = self.clean_team_name(link_text)
-                                equip_idx = i
-                        
-                        # Buscar logo
-                        img = col.find('img')
-                        if img and img.get('src'):
-                            logo_url = img.get('src', '')
-                        
-                        # Si no hem trobat nom al link, provar amb el text de la cel·la
-                        if not equip_text:
-                            cell_text = col.get_text(strip=True)
-                            cell_text = self.clean_team_name(cell_text)
-                            # Només si és un nom vàlid (no és número ni text curt)
-                            if len(cell_text) > 5 and not cell_text.isdigit() and cell_text.lower() not in ['ver', 'veure']:
-                                equip_text = cell_text
-                                equip_idx = i
-                    
-                    # Si no hem trobat nom, saltar aquesta fila
-                    if not equip_text or equip_text.lower() in ['ver', 'veure', 'see', 'view']:
-                        print(f"    ⚠️ Fila {idx}: No s'ha trobat nom d'equip")
-                        continue
-                    
-                    posicio_text = str(idx)
-                    stats_start = equip_idx + 1 if equip_idx >= 0 else 2
-                    
-                    team_data = {
-                        'posicio': posicio_text,
-                        'equip': equip_text,
-                        'team_id': team_id,
-                        'logo': logo_url,
-                        'punts': 0,
-                        'partits': 0,
-                        'guanyats': 0,
-                        'empatats': 0,
-                        'perduts': 0,
-                        'gols_favor': 0,
-                        'gols_contra': 0,
-                        'diferencia': 0
-                    }
-                    
-                    # Extreure estadístiques numèriques de les columnes DESPRÉS del nom
-                    # Ordre típic: PTS | PJ | V | E | D | GF | GC | DIF
-                    stat_fields = ['punts', 'partits', 'guanyats', 'empatats', 'perduts', 'gols_favor', 'gols_contra', 'diferencia']
-                    stat_values = []
-                    
-                    # Recollir TOTS els números de les columnes DESPRÉS de la columna de l'equip
-                    for i, col in enumerate(cols):
-                        # Només mirar columnes després de la de l'equip
-                        if i <= equip_idx:
-                            continue
-                        
-                        value_text = col.get_text(strip=True)
-                        # Acceptar números positius i negatius
-                        if value_text.lstrip('-').isdigit():
-                            try:
-                                stat_values.append(int(value_text))
-                            except:
-                                pass
-                    
-                    # Assignar els valors als camps
-                    for i, value in enumerate(stat_values):
-                        if i < len(stat_fields):
-                            team_data[stat_fields[i]] = value
-                    
-                    print(f"    📊 Stats: {stat_values[:3]}..." if stat_values else "    ⚠️ No stats")
-                    
-                    if team_data['equip'] and len(team_data['equip']) > 1:
-                        ranking.append(team_data)
-                        print(f"    ✅ {idx}. {team_data['equip']} (ID: {team_id})")
-                    
-                except Exception as e:
-                    print(f"    ⚠️ Error fila {idx}: {e}")
-                    continue
+            ranking = RANKING_SCHEMA.extract(tbody.find_all('tr'))
             
             return ranking
             
@@ -673,12 +539,104 @@ class ActawpParserV58:
             print(f"    ⚠️ Error obtenint jugadors de {team_name}: {e}")
             return []
     
-    def get_all_rivals_form(self, ranking, language='es'):
-        """Obté la forma de tots els rivals de la classificació"""
+    def build_rival_form(self, team_name, team_id, results, top_scorers):
+        """Calcula forma, mitjanes i tendència d'un rival a partir dels seus últims resultats"""
+        # Calcular forma (V/E/D)
+        form = []
+        total_gf = 0  # Gols a favor
+        total_gc = 0  # Gols en contra
+        
+        for r in results:
+            score = r.get('score', '0-0')
+            score_parts = score.split('-')
+            if len(score_parts) == 2:
+                try:
+                    g1, g2 = int(score_parts[0]), int(score_parts[1])
+                except:
+                    g1, g2 = 0, 0
+                # Determinar si l'equip és team1 o team2
+                is_team1 = team_name.upper() in r.get('team1', '').upper()
+                if is_team1:
+                    total_gf += g1
+                    total_gc += g2
+                    if g1 > g2: form.append('W')
+                    elif g1 < g2: form.append('L')
+                    else: form.append('D')
+                else:
+                    total_gf += g2
+                    total_gc += g1
+                    if g2 > g1: form.append('W')
+                    elif g2 < g1: form.append('L')
+                    else: form.append('D')
+        
+        # Calcular mitjanes
+        num_matches = len(results)
+        avg_gf = round(total_gf / num_matches, 1) if num_matches > 0 else 0
+        avg_gc = round(total_gc / num_matches, 1) if num_matches > 0 else 0
+        
+        # Determinar tendència
+        recent_form = form[:3]  # Últims 3 partits
+        wins_recent = recent_form.count('W')
+        losses_recent = recent_form.count('L')
+        
+        if wins_recent >= 2:
+            trend = 'hot'  # 🔥 En ratxa
+        elif losses_recent >= 2:
+            trend = 'cold'  # 📉 En baixa
+        elif wins_recent > losses_recent:
+            trend = 'up'  # 📈 Pujant
+        elif losses_recent > wins_recent:
+            trend = 'down'  # 📉 Baixant
+        else:
+            trend = 'stable'  # ➡️ Estable
+        
+        # Calcular total exclusions de l'equip
+        total_exclusions = sum(p.get('exclusions', 0) for p in top_scorers)
+        
+        return {
+            'team_id': team_id,
+            'last_results': results,
+            'form': form,
+            'form_string': ''.join(form),
+            'top_scorers': top_scorers,
+            # 🆕 v6.1 - Estadístiques ampliades
+            'stats': {
+                'total_gf': total_gf,
+                'total_gc': total_gc,
+                'avg_gf': avg_gf,
+                'avg_gc': avg_gc,
+                'matches_played': num_matches,
+                'wins': form.count('W'),
+                'draws': form.count('D'),
+                'losses': form.count('L'),
+                'trend': trend,
+                'total_exclusions': total_exclusions
+            }
+        }
+    
+    def fetch_rival_form(self, team_name, team_id, language='es', previous=None):
+        """🆕 v6.4 - Descarrega i calcula la forma d'un rival. Retorna (entry, segons).
+        Si els resultats coincideixen amb els de l'entrada anterior, no torna a descarregar els jugadors"""
+        started = time.perf_counter()
+        results = self.get_rival_last_results(team_id, team_name, language)
+        if previous and results and previous.get('last_results') == results:
+            top_scorers = previous.get('top_scorers', [])
+        else:
+            top_scorers = self.get_rival_top_scorers(team_id, team_name, language)
+        entry = self.build_rival_form(team_name, team_id, results, top_scorers) if results else None
+        return entry, time.perf_counter() - started
+    
+    def get_all_rivals_form(self, ranking, language='es', previous=None):
+        """Obté la forma de tots els rivals de la classificació (🆕 v6.4 - en paral·lel).
+        🆕 v6.4 - Amb previous (rivals_form de l'últim JSON), els rivals amb la mateixa
+        empremta a la classificació (partits, punts, gols) reutilitzen l'entrada anterior"""
         rivals_form = {}
+        previous = previous or {}
         
-        print("\n7️⃣ FORMA DELS RIVALS:")
+        print(f"\n7️⃣ FORMA DELS RIVALS ({self.rivals_workers} workers):")
+        started = time.perf_counter()
         
+        rivals = []
         for team in ranking:
             team_name = team.get('equip', '')
             team_id = team.get('team_id', '')
@@ -691,95 +649,159 @@ class ActawpParserV58:
                 print(f"    ⚠️ {team_name}: sense ID")
                 continue
             
-            print(f"    📊 {team_name}...", end=' ')
-            
-            results = self.get_rival_last_results(team_id, team_name, language)
-            top_scorers = self.get_rival_top_scorers(team_id, team_name, language)
+            rivals.append((team_name, team_id, rival_fingerprint(team)))
+        
+        # Rivals que no han jugat des de l'última execució: cap petició
+        reused = {
+            team_name: previous[team_name]
+            for team_name, team_id, fingerprint in rivals
+            if previous.get(team_name, {}).get('fingerprint') == fingerprint
+            and previous[team_name].get('team_id') == team_id
+        }
+        
+        # Els fils dels rivals escriuen al log de l'equip, no directament a stdout
+        fetch = sys.stdout.bind(self.fetch_rival_form) if isinstance(sys.stdout, TeamLog) else self.fetch_rival_form
+        
+        with ThreadPoolExecutor(max_workers=self.rivals_workers) as executor:
+            futures = {
+                team_name: executor.submit(fetch, team_name, team_id, language, previous.get(team_name))
+                for team_name, team_id, fingerprint in rivals
+                if team_name not in reused
+            }
             
-            if results:
-                # Calcular forma (V/E/D)
-                form = []
-                total_gf = 0  # Gols a favor
-                total_gc = 0  # Gols en contra
-                
-                for r in results:
-                    score = r.get('score', '0-0')
-                    score_parts = score.split('-')
-                    if len(score_parts) == 2:
-                        try:
-                            g1, g2 = int(score_parts[0]), int(score_parts[1])
-                        except:
-                            g1, g2 = 0, 0
-                        # Determinar si l'equip és team1 o team2
-                        is_team1 = team_name.upper() in r.get('team1', '').upper()
-                        if is_team1:
-                            total_gf += g1
-                            total_gc += g2
-                            if g1 > g2: form.append('W')
-                            elif g1 < g2: form.append('L')
-                            else: form.append('D')
-                        else:
-                            total_gf += g2
-                            total_gc += g1
-                            if g2 > g1: form.append('W')
-                            elif g2 < g1: form.append('L')
-                            else: form.append('D')
-                
-                # Calcular mitjanes
-                num_matches = len(results)
-                avg_gf = round(total_gf / num_matches, 1) if num_matches > 0 else 0
-                avg_gc = round(total_gc / num_matches, 1) if num_matches > 0 else 0
+            # Recollir en ordre de classificació perquè el JSON sigui idèntic al mode seqüencial
+            for team_name, team_id, fingerprint in rivals:
+                if team_name in reused:
+                    rivals_form[team_name] = reused[team_name]
+                    print(f"    📊 {team_name}... ♻️ sense canvis ({reused[team_name].get('form_string', '')})")
+                    continue
                 
-                # Determinar tendència
-                recent_form = form[:3]  # Últims 3 partits
-                wins_recent = recent_form.count('W')
-                losses_recent = recent_form.count('L')
+                try:
+                    entry, elapsed = futures[team_name].result()
+                except Exception as e:
+                    print(f"    📊 {team_name}... ❌ error: {e}")
+                    continue
                 
-                if wins_recent >= 2:
-                    trend = 'hot'  # 🔥 En ratxa
-                elif losses_recent >= 2:
-                    trend = 'cold'  # 📉 En baixa
-                elif wins_recent > losses_recent:
-                    trend = 'up'  # 📈 Pujant
-                elif losses_recent > wins_recent:
-                    trend = 'down'  # 📉 Baixant
+                if entry:
+                    entry['fingerprint'] = fingerprint
+                    rivals_form[team_name] = entry
+                    form = entry['form']
+                    top_scorers = entry['top_scorers']
+                    scorers_info = f", Top: {top_scorers[0]['name']} ({top_scorers[0]['goals']}g)" if top_scorers else ""
+                    print(f"    📊 {team_name}... ✅ {len(entry['last_results'])} resultats ({'-'.join(form)}){scorers_info} [{elapsed:.2f}s]")
                 else:
-                    trend = 'stable'  # ➡️ Estable
-                
-                # Calcular total exclusions de l'equip
-                total_exclusions = sum(p.get('exclusions', 0) for p in top_scorers)
-                
-                rivals_form[team_name] = {
-                    'team_id': team_id,
-                    'last_results': results,
-                    'form': form,
-                    'form_string': ''.join(form),
-                    'top_scorers': top_scorers,
-                    # 🆕 v6.1 - Estadístiques ampliades
-                    'stats': {
-                        'total_gf': total_gf,
-                        'total_gc': total_gc,
-                        'avg_gf': avg_gf,
-                        'avg_gc': avg_gc,
-                        'matches_played': num_matches,
-                        'wins': form.count('W'),
-                        'draws': form.count('D'),
-                        'losses': form.count('L'),
-                        'trend': trend,
-                        'total_exclusions': total_exclusions
-                    }
-                }
-                
-                # Mostrar info
-                scorers_info = f", Top: {top_scorers[0]['name']} ({top_scorers[0]['goals']}g)" if top_scorers else ""
-                print(f"✅ {len(results)} resultats ({'-'.join(form)}){scorers_info}")
-            else:
-                print(f"❌ sense resultats")
+                    print(f"    📊 {team_name}... ❌ sense resultats [{elapsed:.2f}s]")
+        
+        print(f"  ⏱️ {len(rivals)} rivals ({len(reused)} sense canvis) en {time.perf_counter() - started:.2f}s")
         
         return rivals_form
     
-    def generate_json(self, team_id, team_key, team_name, coach, language='es', ranking_url=None, calendar_url=None):
-        """Genera JSON amb normalització automàtica"""
+    def fetch_calendar(self, calendar_url):
+        """🆕 v6.4 - Secció calendari. Desa les dates a self.calendar_dates. None si falla"""
+        dates = self.parse_calendar(calendar_url)
+        if not dates:
+            return None
+        self.calendar_dates = dates
+        # Dies de partit del calendari per al planificador (poll_scheduler.py)
+        return {'calendar_dates': sorted(set(dates.values()), key=lambda d: tuple(reversed(d.split('/'))))}
+    
+    def fetch_players(self, team_id, language='es'):
+        """🆕 v6.4 - Secció jugadors. None si la pestanya no respon"""
+        players_data = self.get_tab_content(team_id, 'players', language)
+        if not (players_data and players_data.get('code') == 0):
+            print("  ⚠️ Pestanya players no disponible")
+            return None
+        
+        players = self.parse_players(players_data.get('content', ''))
+        print(f"  ✅ {len(players)} jugadors")
+        if players:
+            first = players[0]
+            print(f"  📊 Primer: {first.get('Nombre', '?')} - PJ:{first.get('PJ', 0)} GT:{first.get('GT', 0)}")
+        return {'players': players}
+    
+    def fetch_team_stats(self, team_id, language='es'):
+        """🆕 v6.4 - Secció estadístiques de l'equip. None si la pestanya no respon"""
+        stats_data = self.get_tab_content(team_id, 'stats', language)
+        if not (stats_data and stats_data.get('code') == 0):
+            print("  ⚠️ Pestanya stats no disponible")
+            return None
+        
+        team_stats = {}
+        soup = make_soup(stats_data.get('content', ''), TABLES)
+        table = soup.find('table')
+        if table:
+            for row in table.find_all('tr'):
+                cells = row.find_all('td')
+                if len(cells) >= 2:
+                    key = cells[0].get_text(strip=True)
+                    value = cells[1].get_text(strip=True)
+                    try:
+                        if value.isdigit():
+                            value = int(value)
+                        elif ',' in value:
+                            value = float(value.replace(',', '.'))
+                    except:
+                        pass
+                    team_stats[key] = value
+        print(f"  ✅ {len(team_stats)} estadístiques")
+        return {'team_stats': team_stats}
+    
+    def fetch_upcoming_matches(self, team_id, language='es'):
+        """🆕 v6.4 - Secció pròxims partits. None si la pestanya no respon"""
+        upcoming_data = self.get_tab_content(team_id, 'upcoming-matches', language)
+        if not (upcoming_data and upcoming_data.get('code') == 0):
+            print("  ⚠️ Pestanya upcoming-matches no disponible")
+            return None
+        
+        upcoming = self.parse_upcoming_matches(upcoming_data.get('content', ''))
+        print(f"  ✅ {len(upcoming)} partits")
+        if upcoming:
+            first = upcoming[0]
+            print(f"  📅 Pròxim: J{first.get('jornada', '?')} - {first.get('team1', '?')} vs {first.get('team2', '?')} - {first.get('date', '?')}")
+            print(f"  🔗 URL: {first.get('url', 'SENSE URL!')}")
+        return {'upcoming_matches': upcoming}
+    
+    def fetch_last_results(self, team_id, language='es'):
+        """🆕 v6.4 - Secció últims resultats (amb les dates del calendari). None si la pestanya no respon"""
+        results_data = self.get_tab_content(team_id, 'last-results', language)
+        if not (results_data and results_data.get('code') == 0):
+            print("  ⚠️ Pestanya last-results no disponible")
+            return None
+        
+        results = self.parse_last_results(results_data.get('content', ''))
+        # 🆕 v6.3 - Afegir dates del calendari
+        results = self.add_dates_to_results(results)
+        print(f"  ✅ {len(results)} resultats")
+        if results:
+            first = results[0]
+            score = first.get('score', '?')
+            date = first.get('date', 'SENSE DATA')
+            print(f"  📊 Últim: J{first.get('jornada', '?')} - {first.get('team1', '?')} {score} {first.get('team2', '?')}")
+            print(f"  📅 Data: {date}")
+            print(f"  🔗 URL: {first.get('url', 'SENSE URL!')}")
+        return {'last_results': results}
+    
+    def fetch_ranking(self, ranking_url, language='es', previous_rivals=None):
+        """🆕 v6.4 - Secció classificació i forma dels rivals. None si no hi ha classificació"""
+        ranking = self.parse_ranking(ranking_url)
+        print(f"  ✅ {len(ranking)} equips")
+        if not ranking:
+            return None
+        
+        cnt_position = None
+        for team in ranking:
+            if 'TERRASSA' in team['equip'].upper():
+                cnt_position = team
+                break
+        if cnt_position:
+            print(f"  🏆 CN Terrassa: Posició {cnt_position['posicio']} - {cnt_position['punts']} punts")
+        
+        # Obtenir forma dels rivals
+        return {'ranking': ranking, 'rivals_form': self.get_all_rivals_form(ranking, language, previous_rivals)}
+    
+    def generate_json(self, team_id, team_key, team_name, coach, language='es', ranking_url=None, calendar_url=None, previous=None):
+        """Genera JSON amb normalització automàtica (🆕 v6.4 - una crida fetch_* per secció).
+        previous: l'últim JSON publicat, per reutilitzar la forma dels rivals que no han jugat"""
         self.current_team_key = team_key
         
         print(f"\n{'='*70}")
@@ -799,104 +821,189 @@ class ActawpParserV58:
         }
         
         # 🆕 v6.3 - Parsejar calendari primer per tenir les dates
+        self.calendar_dates = {}
+        result['calendar_dates'] = []
         if calendar_url:
             print("\n1️⃣ CALENDARI (dates partits 3a fase):")
-            self.calendar_dates = self.parse_calendar(calendar_url)
-        else:
-            self.calendar_dates = {}
+            result.update(self.fetch_calendar(calendar_url) or {})
         
         print("\n2️⃣ JUGADORS:")
-        players_data = self.get_tab_content(team_id, 'players', language)
-        if players_data and players_data.get('code') == 0:
-            result['players'] = self.parse_players(players_data.get('content', ''))
-            print(f"  ✅ {len(result['players'])} jugadors")
-            
-            if result['players']:
-                first = result['players'][0]
-                print(f"  📊 Primer: {first.get('Nombre', '?')} - PJ:{first.get('PJ', 0)} GT:{first.get('GT', 0)}")
-        else:
-            result['players'] = []
+        result.update(self.fetch_players(team_id, language) or {'players': []})
         
         print("\n3️⃣ ESTADÍSTIQUES:")
-        stats_data = self.get_tab_content(team_id, 'stats', language)
-        team_stats = {}
-        if stats_data and stats_data.get('code') == 0:
-            soup = BeautifulSoup(stats_data.get('content', ''), 'html.parser')
-            table = soup.find('table')
-            if table:
-                for row in table.find_all('tr'):
-                    cells = row.find_all('td')
-                    if len(cells) >= 2:
-                        key = cells[0].get_text(strip=True)
-                        value = cells[1].get_text(strip=True)
-                        try:
-                            if value.isdigit():
-                                value = int(value)
-                            elif ',' in value:
-                                value = float(value.replace(',', '.'))
-                        except:
-                            pass
-                        team_stats[key] = value
-        result['team_stats'] = team_stats
-        print(f"  ✅ {len(team_stats)} estadístiques")
+        result.update(self.fetch_team_stats(team_id, language) or {'team_stats': {}})
         
         print("\n4️⃣ PRÒXIMS PARTITS:")
-        upcoming_data = self.get_tab_content(team_id, 'upcoming-matches', language)
-        if upcoming_data and upcoming_data.get('code') == 0:
-            result['upcoming_matches'] = self.parse_upcoming_matches(upcoming_data.get('content', ''))
-            print(f"  ✅ {len(result['upcoming_matches'])} partits")
-            if result['upcoming_matches']:
-                first = result['upcoming_matches'][0]
-                print(f"  📅 Pròxim: J{first.get('jornada', '?')} - {first.get('team1', '?')} vs {first.get('team2', '?')} - {first.get('date', '?')}")
-                print(f"  🔗 URL: {first.get('url', 'SENSE URL!')}")
-        else:
-            result['upcoming_matches'] = []
+        result.update(self.fetch_upcoming_matches(team_id, language) or {'upcoming_matches': []})
         
         print("\n5️⃣ ÚLTIMS RESULTATS:")
-        results_data = self.get_tab_content(team_id, 'last-results', language)
-        if results_data and results_data.get('code') == 0:
-            result['last_results'] = self.parse_last_results(results_data.get('content', ''))
-            # 🆕 v6.3 - Afegir dates del calendari
-            result['last_results'] = self.add_dates_to_results(result['last_results'])
-            print(f"  ✅ {len(result['last_results'])} resultats")
-            if result['last_results']:
-                first = result['last_results'][0]
-                score = first.get('score', '?')
-                date = first.get('date', 'SENSE DATA')
-                print(f"  📊 Últim: J{first.get('jornada', '?')} - {first.get('team1', '?')} {score} {first.get('team2', '?')}")
-                print(f"  📅 Data: {date}")
-                print(f"  🔗 URL: {first.get('url', 'SENSE URL!')}")
-        else:
-            result['last_results'] = []
+        result.update(self.fetch_last_results(team_id, language) or {'last_results': []})
         
+        result['ranking'] = []
+        result['rivals_form'] = {}
         if ranking_url:
             print("\n6️⃣ CLASSIFICACIÓ:")
-            result['ranking'] = self.parse_ranking(ranking_url)
-            print(f"  ✅ {len(result['ranking'])} equips")
-            if result['ranking']:
-                cnt_position = None
-                for team in result['ranking']:
-                    if 'TERRASSA' in team['equip'].upper():
-                        cnt_position = team
-                        break
-                if cnt_position:
-                    print(f"  🏆 CN Terrassa: Posició {cnt_position['posicio']} - {cnt_position['punts']} punts")
-            
-            # Obtenir forma dels rivals
-            result['rivals_form'] = self.get_all_rivals_form(result['ranking'], language)
-        else:
-            result['ranking'] = []
-            result['rivals_form'] = {}
+            result.update(self.fetch_ranking(ranking_url, language, (previous or {}).get('rivals_form')) or {})
         
-        from datetime import timezone, timedelta
-        tz_madrid = timezone(timedelta(hours=1))
-        result['last_update'] = datetime.now(tz_madrid).isoformat()
+        result['last_update'] = now_catalunya().isoformat()
         
         return result
 
 
+def rival_fingerprint(team):
+    """🆕 v6.4 - Empremta d'un rival a la classificació: canvia quan juga un partit"""
+    return '|'.join(str(team.get(field, '')) for field in ('partits', 'punts', 'gols_favor', 'gols_contra'))
+
+
+def load_previous(filename):
+    """L'últim JSON publicat d'un equip, o None"""
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def now_catalunya():
+    """Hora actual amb el desplaçament fix d'hivern (UTC+1) que ja feia servir el JSON"""
+    return datetime.now(timezone(timedelta(hours=1)))
+
+
+def save_json(data, filename):
+    """🆕 v6.4 - Escriptura atòmica: el JSON publicat mai queda a mitges"""
+    tmp_path = f"{filename}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, filename)
+
+
+# 🆕 v6.4 - Equips del registre teams.json (team_registry)
+TEAMS = load_teams()
+
+
+class TeamLog:
+    """🆕 v6.4 - stdout per fils: cada equip escriu al seu buffer i el log surt agrupat en acabar"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, 'buffer', None)
+        return (buffer or self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def start(self):
+        self.local.buffer = io.StringIO()
+
+    def stop(self):
+        buffer, self.local.buffer = self.local.buffer, None
+        return buffer.getvalue()
+
+    def bind(self, fn):
+        """Embolcalla fn perquè, executada en un altre fil (p.ex. els rivals), escrigui al buffer del fil actual"""
+        buffer = getattr(self.local, 'buffer', None)
+
+        def bound(*args, **kwargs):
+            previous = getattr(self.local, 'buffer', None)
+            self.local.buffer = buffer
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.local.buffer = previous
+        return bound
+
+
+def run_team(team_key, team_info, cache=None, incremental=True, rivals_workers=4):
+    """🆕 v6.4 - Genera i desa el JSON d'un equip amb el seu propi client (sessió aïllada).
+    La cache de respostes es comparteix entre equips. Retorna (client, fitxer). Llança l'excepció si falla"""
+    client = ActawpClient(cache=cache)
+    parser = ActawpParserV58(rivals_workers=rivals_workers, client=client)
+    filename = team_info.get('data_file') or f"actawp_{team_key}_data.json"
+    
+    data = parser.generate_json(
+        team_info['id'],
+        team_key,
+        team_info['name'],
+        team_info['coach'],
+        team_info['language'],
+        team_info.get('ranking_url'),
+        team_info.get('calendar_url'),
+        load_previous(filename) if incremental else None
+    )
+    
+    save_json(data, filename)
+    print(f"\n💾 Guardat: {filename}")
+    return client, filename
+
+
+def run_pipeline(teams, workers=None, use_cache=True, incremental=True, rivals_workers=4):
+    """🆕 v6.4 - Equips en paral·lel (workers fils, per defecte fins a 4). Retorna el codi de sortida:
+    1 només si han fallat tots els equips (la mateixa regla que aplicava el workflow) o si no n'hi ha cap"""
+    if not teams:
+        print("❌ Cap equip seleccionat (revisa teams.json: tots els equips estan desactivats?)")
+        return 1
+    
+    cache = ResponseCache() if use_cache else None
+    log = sys.stdout if isinstance(sys.stdout, TeamLog) else TeamLog(sys.stdout)
+    original_stdout, sys.stdout = sys.stdout, log
+    print_lock = threading.Lock()
+    summary = {}
+    
+    def worker(team_key, team_info):
+        log.start()
+        started = time.perf_counter()
+        client = None
+        try:
+            client, filename = run_team(team_key, team_info, cache, incremental, rivals_workers)
+            client.print_stats()
+            summary[team_key] = ('ok', time.perf_counter() - started, filename)
+        except Exception as e:
+            print(f"\n❌ Error: {e}")
+            traceback.print_exc(file=sys.stdout)
+            summary[team_key] = ('error', time.perf_counter() - started, str(e))
+        finally:
+            output = log.stop()
+            with print_lock:
+                original_stdout.write(output)
+                original_stdout.write("\n" + "="*70 + "\n")
+                original_stdout.flush()
+        return client
+    
+    try:
+        with ThreadPoolExecutor(max_workers=workers or min(len(teams), 4)) as executor:
+            futures = [executor.submit(worker, team_key, team_info) for team_key, team_info in teams.items()]
+            clients = [future.result() for future in futures]
+    finally:
+        sys.stdout = original_stdout
+    
+    if cache:
+        cache.prune()
+    
+    print("\n📋 RESUM:")
+    for team_key in teams:
+        status, seconds, detail = summary[team_key]
+        icon = '✅' if status == 'ok' else '❌'
+        print(f"  {icon} {team_key:<10} {seconds:>6.1f}s  {detail}")
+    
+    failed = sum(1 for status, _, _ in summary.values() if status != 'ok')
+    if failed == len(teams):
+        print("❌ Han fallat tots els equips")
+        return 1
+    if failed:
+        print(f"⚠️ {failed} de {len(teams)} equips han fallat (els altres JSON s'han desat)")
+    return 0
+
+
 if __name__ == "__main__":
-    parser = ActawpParserV58()
+    # 🆕 v6.4 - Cache HTTP persistent (desactivable amb --no-cache o ACTAWP_NO_CACHE=1)
+    use_cache = '--no-cache' not in sys.argv and not os.environ.get('ACTAWP_NO_CACHE')
+    # 🆕 v6.4 - Scrape incremental dels rivals (--full per tornar-los a descarregar tots)
+    incremental = '--full' not in sys.argv
+    # 🆕 v6.4 - Equips a processar: els indicats (p.ex. "cadet infantil") o tots els de teams.json
+    selected = [a for a in sys.argv[1:] if not a.startswith('--')]
     
     print("""
 ╔══════════════════════════════════════════════════════════════╗
@@ -914,52 +1021,18 @@ if __name__ == "__main__":
 ╚══════════════════════════════════════════════════════════════╝
 """)
     
-    teams = {
-        'juvenil': {
-            'id': '15621223',
-            'name': 'CN Terrassa Juvenil',
-            'coach': 'Jordi Busquets',
-            'language': 'es',
-            'ranking_url': 'https://actawp.natacio.cat/ca/tournament/1317471/ranking/3669887',
-            'calendar_url': 'https://actawp.natacio.cat/ca/tournament/1317471/calendar/3669887/all'
-        },
-        'cadet': {
-            'id': '15621224',
-            'name': 'CN Terrassa Cadet',
-            'coach': 'Didac Cobacho',
-            'language': 'ca',
-            'ranking_url': 'https://actawp.natacio.cat/ca/tournament/1317474/ranking/3669890',
-            'calendar_url': 'https://actawp.natacio.cat/ca/tournament/1317474/calendar/3669890/all'
-        }
-    }
-    
-    for team_key, team_info in teams.items():
-        try:
-            data = parser.generate_json(
-                team_info['id'],
-                team_key,
-                team_info['name'],
-                team_info['coach'],
-                team_info['language'],
-                team_info.get('ranking_url'),
-                team_info.get('calendar_url')
-            )
-            
-            filename = f"actawp_{team_key}_data.json"
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-            print(f"\n💾 Guardat: {filename}")
-            
-        except Exception as e:
-            print(f"\n❌ Error: {e}")
-            import traceback
-            traceback.print_exc()
-        
-        print("\n" + "="*70)
+    # 🆕 v6.4 - Equips en paral·lel (ACTAWP_TEAM_WORKERS=1 per al mode seqüencial)
+    exit_code = run_pipeline(
+        load_teams(only=selected) if selected else TEAMS,
+        workers=int(os.environ.get('ACTAWP_TEAM_WORKERS', '0')) or None,
+        use_cache=use_cache,
+        incremental=incremental,
+        rivals_workers=int(os.environ.get('ACTAWP_RIVALS_WORKERS', '4'))
+    )
     
-    print("""
-✅ JSON GENERATS CORRECTAMENT!
+    if exit_code == 0:
+        print("""
+✅ PROCÉS COMPLETAT!
 
 🆕 Novetats v6.3:
    - Dates dels partits obtingudes del calendari de la 3a fase
@@ -971,3 +1044,4 @@ if __name__ == "__main__":
    git commit -m "📅 Parser v6.3 - Dates del calendari 3a fase"
    git push
 """)
+    sys.exit(exit_code)
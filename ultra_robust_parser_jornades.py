@@ -8,17 +8,19 @@ Estructura correcta segons captures:
 - NOVITAT v5.6: Sistema de correccions manuals per jornades ajornades
 """
 
-import requests
 import json
 import os
 from bs4 import BeautifulSoup
 import re
 from datetime import datetime
 
+from actawp_client import ActawpClient
+
 class ActawpParserV53:
     
     def __init__(self):
-        self.session = requests.Session()
+        self.client = ActawpClient()
+        self.session = self.client.session
         self.jornada_corrections = self.load_jornada_corrections()
     
     def load_jornada_corrections(self):
@@ -36,47 +38,11 @@ class ActawpParserV53:
     
     def get_csrf_token(self, team_id, language='es'):
         """Obté el token CSRF"""
-        url = f"https://actawp.natacio.cat/{language}/team/{team_id}"
-        response = self.session.get(url)
-        
-        match = re.search(r'csrf_token["\']?\s*[:=]\s*["\']([^"\']+)["\']', response.text)
-        if match:
-            return match.group(1)
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        csrf_input = soup.find('input', {'name': 'csrf_token'})
-        if csrf_input:
-            return csrf_input.get('value')
-        
-        return None
+        return self.client.get_csrf_token(team_id, language)
     
     def get_tab_content(self, team_id, tab_name, language='es'):
         """Obté el contingut d'una pestanya"""
-        csrf_token = self.get_csrf_token(team_id, language)
-        
-        if not csrf_token:
-            return None
-        
-        url = f"https://actawp.natacio.cat/{language}/ajax/team/{team_id}/change-tab"
-        
-        data = {
-            'csrf_token': csrf_token,
-            'tab': tab_name
-        }
-        
-        headers = {
-            'accept': '*/*',
-            'content-type': 'application/x-www-form-urlencoded; charset=UTF-8',
-            'x-requested-with': 'XMLHttpRequest',
-            'referer': f'https://actawp.natacio.cat/{language}/team/{team_id}'
-        }
-        
-        response = self.session.post(url, data=data, headers=headers)
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return None
+        return self.client.get_tab_content(team_id, tab_name, language)
     
     def extract_header_text(self, th):
         """Extreu el text del header"""
@@ -440,7 +406,7 @@ class ActawpParserV53:
     def parse_ranking(self, ranking_url):
         """Parser per CLASSIFICACIÓ"""
         try:
-            response = self.session.get(ranking_url)
+            response = self.client.get(ranking_url)
             if response.status_code != 200:
                 print(f"  ⚠️ Error HTTP {response.status_code}")
                 return []
@@ -6,66 +6,36 @@ Extreu la plantilla del pròxim rival a partir de la seva última acta
 Ús:
     python update_rivals_database.py cadet
     python update_rivals_database.py juvenil
+    python update_rivals_database.py cadet --no-cache
 """
 
-import requests
 import json
-import re
+import os
 import sys
-from bs4 import BeautifulSoup
 from datetime import datetime
 
+from actawp_cache import ResponseCache
+from acta_parser import extract_rosters, find_team_roster, roster_from_text, team_key, team_tokens
+from actawp_client import ActawpClient
+from html_engine import LINKS, make_soup
+from team_registry import load_teams
+
+OWN_TEAM_TOKEN = 'TERRASSA'
+
+
 class RivalsUpdater:
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+    def __init__(self, use_cache=True):
+        self.client = ActawpClient(cache=ResponseCache() if use_cache else None)
+        self.session = self.client.session
     
     def get_csrf_token(self, team_id, language='ca'):
         """Obté el token CSRF"""
-        url = f"https://actawp.natacio.cat/{language}/team/{team_id}"
-        response = self.session.get(url)
-        
-        match = re.search(r'csrf_token["\']?\s*[:=]\s*["\']([^"\']+)["\']', response.text)
-        if match:
-            return match.group(1)
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        csrf_input = soup.find('input', {'name': 'csrf_token'})
-        if csrf_input:
-            return csrf_input.get('value')
-        
-        return None
+        return self.client.get_csrf_token(team_id, language)
     
     def get_tab_content(self, team_id, tab_name, language='ca'):
         """Obté el contingut d'una pestanya"""
-        csrf_token = self.get_csrf_token(team_id, language)
-        
-        if not csrf_token:
-            return None
-        
-        url = f"https://actawp.natacio.cat/{language}/ajax/team/{team_id}/change-tab"
-        
-        data = {
-            'csrf_token': csrf_token,
-            'tab': tab_name
-        }
-        
-        headers = {
-            'accept': '*/*',
-            'content-type': 'application/x-www-form-urlencoded; charset=UTF-8',
-            'x-requested-with': 'XMLHttpRequest',
-            'referer': f'https://actawp.natacio.cat/{language}/team/{team_id}'
-        }
-        
-        response = self.session.post(url, data=data, headers=headers)
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return None
+        return self.client.get_tab_content(team_id, tab_name, language)
     
     def get_last_match_url(self, team_id, language='ca'):
         """Obté l'URL de l'última acta d'un equip"""
@@ -77,7 +47,7 @@ class RivalsUpdater:
             print(f"  ❌ No s'han pogut obtenir els resultats")
             return None
         
-        soup = BeautifulSoup(results_data.get('content', ''), 'html.parser')
+        soup = make_soup(results_data.get('content', ''), LINKS)
         
         # Buscar el primer enllaç a una acta
         for a in soup.find_all('a', href=True):
@@ -99,156 +69,30 @@ class RivalsUpdater:
         print(f"  📥 Accedint a l'acta: {match_url}")
         
         try:
-            response = self.session.get(match_url)
+            response = self.client.get(match_url, cache_tab='match')
             if response.status_code != 200:
                 print(f"  ❌ Error HTTP {response.status_code}")
                 return None
             
-            html_text = response.text
-            soup = BeautifulSoup(html_text, 'html.parser')
-            
-            players = []
-            rival_normalized = rival_name.upper().replace('C.N.', '').replace('C.E.', '').replace('U.E.', '').replace("'", "").replace("'", "").strip()
-            
-            print(f"  🔍 Buscant jugadors de: {rival_normalized}")
-            
-            # Netejar HTML per treballar amb text pla
-            full_text = soup.get_text()
-            
-            # Buscar TOTES les seccions de jugadors (hi haurà 2: local i visitant)
-            # El patró és: nom equip seguit de "Gols igualtat" o "DorsalNom"
+            print(f"  🔍 Buscant jugadors de: {team_key(rival_name)}")
             
-            # Buscar la secció del rival - ha de ser la que conté el nom del rival
-            # seguit de les estadístiques de jugadors
+            # Un sol recorregut de l'acta: cada taula de jugadors amb l'equip que la precedeix
+            rosters = extract_rosters(response.text)
+            print(f"  📋 Taules de jugadors: {len(rosters)} ({', '.join(str(r['team']) for r in rosters)})")
             
-            # Primer trobem on apareix el rival amb estadístiques
-            # Format típic: "U.E. D'HORTA\nGols igualtat:\n..." seguit de "DorsalNom..."
+            roster = find_team_roster(rosters, rival_name)
+            players = roster['players'] if roster else []
+            if roster:
+                print(f"  ✅ Taula del rival trobada: {roster['team']}")
             
-            # Buscar totes les taules de jugadors
-            tables = soup.find_all('table')
-            
-            print(f"  📋 Taules trobades: {len(tables)}")
-            
-            for idx, table in enumerate(tables):
-                # Obtenir text de la taula
-                table_text = table.get_text()
-                
-                # Buscar si té el patró de jugadors (Dorsal, Nom, G, GS, etc.)
-                if 'Dorsal' in table_text or 'Nom' in table_text:
-                    # Mirar el context - buscar quin equip és aquesta taula
-                    # Mirar elements anteriors
-                    prev_text = ""
-                    for prev in table.find_all_previous(['h1', 'h2', 'h3', 'h4', 'h5', 'div', 'span'])[:20]:
-                        prev_text = prev.get_text(strip=True).upper() + " " + prev_text
-                        # Parar si trobem un dels equips
-                        if 'HORTA' in prev_text or 'TERRASSA' in prev_text:
-                            break
-                    
-                    # És la taula del rival?
-                    # Netejar apòstrofs i comparar
-                    prev_text_clean = prev_text.replace("'", "").replace("'", "")
-                    rival_clean = rival_normalized.replace("'", "").replace("'", "")
-                    
-                    is_rival = False
-                    # Buscar paraules clau del rival (ignorant apòstrofs)
-                    for part in rival_clean.split():
-                        if len(part) > 3 and part in prev_text_clean:
-                            is_rival = True
-                            break
-                    
-                    # També comprovar si "HORTA" està al context (cas específic)
-                    if 'HORTA' in rival_name.upper() and 'HORTA' in prev_text and 'TERRASSA' not in prev_text[:50]:
-                        is_rival = True
-                    
-                    print(f"  📋 Taula {idx}: is_rival={is_rival}, context={prev_text[:50]}...")
-                    
-                    if is_rival:
-                        print(f"  ✅ Taula del rival trobada!")
-                        
-                        # Extreure jugadors de la taula
-                        rows = table.find_all('tr')
-                        print(f"  📋 Files trobades: {len(rows)}")
-                        
-                        # Primer, identificar les columnes pels headers
-                        headers = table.find_all('th')
-                        header_texts = [h.get_text(strip=True).upper() for h in headers]
-                        print(f"  📋 Headers: {header_texts[:10]}")
-                        
-                        # Trobar índex de DORSAL i JUGADOR/NOM
-                        dorsal_idx = -1
-                        name_idx = -1
-                        for i, h in enumerate(header_texts):
-                            if 'DORSAL' in h:
-                                dorsal_idx = i
-                            if 'JUGADOR' in h or 'NOM' in h:
-                                name_idx = i
-                        
-                        print(f"  📋 Índexs: dorsal={dorsal_idx}, name={name_idx}")
-                        
-                        # Si no trobem pels headers, assumir posicions típiques
-                        if dorsal_idx == -1:
-                            dorsal_idx = 2  # Típicament la 3a columna (0-indexed)
-                        if name_idx == -1:
-                            name_idx = 3  # Típicament la 4a columna
-                        
-                        for row_idx, row in enumerate(rows):
-                            cells = row.find_all('td')
-                            
-                            # Debug primera fila
-                            if row_idx == 0 and cells:
-                                print(f"  📋 Primera fila ({len(cells)} cel·les):")
-                                for ci, c in enumerate(cells[:6]):
-                                    print(f"      [{ci}]: {c.get_text(strip=True)[:30]}")
-                            
-                            if len(cells) > max(dorsal_idx, name_idx):
-                                num_text = cells[dorsal_idx].get_text(strip=True)
-                                name_text = cells[name_idx].get_text(strip=True)
-                                
-                                # Netejar "Veure" del text
-                                num_clean = re.sub(r'Veure|Ver|View', '', num_text, flags=re.IGNORECASE).strip()
-                                name_clean = re.sub(r'Veure|Ver|View', '', name_text, flags=re.IGNORECASE).strip().upper()
-                                
-                                if num_clean.isdigit():
-                                    num = int(num_clean)
-                                    if num > 0 and num <= 20 and name_clean and len(name_clean) > 3:
-                                        players.append({'num': num, 'name': name_clean})
-                                        if len(players) <= 3:
-                                            print(f"      ✅ {num}. {name_clean}")
-                        
-                        # Si hem trobat jugadors, sortir
-                        if players:
-                            break
-            
-            # MÈTODE ALTERNATIU: Regex sobre text net
+            # MÈTODE ALTERNATIU: text pla de l'acta
             if not players:
-                print(f"  🔄 Intent amb regex sobre text net...")
-                
-                # Buscar on comença la secció del rival (després del seu nom)
-                # Ha de tenir "Gols igualtat" o similar
-                rival_section_pattern = rf'({rival_name}|U\.E\.\s*D.HORTA).*?Gols\s*igualtat.*?Dorsal'
-                match_section = re.search(rival_section_pattern, full_text, re.IGNORECASE | re.DOTALL)
-                
-                if match_section:
-                    start_pos = match_section.end() - 10  # Un poc abans de "Dorsal"
-                    section = full_text[start_pos:start_pos + 3000]
-                    
-                    print(f"  📋 Secció trobada, snippet: {section[:200]}...")
-                    
-                    # Patró per capturar: número + nom + estadístiques
-                    # El format és: "1ALVARO CAPILLA COBO000000" dins del text
-                    pattern = r'(\d{1,2})([A-ZÁÉÍÓÚÀÈÌÒÙÑÇ][A-ZÁÉÍÓÚÀÈÌÒÙÑÇ\s]+?)(\d{6,})'
-                    matches = re.findall(pattern, section)
-                    
-                    print(f"  🔍 Regex trobat: {len(matches)} coincidències")
-                    
-                    for m in matches:
-                        num = int(m[0])
-                        name = m[1].strip().upper()
-                        
-                        if num > 0 and num <= 20 and name and len(name) > 3:
-                            invalid = ['TERRASSA', 'ENTRENADOR', 'GOLS', 'EFECTIVITAT', 'SUPERIORITAT']
-                            if not any(x in name for x in invalid):
-                                players.append({'num': num, 'name': name})
+                print(f"  🔄 Intent sobre el text pla...")
+                # Mai els jugadors de CN Terrassa, encara que l'acta no tingui taules reconeixibles
+                others = [token for r in rosters for token in team_tokens(r['team'])
+                          if token not in team_tokens(rival_name)] + [OWN_TEAM_TOKEN]
+                players = roster_from_text(make_soup(response.text).get_text(), rival_name, exclude=others)
+                print(f"  🔍 Text pla: {len(players)} jugadors")
             
             # Eliminar duplicats i ordenar
             seen = set()
@@ -283,24 +127,15 @@ class RivalsUpdater:
         print(f"🔄 ACTUALITZANT RIVALS DATABASE - {team.upper()}")
         print(f"{'='*70}")
         
-        # URLs i fitxers
-        base_urls = {
-            'cadet': 'https://joseprico.github.io/cnt_cadet_25-26/',
-            'juvenil': 'https://joseprico.github.io/CNT_juvenil_25_26/'
-        }
-        
-        database_files = {
-            'cadet': 'rivals_database_cadet.json',
-            'juvenil': 'rivals_database_juvenil.json'
-        }
-        
-        base_url = base_urls.get(team)
-        database_file = database_files.get(team)
-        
-        if not base_url:
+        # URLs i fitxers del registre teams.json
+        team_info = load_teams().get(team)
+        if not team_info or not team_info.get('site_url'):
             print(f"❌ Equip no reconegut: {team}")
             return
         
+        base_url = team_info['site_url']
+        database_file = team_info['rivals_database']
+        
         # 1. Carregar dades ACTAWP (local o remot)
         print(f"\n1️⃣ CARREGANT DADES ACTAWP...")
         
@@ -326,7 +161,7 @@ class RivalsUpdater:
         if not actawp_data:
             try:
                 actawp_url = f"{base_url}actawp_{team}_data.json"
-                response = requests.get(actawp_url)
+                response = self.client.get(actawp_url)
                 response.raise_for_status()
                 actawp_data = response.json()
                 print(f"  ✅ Dades carregades des de URL")
@@ -481,7 +316,10 @@ class RivalsUpdater:
 
 
 if __name__ == '__main__':
-    team = sys.argv[1] if len(sys.argv) > 1 else 'cadet'
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    team = args[0] if args else 'cadet'
+    use_cache = '--no-cache' not in sys.argv and not os.environ.get('ACTAWP_NO_CACHE')
     
-    updater = RivalsUpdater()
+    updater = RivalsUpdater(use_cache=use_cache)
     updater.update_rivals_database(team)
+    updater.client.print_stats()